@@ -0,0 +1,47 @@
+from ipsurv.core.object_factory import ObjectFactory
+from ipsurv.async_survey_ips import AsyncSurveyIps
+
+from ipsurv.ip_surv_cmd import IpSurvCmd
+
+import asyncio
+
+'''
+Surveying on asyncio event loop.
+
+Specification:
+- Using AsyncSurveyIps class.
+- Customizing IpSurvCmd class.
+
+Command:
+# cat examples.txt|python3 async_survey.py --workers=50
+'''
+
+
+class AsyncIpSurvCmd(IpSurvCmd):
+    def _survey_ips(self, args, data_factory, serializer, rows):
+        survey_ips = self._build(args, data_factory, serializer)
+
+        survey_ips.initialize()
+
+        asyncio.run(survey_ips.dispatch(rows, args))
+
+    def _build(self, args, data_factory, serializer):
+        dns_resolver = self.factory.create_dns_resolver(args)
+
+        target_parser = self.factory.create_target_parser(args, self.pipeline, dns_resolver)
+
+        _collectors = self.factory.create_collectors(args, dns_resolver)
+
+        collectors = [_collectors[key] for key in args.fixed_collectors]
+
+        reactivities = self.factory.create_reactivities(args)
+
+        return AsyncSurveyIps(args, self.config, data_factory, target_parser, collectors, reactivities, self.pipeline, serializer)
+
+
+if __name__ == '__main__':
+    factory = ObjectFactory()
+
+    ip_surv_cmd = AsyncIpSurvCmd(factory)
+
+    ip_surv_cmd.run()
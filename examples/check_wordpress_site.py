@@ -46,7 +46,8 @@ class WordPressCollector(DataCollector):
     def request_data(self, target):
         url = target.url if target.url else target.fqdn
 
-        success, response = self.requester.request(url, 'utf-8')
+        # The body is kept, though HttpCollector doesn't keep it.
+        success, response = self.requester.request(url, 'utf-8', keep_body=True)
 
         return (success, response)
 
@@ -0,0 +1,164 @@
+import asyncio
+import logging
+import threading
+from collections import deque
+
+from ipsurv.configs import Constant
+from ipsurv.survey_ips import SurveyIps
+from ipsurv.util.sys_util import AppException
+
+
+class AsyncSurveyIps(SurveyIps):
+    async def dispatch(self, rows, args):
+        if args.headers:
+            self._output_headers(args)
+
+        window = max(args.workers, 1)
+
+        tasks = deque()  # Reorder buffer. Results are output by sequence order.
+
+        async for item in self._async_feed_rows(self._iterate_rows(rows, args), window):
+            if item is not None:
+                sequence, row = item
+
+                tasks.append(asyncio.ensure_future(self._survey_row(sequence, row, args)))
+
+            while tasks and (len(tasks) >= window or tasks[0].done()):
+                self.pipeline.output_result(await tasks.popleft())
+
+        while tasks:
+            self.pipeline.output_result(await tasks.popleft())
+
+    async def _async_feed_rows(self, items, size):
+        # The input is read by a thread, so reading a slow input doesn't block the event loop.
+        loop = asyncio.get_running_loop()
+        rows = asyncio.Queue()
+        slots = threading.Semaphore(size)
+        end = object()
+        errors = []
+
+        def read():
+            try:
+                for item in items:
+                    slots.acquire()
+                    loop.call_soon_threadsafe(rows.put_nowait, item)
+            except Exception as e:
+                errors.append(e)
+            finally:
+                loop.call_soon_threadsafe(rows.put_nowait, end)
+
+        threading.Thread(target=read, daemon=True).start()
+
+        while True:
+            try:
+                item = await asyncio.wait_for(rows.get(), self.IDLE_INTERVAL)
+            except asyncio.TimeoutError:
+                item = None
+
+            if item is end:
+                break
+
+            if item is not None:
+                slots.release()
+
+            yield item
+
+        if errors:
+            raise errors[0]
+
+    async def _survey_row(self, sequence, original, args):
+        data = self.data_factory.create()
+
+        data.set('sequence', sequence)
+        data.set('original', original)
+
+        try:
+            original = self.pipeline.pre_target_parse(data, original)
+
+            target = await self.target_parser.async_parse(data, original, args)
+
+            await self._survey_target(data, target, args)
+
+            row = self.pipeline.build(data)
+        except Exception as e:
+            level = logging.ERROR if not isinstance(e, AppException) else logging.DEBUG
+
+            logging.log(level, str(e), exc_info=True)
+
+            row = self.pipeline.build_error(str(e))
+
+        return row
+
+    async def _survey_target(self, data, target, args):
+        self.pipeline.pre_collect(data, target, args)
+
+        skip = False
+
+        if target.status == Constant.STATUS_EXIST:
+            skip = self._detect_skip(data, target, args)
+
+            requires = []
+
+            if not skip:
+                requires = await self._survey_by_collectors(self.collectors, target, args, data, True)
+
+            if not skip or args.skip_duplicate < 2:
+                requires += await self._survey_by_collectors(self.reactivities, target, args, data, False)
+
+            self._complete_target(data, target, args, requires, skip)
+
+        self._post_collect(data, target, args, skip)
+
+    async def _survey_by_collectors(self, collectors, target, args, data, is_source):
+        if args.parallel_collect:
+            return await self._survey_by_collectors_parallel(collectors, target, args, data, is_source)
+
+        requires = []
+
+        for collector in collectors:
+            requires += await self._survey_by_collector(collector, target, args, data, is_source)
+
+        return requires
+
+    async def _survey_by_collectors_parallel(self, collectors, target, args, data, is_source):
+        requests = []
+
+        for collector in collectors:
+            name = collector.get_name()
+            requires = collector.get_requires()
+
+            task = None
+
+            if self._prepare_request(data, name, collector, requires, args):
+                task = asyncio.ensure_future(collector.async_request(target))
+
+            requests.append((collector, name, requires, task))
+
+        requires = []
+
+        for collector, name, _requires, task in requests:
+            requires += _requires
+
+            if task is None:
+                continue
+
+            if not self._need_response(data, name, _requires, args):
+                task.cancel()
+                continue
+
+            success, response, response_time = await task
+
+            self._apply_response(data, name, collector, target, args, is_source, success, response, response_time)
+
+        return requires
+
+    async def _survey_by_collector(self, collector, target, args, data, is_source):
+        name = collector.get_name()
+        requires = collector.get_requires()
+
+        if self._prepare_request(data, name, collector, requires, args):
+            success, response, response_time = await collector.async_request(target)
+
+            self._apply_response(data, name, collector, target, args, is_source, success, response, response_time)
+
+        return requires
@@ -50,13 +50,28 @@ class Config:
         'autodetect': {'default': False, 'type': strtobool, 'help': 'Autodetect an IP or hostname that is included in the line. [Experimental]'},
         'begin': {'default': -1, 'type': int, 'help': 'Beginning from sequence number.'},
         'end': {'default': -1, 'type': int, 'help': 'Ending to sequence number.'},
+        'workers': {'default': 1, 'type': int, 'help': 'Number of worker threads surveying rows concurrently. Results are output in sequence order.'},
+        'processes': {'default': 1, 'type': int, 'help': 'Number of worker processes surveying rows. Rows are sharded by chunk and output in sequence order.'},
 
         'collect': {'default': 'rdap;dnstxt;dnsreverse;ipinfo', 'type': str, 'help': 'Data collectors. See reference manual in detail. ex: rdap;dnstxt;dnsreverse;ipinfo'},
         'all_collect': {'default': False, 'help': 'All data collectors.', 'action': 'store_true'},
+        'parallel_collect': {'default': False, 'help': 'Request data collectors of each row in parallel. Unnecessary responses are discarded.', 'action': 'store_true'},
         'timeout': {'default': '8.0', 'type': str, 'help': 'Timeout seconds. Specify single value - ex: 1,3.2. Or specify values of each connection types. "dns,http,reactivity" - "3;5.1;6"'},
+        'rate_limit': {'default': '0', 'type': str, 'help': 'Maximum requests per second to each upstream host. 0: Unlimited. Specify single value or values of each host. ex: 5, "rdap.arin.net=2;ipinfo.io=1;5"'},
+        'max_inflight': {'default': '0', 'type': str, 'help': 'Maximum concurrent requests to each upstream host. 0: Unlimited. Specify single value or values of each host. ex: 4, "rdap.arin.net=2;4"'},
+        'cache': {'default': None, 'type': str, 'help': 'Response cache filename(SQLite). Responses of RDAP, DNSTXT and IPINFO are reused within TTL.'},
+        'cache_ttl': {'default': '86400', 'type': str, 'help': 'TTL seconds of the response cache. 0: No expiration. Specify single value or values of each collector. ex: 3600, "rdap=604800;ipinfo=3600;86400"'},
+        'cache_size': {'default': 100000, 'type': int, 'help': 'Maximum entries of the response cache. The oldest entries are evicted. 0: Unlimited.'},
+        'network_cache': {'default': False, 'help': 'Reuse RDAP and DNSTXT responses for the IPs in the same network during the run.', 'action': 'store_true'},
+        'dnstxt_bulk': {'default': False, 'help': 'Send DNSTXT queries of all workers over one UDP socket concurrently.', 'action': 'store_true'},
+        'rdap_bootstrap': {'default': None, 'type': str, 'help': 'IANA RDAP bootstrap filenames(JSON). RDAP servers are selected by the bootstrap. ex: ipv4.json,ipv6.json'},
+        'rdap_map': {'default': None, 'type': str, 'help': 'RDAP server map filename(JSON). The RDAP servers learned from redirects are loaded and saved.'},
 
         'group': {'default': None, 'type': None, 'help': 'Grouping rule. ex: network, 24, 255.255.255.0'},
         'skip_duplicate': {'default': 0, 'type': int, 'help': 'Skip duplicate group. *2: It also skip checking server reactivity[icmp, tcp, udp].', 'choices': [0, 1, 2]},
+        'group_index': {'default': None, 'type': str, 'help': 'Group index filename(JSON). The groups are loaded at startup and saved at the end.'},
+        'group_seed': {'default': None, 'type': str, 'help': 'CIDR list filename. The networks are loaded as the groups at startup.'},
+        'fill_duplicate': {'default': False, 'help': 'Fill the skipped duplicate rows with the values collected for the group.', 'action': 'store_true'},
 
         'format': {'default': 'default', 'type': None, 'help': 'Output format. Specify `Profile` or `Parameter`. See reference manual in detail. ex: simple, default, detail, geo, hostname etc.', 'action': 'StrAction'},
         'no_original': {'default': False, 'help': 'Cancel outputting the original line automatically.', 'action': 'store_true'},
@@ -74,6 +89,8 @@ class Config:
         'tcp': {'default': 0, 'type': int, 'help': 'Check TCP port. Specify default port.'},
         'udp': {'default': 0, 'type': int, 'help': 'Check UDP port. Specify default port.'},
         'http': {'default': 0, 'type': int, 'help': 'Check HTTP response.', 'choices': [0, 1, 2]},
+        'http_head': {'default': False, 'help': 'Check HTTP by HEAD request first. The size is taken from Content-Length.', 'action': 'store_true'},
+        'http_body_limit': {'default': 0, 'type': int, 'help': 'Maximum bytes of HTTP body to read. 0: Unlimited.'},
 
         'version': {'default': False, 'help': 'Show version information.', 'action': 'store_true'}
     }
@@ -109,6 +126,13 @@ class Config:
         'http', 'http_time', 'http_status', 'http_size', 'http_h2'
     ]
 
+    # The values shared by the IPs of a group. They are filled into the duplicate rows.
+    GROUP_PARAMS = [
+        'network_start', 'network_end', 'country', 'cidr',
+        'port43', 'country_updated', 'name', 'handle', 'address', 'org', 'timezone', 'description',
+        'rir', 'geo', 'postal', 'city', 'region'
+    ]
+
     MASTER_DATA = {
         'success': False, 'status': '', 'requests': [], 'errors': [],
         'sequence': None, 'original': None, 'target': None, 'ip': None, 'ip_int': None, 'port': -1,
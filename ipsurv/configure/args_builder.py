@@ -4,9 +4,11 @@ import logging
 import re
 from collections import Counter
 
-from ipsurv.configure.args_validators import FormatValidator, TimeoutValidator
+from ipsurv.configure.args_validators import FormatValidator, TimeoutValidator, HostLimitValidator, CacheTtlValidator, FileValidator
 from ipsurv.configs import Constant
 from ipsurv.core.pipeline import Pipeline
+from ipsurv.core.target_groups import TargetGroups
+from ipsurv.requester.rdap import RdapBootstrap
 from ipsurv.util.args_util import ArgsHelper, StdinLoader
 from ipsurv.util.sys_util import System
 
@@ -85,9 +87,16 @@ class ArgsBuilder:
             args.fixed_delimiter = self._fix_delimiter(args)
             args.fixed_format, args.fixed_format_params = self._fix_format(args, debug)
             args.fixed_timeout = self._fix_timeout(args, debug)
+            args.fixed_rate_limit = self._fix_host_limit('rate_limit', args, debug)
+            args.fixed_max_inflight = self._fix_host_limit('max_inflight', args, debug)
+            args.fixed_cache_ttl = self._fix_cache_ttl(args, debug)
             args.fixed_enclose = self._fix_enclose(args)
 
             args.fixed_collectors = self._fix_collectors(args)
+
+            self._validate_file('group_index', args, debug, loader=TargetGroups.read_buckets, missing_ok=True)
+            self._validate_file('group_seed', args, debug)
+            self._validate_file('rdap_bootstrap', args, debug, loader=RdapBootstrap.read_services, multiple=True)
         except Exception as e:
             logging.log(logging.DEBUG, 'Fix arguments error.', exc_info=True)
 
@@ -151,6 +160,21 @@ class ArgsBuilder:
 
         return timeout_validator.validate(args)
 
+    def _fix_host_limit(self, name, args, debug):
+        host_limit_validator = HostLimitValidator(name, debug=debug)
+
+        return host_limit_validator.validate(args)
+
+    def _fix_cache_ttl(self, args, debug):
+        cache_ttl_validator = CacheTtlValidator(debug=debug)
+
+        return cache_ttl_validator.validate(args)
+
+    def _validate_file(self, name, args, debug, loader=None, multiple=False, missing_ok=False):
+        file_validator = FileValidator(name, loader, multiple, missing_ok, debug=debug)
+
+        return file_validator.validate(args)
+
     def _fix_enclose(self, args):
         v = args.enclose
 
@@ -2,6 +2,7 @@ from ipsurv.util.args_util import ArgValidator
 
 from functools import partial
 
+import os
 import re
 import logging
 
@@ -175,3 +176,102 @@ class TimeoutValidator(ArgValidator):
             return self.default
 
         return float(v)
+
+
+class HostLimitValidator(ArgValidator):
+    def __init__(self, name, debug=False):
+        super().__init__(debug)
+
+        self.name = name
+
+    def _validate(self, args):
+        v = getattr(args, self.name)
+
+        limits = {}
+
+        for item in re.split(r'[;, ]+', v.strip()):
+            if not item:
+                continue
+
+            host, _, value = item.rpartition('=')
+
+            host = host.strip().lower() if host else '*'
+
+            limits[host] = self._parse_limit(value)
+
+        logging.log(logging.INFO, 'Fixed ' + self.name + ':' + str(limits))
+
+        return limits
+
+    def _parse_limit(self, v):
+        # Only decimal numbers. Negative values, "nan" and "inf" are rejected as same as cache_ttl.
+        if not re.search(r'^\d+(\.\d+)?$', v):
+            raise self.arg_error('Limit must be a number of 0 or more.(' + v + ')')
+
+        return float(v)
+
+
+class CacheTtlValidator(ArgValidator):
+    def __init__(self, debug=False):
+        super().__init__(debug)
+
+        self.name = 'cache_ttl'
+
+    def _validate(self, args):
+        v = args.cache_ttl
+
+        ttls = {}
+
+        for item in re.split(r'[;, ]+', v.strip()):
+            if not item:
+                continue
+
+            collector, _, value = item.rpartition('=')
+
+            collector = collector.strip().lower() if collector else '*'
+
+            ttls[collector] = self._parse_ttl(value)
+
+        logging.log(logging.INFO, 'Fixed cache_ttl:' + str(ttls))
+
+        return ttls
+
+    def _parse_ttl(self, v):
+        if not re.search(r'^\d+$', v):
+            raise self.arg_error('TTL must be an integer of 0 or more.(' + v + ')')
+
+        return int(v)
+
+
+class FileValidator(ArgValidator):
+    # "loader" raises an error for the broken file. "missing_ok" allows the file which is created later.
+    def __init__(self, name, loader=None, multiple=False, missing_ok=False, debug=False):
+        super().__init__(debug)
+
+        self.name = name
+        self.loader = loader
+        self.multiple = multiple
+        self.missing_ok = missing_ok
+
+    def _validate(self, args):
+        v = getattr(args, self.name)
+
+        if not v:
+            return []
+
+        paths = [path.strip() for path in v.split(',') if path.strip()] if self.multiple else [v]
+
+        for path in paths:
+            if not os.path.isfile(path):
+                if self.missing_ok and not os.path.exists(path):
+                    continue
+
+                raise self.arg_error('File not found.(' + path + ')')
+
+            if self.loader is not None:
+                try:
+                    self.loader(path)
+                except (OSError, ValueError, TypeError, AttributeError) as e:
+                    raise self.arg_error('Illegal file.(' + path + ', ' + str(e) + ')')
+
+        return paths
@@ -2,10 +2,24 @@ import copy
 from abc import ABC
 import pprint
 
+# "abc.ABC" has no __slots__ on Python 3.6, so its subclasses have "__dict__" already.
+DICT_SLOT = ('__dict__',) if '__slots__' in vars(ABC) else ()
+
 
 class StoreBase(ABC):
+    __slots__ = ()
+
     def get_values(self):
-        return vars(self)
+        values = {}
+
+        for cls in reversed(type(self).__mro__):
+            for k in getattr(cls, '__slots__', ()):
+                if k != '__dict__' and hasattr(self, k):
+                    values[k] = getattr(self, k)
+
+        values.update(getattr(self, '__dict__', {}))
+
+        return values
 
     def dump(self):
         pp = pprint.PrettyPrinter(indent=2)
@@ -13,6 +27,9 @@ class StoreBase(ABC):
 
 
 class Target(StoreBase):
+    # The fixed attributes are slotted. "__dict__" is created only when the other attribute is set by a plugin.
+    __slots__ = ('raw', 'identifier', 'identifier_int', 'ip', 'url', 'fqdn', 'port', 'status') + DICT_SLOT
+
     def __init__(self, raw=None):
         self.raw = raw
         self.identifier = None
@@ -39,10 +56,11 @@ class HeaderTarget(Target):
 
 
 class TargetGroup:
-    def __init__(self, begin_int, end_int=None, value=''):
+    def __init__(self, begin_int, end_int=None, value='', values=None):
         self.begin_int = begin_int
         self.end_int = end_int
         self.value = value
+        self.values = values  # Collected values of the group.
 
     def get_values(self):
         return vars(self)
@@ -51,39 +69,120 @@ class TargetGroup:
         print(self.get_values())
 
 
+class ValueSchema:
+    # Key layout shared by ValueData. The values of each row are kept in a list by the index of the key.
+    def __init__(self, keys):
+        self.keys = tuple(keys)
+        self.indexes = {k: i for i, k in enumerate(self.keys)}
+
+
 class ValueData(ABC):
-    def __init__(self, data):
-        self.data = data
+    # "__dict__" is created only when the other attribute is set by a plugin.
+    __slots__ = ('schema', 'values', 'extras', 'header') + DICT_SLOT
+
+    MISSING = object()
+
+    def __init__(self, data, schema=None):
         self.header = False
 
+        if schema is not None:
+            self.schema = schema
+            self.values = data
+            self.extras = None  # The keys out of the schema.
+        else:
+            self.set_data(data)
+
     def set_header(self, v):
         self.header = v
 
     def set(self, k, v):
-        self.data[k] = v
+        index = self.schema.indexes.get(k)
+
+        if index is not None:
+            self.values[index] = v
+        else:
+            if self.extras is None:
+                self.extras = {}
+
+            self.extras[k] = v
 
     def get(self, k):
-        return self.data.get(k)
+        index = self.schema.indexes.get(k)
+
+        if index is not None:
+            v = self.values[index]
+
+            return v if v is not self.MISSING else None
+
+        return self.extras.get(k) if self.extras is not None else None
+
+    def has(self, k):
+        index = self.schema.indexes.get(k)
+
+        if index is not None:
+            return self.values[index] is not self.MISSING
+
+        return self.extras is not None and k in self.extras
+
+    def items(self):
+        for k, v in zip(self.schema.keys, self.values):
+            if v is not self.MISSING:
+                yield k, v
+
+        if self.extras:
+            yield from list(self.extras.items())
 
     def update(self, k, fn):
-        self.data[k] = fn(self.data[k])
+        self.set(k, fn(self._get_existing(k)))
 
     def delete(self, k):
-        del self.data[k]
+        self._get_existing(k)
+
+        index = self.schema.indexes.get(k)
+
+        if index is not None:
+            self.values[index] = self.MISSING
+        else:
+            del self.extras[k]
+
+    def _get_existing(self, k):
+        index = self.schema.indexes.get(k)
+
+        if index is not None and self.values[index] is not self.MISSING:
+            return self.values[index]
+        elif index is None and self.extras is not None and k in self.extras:
+            return self.extras[k]
+
+        raise KeyError(k)
 
     def map(self, fn):
-        self.data = {k: fn(v) for k, v in self.data.items()}
+        self.values = [fn(v) if v is not self.MISSING else v for v in self.values]
+
+        if self.extras:
+            self.extras = {k: fn(v) for k, v in self.extras.items()}
 
     def get_data(self):
-        return self.data
+        # A new dict of the values. Modifying it doesn't change the data, use set() or set_data() instead.
+        data = {k: v for k, v in zip(self.schema.keys, self.values) if v is not self.MISSING}
+
+        if self.extras:
+            data.update(self.extras)
+
+        return data
 
     def set_data(self, data):
-        self.data = data
+        data = data if data is not None else {}
+
+        self.schema = ValueSchema(data.keys())
+        self.values = list(data.values())
+        self.extras = None
 
     def get_values(self):
-        values = self.data.copy()
+        data = self.get_data()
 
-        for k, v in self.data.items():
+        values = data.copy()
+
+        for k, v in data.items():
             if isinstance(v, StoreBase):
                 values[k] = str(v)
 
@@ -99,8 +198,13 @@ class ValueData(ABC):
 
 
 class ValueDataFactory(ABC):
+    IMMUTABLE_TYPES = (str, int, float, bool, bytes, type(None))
+
     def __init__(self, master_data, params):
         self.master = self._create_master(master_data, params)
+        self.schema = ValueSchema(self.master.keys())
+        self.master_values = list(self.master.values())
+        self.mutables = self._compile_mutables(self.master)
 
     def _create_master(self, master_data, params):
         master = master_data.copy()
@@ -111,10 +215,24 @@ class ValueDataFactory(ABC):
 
         return master
 
+    def _compile_mutables(self, master):
+        # Immutable values are shared by shallow copy. Only mutable values such as "requests" are copied for each row.
+        return [i for i, v in enumerate(master.values()) if not isinstance(v, self.IMMUTABLE_TYPES)]
+
     def create(self):
-        data = copy.deepcopy(self.master)
+        values = self.master_values.copy()
+
+        for i in self.mutables:
+            values[i] = copy.deepcopy(values[i])
 
-        return self.build(data)
+        # A customized build() receives a dict as before. build_values() is the hook of the values of the schema.
+        if type(self).build is not ValueDataFactory.build:
+            return self.build(dict(zip(self.schema.keys, values)))
+
+        return self.build_values(values)
 
     def build(self, data):
         return ValueData(data)
+
+    def build_values(self, values):
+        return ValueData(values, self.schema)
@@ -1,3 +1,4 @@
+import logging
 from abc import ABC
 
 from ipsurv.configure.args_builder import ArgsBuilder
@@ -6,15 +7,24 @@ from ipsurv.core.entity import ValueDataFactory
 from ipsurv.core.pipeline import Pipeline
 from ipsurv.core.target_parser import TargetParser
 from ipsurv.data_collector.basic_collectors import RdapCollector, DnsTxtCollector, IpInfoCollector, DnsReverseCollector
+from ipsurv.data_collector.network_cache import NetworkCache
 from ipsurv.data_collector.reactivity_collectors import ICMPCollector, TCPCollector, UDPCollector, HttpCollector
+from ipsurv.data_collector.response_cache import ResponseCache
 from ipsurv.data_collector.self_collector import SelfCollector
+from ipsurv.requester.dns_multiplexer import DnsMultiplexer
 from ipsurv.requester.dns_resolver import DnsResolveRequester
+from ipsurv.requester.host_limiter import HostLimiter
 from ipsurv.requester.http import HttpRequester
+from ipsurv.requester.http_connection_pool import HttpConnectionPool
+from ipsurv.requester.icmp_sweeper import IcmpSweeper
 from ipsurv.requester.ip_info import IpInfoRequester
-from ipsurv.requester.rdap import CountryDetector, RdapRequester
+from ipsurv.requester.rdap import CountryDetector, RdapBootstrap, RdapRequester, RdapServerMap
 from ipsurv.requester.server_reactivity import ServerReactivity
+from ipsurv.requester.tcp_prober import TcpProber
+from ipsurv.requester.udp_prober import UdpProber
 from ipsurv.serializer.json_serializer import JsonSerializer
 from ipsurv.serializer.line_serializer import LineSerializer
+from ipsurv.util.network_util import ResolveCache, ResolverPool
 
 
 class ObjectFactory(ABC):
@@ -34,7 +44,29 @@ class ObjectFactory(ABC):
         return TargetParser(args, pipeline, dns_resolver)
 
     def create_dns_resolver(self, args):
-        return DnsResolveRequester(timeout=args.fixed_timeout['dns'])
+        dns_resolver = DnsResolveRequester(timeout=args.fixed_timeout['dns'])
+
+        dns_resolver.set_host_limiter(self.get_host_limiter(args))
+
+        return dns_resolver
+
+    def get_host_limiter(self, args):
+        if getattr(self, 'host_limiter', None) is None:
+            self.host_limiter = self.create_host_limiter(args)
+
+        return self.host_limiter
+
+    def create_host_limiter(self, args):
+        return HostLimiter(args.fixed_rate_limit, args.fixed_max_inflight)
+
+    def get_connection_pool(self, args):
+        if getattr(self, 'connection_pool', None) is None:
+            self.connection_pool = self.create_connection_pool(args)
+
+        return self.connection_pool
+
+    def create_connection_pool(self, args):
+        return HttpConnectionPool()
 
     def create_collectors(self, args, dns_resolver):
         collectors = {}
@@ -53,21 +85,128 @@ class ObjectFactory(ABC):
         if 'dnsreverse' in _collectors:
             collectors['dnsreverse'] = self.create_dns_reverse_collector(dns_resolver, args)
 
+        response_cache = self.get_response_cache(args)
+        network_cache = self.get_network_cache(args)
+        resolve_cache = self.get_resolve_cache(args)
+
+        for collector in collectors.values():
+            collector.set_response_cache(response_cache)
+            collector.set_network_cache(network_cache)
+            collector.set_resolve_cache(resolve_cache)
+
         return collectors
 
+    def get_response_cache(self, args):
+        if getattr(self, 'response_cache', None) is None and args.cache:
+            self.response_cache = self.create_response_cache(args)
+
+        return getattr(self, 'response_cache', None)
+
+    def create_response_cache(self, args):
+        return ResponseCache(args.cache, args.fixed_cache_ttl, args.cache_size)
+
+    def get_network_cache(self, args):
+        if getattr(self, 'network_cache', None) is None and args.network_cache:
+            self.network_cache = self.create_network_cache(args)
+
+        return getattr(self, 'network_cache', None)
+
+    def create_network_cache(self, args):
+        return NetworkCache()
+
+    def get_resolve_cache(self, args):
+        if getattr(self, 'resolve_cache', None) is None:
+            self.resolve_cache = self.create_resolve_cache(args)
+
+        return self.resolve_cache
+
+    def create_resolve_cache(self, args):
+        return ResolveCache()
+
+    def get_resolver_pool(self, args):
+        if getattr(self, 'resolver_pool', None) is None:
+            self.resolver_pool = self.create_resolver_pool(args)
+
+        return self.resolver_pool
+
+    def create_resolver_pool(self, args):
+        # Each worker may wait for some lookups at the same time.
+        return ResolverPool(max(ResolverPool.MAX_WORKERS, args.workers * 2))
+
     def create_rdap_collector(self, args):
         country_detector = CountryDetector()
 
-        return RdapCollector(RdapRequester(country_detector, timeout=args.fixed_timeout['http']), args)
+        requester = RdapRequester(country_detector, timeout=args.fixed_timeout['http'])
+
+        requester.set_host_limiter(self.get_host_limiter(args))
+        requester.set_connection_pool(self.get_connection_pool(args))
+        requester.set_server_map(self.get_rdap_server_map(args))
+        requester.set_bootstrap(self.get_rdap_bootstrap(args))
+
+        return RdapCollector(requester, args)
+
+    def get_rdap_bootstrap(self, args):
+        if getattr(self, 'rdap_bootstrap', None) is None and args.rdap_bootstrap:
+            self.rdap_bootstrap = self.create_rdap_bootstrap(args)
+
+        return getattr(self, 'rdap_bootstrap', None)
+
+    def create_rdap_bootstrap(self, args):
+        bootstrap = RdapBootstrap()
+
+        for path in args.rdap_bootstrap.split(','):
+            if path.strip():
+                bootstrap.load(path.strip())
+
+        return bootstrap
+
+    def get_rdap_server_map(self, args):
+        if getattr(self, 'rdap_server_map', None) is None:
+            self.rdap_server_map = self.create_rdap_server_map(args)
+
+        return self.rdap_server_map
+
+    def create_rdap_server_map(self, args):
+        server_map = RdapServerMap()
+
+        if args.rdap_map:
+            server_map.load(args.rdap_map)
+
+        return server_map
 
     def create_dnstxt_collector(self, dns_resolver, args):
+        dns_resolver.set_multiplexer(self.get_dns_multiplexer(args))
+
         return DnsTxtCollector(dns_resolver, args)
 
+    def get_dns_multiplexer(self, args):
+        if getattr(self, 'dns_multiplexer', None) is None and args.dnstxt_bulk:
+            self.dns_multiplexer = self.create_dns_multiplexer(args)
+
+        return getattr(self, 'dns_multiplexer', None)
+
+    def create_dns_multiplexer(self, args):
+        return DnsMultiplexer(timeout=args.fixed_timeout['dns'])
+
     def create_ipinfo_collector(self, args):
-        return IpInfoCollector(IpInfoRequester(timeout=args.fixed_timeout['http'], token=args.conf.get('ipinfo_token')), args)
+        requester = IpInfoRequester(timeout=args.fixed_timeout['http'], token=args.conf.get('ipinfo_token'))
+
+        requester.set_host_limiter(self.get_host_limiter(args))
+        requester.set_connection_pool(self.get_connection_pool(args))
+
+        return IpInfoCollector(requester, args)
 
     def create_self_collector(self, args, dns_resolver, server_reactivity):
-        return SelfCollector(IpInfoRequester(timeout=args.fixed_timeout['http']), dns_resolver, server_reactivity, args)
+        requester = IpInfoRequester(timeout=args.fixed_timeout['http'])
+
+        requester.set_host_limiter(self.get_host_limiter(args))
+        requester.set_connection_pool(self.get_connection_pool(args))
+
+        collector = SelfCollector(requester, dns_resolver, server_reactivity, args)
+
+        collector.set_resolve_cache(self.get_resolve_cache(args))
+
+        return collector
 
     def create_dns_reverse_collector(self, dns_resolver, args):
         return DnsReverseCollector(dns_resolver, args)
@@ -78,12 +217,18 @@ class ObjectFactory(ABC):
         requester = self.create_server_reactivity(args)
 
         if args.icmp:
+            requester.set_icmp_sweeper(self.get_icmp_sweeper(args))
+
             server_reactivities.append(self.create_icmp_collector(requester, args))
 
         if args.tcp:
+            requester.set_tcp_prober(self.get_tcp_prober(args))
+
             server_reactivities.append(self.create_tcp_collector(requester, args))
 
         if args.udp:
+            requester.set_udp_prober(self.get_udp_prober(args))
+
             server_reactivities.append(self.create_udp_collector(requester, args))
 
         if args.http:
@@ -95,8 +240,40 @@ class ObjectFactory(ABC):
     def create_server_reactivity(self, args):
         return ServerReactivity(timeout=args.fixed_timeout['reactivity'])
 
+    def get_icmp_sweeper(self, args):
+        if not hasattr(self, 'icmp_sweeper'):
+            self.icmp_sweeper = self.create_icmp_sweeper(args)
+
+        return self.icmp_sweeper
+
+    def create_icmp_sweeper(self, args):
+        if not IcmpSweeper.is_available():
+            logging.log(logging.INFO, 'ICMP_SWEEPER:Unavailable. Fallback to ping command.')
+
+            return None
+
+        return IcmpSweeper(timeout=args.fixed_timeout['reactivity'])
+
+    def get_tcp_prober(self, args):
+        if getattr(self, 'tcp_prober', None) is None:
+            self.tcp_prober = self.create_tcp_prober(args)
+
+        return self.tcp_prober
+
+    def create_tcp_prober(self, args):
+        return TcpProber(timeout=args.fixed_timeout['reactivity'])
+
+    def get_udp_prober(self, args):
+        if getattr(self, 'udp_prober', None) is None:
+            self.udp_prober = self.create_udp_prober(args)
+
+        return self.udp_prober
+
+    def create_udp_prober(self, args):
+        return UdpProber(ServerReactivity.build_query, timeout=args.fixed_timeout['reactivity'])
+
     def create_http(self, args):
-        return HttpRequester(timeout=args.fixed_timeout['reactivity'])
+        return HttpRequester(timeout=args.fixed_timeout['reactivity'], body_limit=args.http_body_limit, head=args.http_head)
 
     def create_icmp_collector(self, requester, args):
         return ICMPCollector(requester, args)
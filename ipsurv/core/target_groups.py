@@ -1,18 +1,27 @@
-import bisect
+import json
+import logging
+import threading
+from multiprocessing.managers import BaseManager
+
 from ipsurv.core.pipeline import Pipeline
 from ipsurv.core.entity import TargetGroup
-from ipsurv.util.network_util import IpUtil
+from ipsurv.util.network_util import IpUtil, IntervalIndex
+from ipsurv.util.sys_util import System
 
 
 class TargetGroups:
     def __init__(self, args, pipeline):
-        self.groups = []
-        self.group_indexes = []
+        self.group_index = IntervalIndex()
 
         self.pipeline = pipeline  # type: Pipeline
 
+        self.group_type = args.group
         self.ignore = True if args.group is None and not args.skip_duplicate else False
 
+        self.pendings = set()  # (begin_int, end_int) of the groups whose surveys haven't succeeded yet.
+
+        self.lock = threading.RLock()
+
     def find_group(self, data, target):
         if self.ignore:
             return None
@@ -22,7 +31,9 @@ class TargetGroups:
         if group is None:
             identifier_int = self.pipeline.get_group_identify(data, target)
 
-            group = self._find_indexes(identifier_int)
+            reserve = self._create_reserve_group(data, target)
+
+            group = self._find_or_reserve(identifier_int, reserve)
 
         if group is not None:
             data.set('group', group.value)
@@ -31,6 +42,26 @@ class TargetGroups:
 
         return group
 
+    def _create_reserve_group(self, data, target):
+        # The group whose range is known before surveying is reserved, so the concurrent rows of the group are skipped.
+        # The range of "network" group is known after surveying. "Pipeline.create_group" is called only after surveying.
+        if self.group_type == 'network':
+            return None
+
+        try:
+            return self._create_group_by_identifier(target, self.group_type, None)
+        except ValueError:
+            return None
+
+    def _find_or_reserve(self, identifier_int, reserve):
+        with self.lock:
+            group = self._find_indexes(identifier_int)
+
+            if group is None and reserve is not None:
+                self._add_pending_indexes(reserve)
+
+        return group
+
     def put_group(self, data, target, group_type, cidr):
         if self.ignore:
             return None
@@ -45,7 +76,38 @@ class TargetGroups:
             data.set('group_int', group.begin_int)
             data.set('group_found', True)
 
-            self._add_indexes(group)
+            with self.lock:
+                self._add_pending_indexes(group)
+
+        return group
+
+    def complete_group(self, data, target):
+        # The group is saved to the group index only after a row of it is surveyed successfully.
+        if self.ignore:
+            return
+
+        self._complete(self.pipeline.get_group_identify(data, target))
+
+    def _complete(self, identifier_int):
+        with self.lock:
+            group = self._find_indexes(identifier_int)
+
+            if group is not None:
+                self.pendings.discard((group.begin_int, group.end_int))
+
+    def put_values(self, data, target, values):
+        if self.ignore:
+            return None
+
+        identifier_int = self.pipeline.get_group_identify(data, target)
+
+        with self.lock:
+            group = self._find_indexes(identifier_int)
+
+            if group is not None and group.values is None:
+                group.values = values
+
+                self._add_indexes(group)
 
         return group
 
@@ -70,38 +132,159 @@ class TargetGroups:
 
         return group
 
-    def _find_indexes(self, identifier_int):
-        found = None
+    def get_buckets(self):
+        with self.lock:
+            return list(self.group_index.values())
+
+    def get_completed_buckets(self):
+        with self.lock:
+            return [bucket for bucket in self.group_index.values() if (bucket[0], bucket[1]) not in self.pendings]
+
+    def put_buckets(self, buckets):
+        with self.lock:
+            for bucket in buckets:
+                self._add_indexes(TargetGroup(*bucket))
+
+    def load(self, path):
+        try:
+            self.put_buckets(self.read_buckets(path))
+        except FileNotFoundError:
+            pass
+        except (ValueError, TypeError):
+            logging.log(logging.INFO, 'Fail to load group index.(' + path + ')')
+
+    @classmethod
+    def read_buckets(cls, path):
+        with open(path, 'r') as f:
+            buckets = json.load(f)
+
+        # [[begin_int, end_int, value, values], ...], "end_int" is None in the group of an IP and "values" is optional.
+        if not isinstance(buckets, list):
+            raise ValueError('Group index must be a list.')
+
+        for bucket in buckets:
+            if not isinstance(bucket, list) or not 3 <= len(bucket) <= 4:
+                raise ValueError('Illegal group bucket.(' + str(bucket) + ')')
 
-        index = bisect.bisect_left(self.group_indexes, identifier_int)
+            begin_int, end_int = bucket[0], bucket[1]
 
-        if index >= 0 and len(self.groups) > index:
-            bucket = self.groups[index]
+            if not cls._is_int(begin_int) or not (end_int is None or cls._is_int(end_int) and begin_int <= end_int):
+                raise ValueError('Illegal group range.(' + str(bucket) + ')')
 
-            (begin_int, end_int, group) = bucket
+            if len(bucket) == 4 and not (bucket[3] is None or isinstance(bucket[3], dict)):
+                raise ValueError('Illegal group values.(' + str(bucket) + ')')
 
-            if end_int is not None:
-                if begin_int <= identifier_int and identifier_int <= end_int:
-                    found = bucket
-            else:
-                if begin_int == identifier_int:
-                    found = bucket
+        return buckets
+
+    @classmethod
+    def _is_int(cls, v):
+        return isinstance(v, int) and not isinstance(v, bool)
+
+    def save(self, path):
+        buckets = self.get_completed_buckets()
+
+        System.replace_file(path, lambda f: json.dump(buckets, f))
+
+    def seed(self, path):
+        # CIDR list. A line per network, and the line beginning with "#" is comment.
+        groups = []
+
+        with open(path, 'r') as f:
+            for line in f:
+                cidr = line.split('#')[0].strip()
+
+                if not cidr:
+                    continue
+
+                try:
+                    begin_int, end_int = IpUtil.get_network_range(cidr)
+                except ValueError:
+                    logging.log(logging.INFO, 'Invalid CIDR of group seed.(' + cidr + ')')
+                    continue
+
+                groups.append((begin_int, end_int, IpUtil.get_ip_from_int(begin_int)))
+
+        self.put_buckets(groups)
+
+    def _find_indexes(self, identifier_int):
+        found = self.group_index.find(identifier_int)
 
         group = None
 
         if found:
-            (begin_int, end_int, value) = found
+            (begin_int, end_int, value, values) = found
 
-            group = TargetGroup(begin_int, end_int, value)
+            group = TargetGroup(begin_int, end_int, value, values)
 
         return group
 
     def _add_indexes(self, group):
-        group_int = group.end_int if group.end_int is not None else group.begin_int
+        # The group without end_int matches the begin_int only.
+        end_int = group.end_int if group.end_int is not None else group.begin_int
+
+        bucket = (group.begin_int, group.end_int, group.value, group.values)
+
+        self.group_index.put(group.begin_int, end_int, bucket)
+
+    def _add_pending_indexes(self, group):
+        self._add_indexes(group)
+
+        self.pendings.add((group.begin_int, group.end_int))
+
+
+class SharedTargetGroups(TargetGroups):
+    def __init__(self, args, pipeline, index):
+        super().__init__(args, pipeline)
+
+        self.index = index  # Proxy of TargetGroupsIndex in the manager process.
+
+    def _find_indexes(self, identifier_int):
+        return self.index.find(identifier_int)
+
+    def _add_indexes(self, group):
+        self.index.add(group)
+
+    def _add_pending_indexes(self, group):
+        self.index.add_pending(group)
+
+    def _find_or_reserve(self, identifier_int, reserve):
+        return self.index.find_or_reserve(identifier_int, reserve)
+
+    def _complete(self, identifier_int):
+        self.index.complete(identifier_int)
+
+    def get_buckets(self):
+        return self.index.get_buckets()
+
+    def get_completed_buckets(self):
+        return self.index.get_completed_buckets()
+
+    def put_buckets(self, buckets):
+        self.index.put_buckets(buckets)
+
+
+class TargetGroupsIndex(TargetGroups):
+    def find(self, identifier_int):
+        with self.lock:
+            return self._find_indexes(identifier_int)
+
+    def add(self, group):
+        with self.lock:
+            self._add_indexes(group)
+
+    def add_pending(self, group):
+        with self.lock:
+            self._add_pending_indexes(group)
+
+    def find_or_reserve(self, identifier_int, reserve):
+        return self._find_or_reserve(identifier_int, reserve)
+
+    def complete(self, identifier_int):
+        self._complete(identifier_int)
+
 
-        index = bisect.bisect_left(self.group_indexes, group_int)
+class TargetGroupsManager(BaseManager):
+    pass
 
-        bucket = (group.begin_int, group.end_int, group.value)
 
-        self.groups.insert(index, bucket)
-        self.group_indexes.insert(index, group_int)
+TargetGroupsManager.register('TargetGroupsIndex', TargetGroupsIndex, exposed=('find', 'add', 'add_pending', 'find_or_reserve', 'complete', 'get_buckets', 'get_completed_buckets', 'put_buckets'))
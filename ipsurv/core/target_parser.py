@@ -28,6 +28,27 @@ class TargetParser(ABC):
         if identify:
             self._identify_target(data, target, args)
 
+        self._complete_target(data, target)
+
+        return target
+
+    async def async_parse(self, data, original, args):
+        # type: (ValueData, str, object) -> Target
+
+        target = self._parse_target(data, original, args)
+
+        identify = self.pipeline.pre_target_identify(data, target)
+
+        if identify:
+            await self._async_identify_target(data, target, args)
+
+        self._complete_target(data, target)
+
+        return target
+
+    def _complete_target(self, data, target):
+        # type: (ValueData, Target) -> None
+
         if target.status != Constant.STATUS_EXIST:
             target.identifier = target.status
 
@@ -39,8 +60,6 @@ class TargetParser(ABC):
 
             System.output_data('TARGET_DATA', target.get_values())
 
-        return target
-
     def _parse_target(self, data, original, args):
         # type: (ValueData, str, object) -> Target
 
@@ -62,6 +81,24 @@ class TargetParser(ABC):
         else:
             target.status = Constant.STATUS_EMPTY
 
+        self._assign_data_ip(data, target)
+
+    async def _async_identify_target(self, data, target, args):
+        # type: (ValueData, Target, object) -> None
+
+        if target.raw:
+            identified = await self._async_identify_target_ip(data, target, args)
+
+            if identified:
+                target.status = Constant.STATUS_EXIST
+        else:
+            target.status = Constant.STATUS_EMPTY
+
+        self._assign_data_ip(data, target)
+
+    def _assign_data_ip(self, data, target):
+        # type: (ValueData, Target) -> None
+
         data.set('ip', target.ip)
         data.set('ip_int', target.identifier_int)
         data.set('port', target.port)
@@ -72,9 +109,47 @@ class TargetParser(ABC):
 
     def _identify_target_ip(self, data, target, args):
         # type: (ValueData, Target, object) -> bool
-        url = self._find_url(target.raw)
+        fqdn_ip = self._split_netloc(target)
+
+        if not fqdn_ip:
+            return False
+
+        ip = self._find_ip(fqdn_ip)
+
+        if not ip:
+            fqdn = self._detect_fqdn(target, fqdn_ip)
 
-        identified = False
+            if fqdn and args.resolve:
+                try:
+                    ip = self.dns_resolver.resolve_ip(fqdn)
+                except Exception:
+                    target.status = Constant.STATUS_RESOLVE_FAIL
+
+        return self._assign_ip(target, ip)
+
+    async def _async_identify_target_ip(self, data, target, args):
+        # type: (ValueData, Target, object) -> bool
+        fqdn_ip = self._split_netloc(target)
+
+        if not fqdn_ip:
+            return False
+
+        ip = self._find_ip(fqdn_ip)
+
+        if not ip:
+            fqdn = self._detect_fqdn(target, fqdn_ip)
+
+            if fqdn and args.resolve:
+                try:
+                    ip = await self.dns_resolver.async_resolve_ip(fqdn)
+                except Exception:
+                    target.status = Constant.STATUS_RESOLVE_FAIL
+
+        return self._assign_ip(target, ip)
+
+    def _split_netloc(self, target):
+        # type: (Target) -> str
+        url = self._find_url(target.raw)
 
         if url:
             target.url = url
@@ -88,30 +163,28 @@ class TargetParser(ABC):
 
         target.port = port
 
-        if fqdn_ip:
-            ip = self._find_ip(fqdn_ip)
+        return fqdn_ip
+
+    def _detect_fqdn(self, target, fqdn_ip):
+        # type: (Target, str) -> str
+        fqdn = self._find_fqdn(fqdn_ip)
 
-            if not ip:
-                fqdn = self._find_fqdn(fqdn_ip)
+        target.fqdn = fqdn
 
-                target.fqdn = fqdn
+        if not fqdn:
+            target.status = Constant.STATUS_ILLEGAL_FORMAT
 
-                if fqdn:
-                    if args.resolve:
-                        try:
-                            ip = self.dns_resolver.resolve_ip(fqdn)
-                        except Exception:
-                            target.status = Constant.STATUS_RESOLVE_FAIL
-                else:
-                    target.status = Constant.STATUS_ILLEGAL_FORMAT
+        return fqdn
 
-            target.identifier = target.ip = ip
+    def _assign_ip(self, target, ip):
+        # type: (Target, str) -> bool
+        target.identifier = target.ip = ip
 
-            if ip:
-                target.identifier_int = IpUtil.get_ip_int(target.identifier)
-                identified = True
+        if ip:
+            target.identifier_int = IpUtil.get_ip_int(target.identifier)
+            return True
 
-        return identified
+        return False
 
     def _assign_data_target(self, data, target):
         # type: (ValueData, Target) -> None
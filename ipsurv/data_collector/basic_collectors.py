@@ -1,7 +1,6 @@
 import re
 
 from ipsurv.data_collector.data_collector import DataCollector
-from ipsurv.util.network_util import DnsUtil
 
 
 class RdapCollector(DataCollector):
@@ -14,16 +13,33 @@ class RdapCollector(DataCollector):
         return 'RDAP'
 
     def request_data(self, target):
-        DnsUtil.resolve(self.requester.get_host(), timeout=self.dns_timeout)
+        self._resolve_host(self.requester.get_host(), self.dns_timeout)
 
         return self.requester.request(target.ip)
 
+    async def async_request_data(self, target):
+        return await self.requester.async_request(target.ip)
+
     def get_requires(self):
         return ['cidr', 'network_start', 'network_end', 'country', 'name', 'handle', 'org', 'address', 'port43', 'description']
 
+    def get_cache_key(self, target):
+        return target.ip
+
     def get_cidr(self, response):
         return response.get('cidr')
 
+    def export_learned(self):
+        server_map = self.requester.server_map
+
+        return server_map.drain_updates() if server_map is not None else None
+
+    def import_learned(self, learned):
+        server_map = self.requester.server_map
+
+        if server_map is not None:
+            server_map.merge(learned)
+
     def build_data(self, target, data, success, response, response_time):
         data.set('rdap_time', response_time)
 
@@ -65,9 +81,15 @@ class DnsTxtCollector(DataCollector):
     def request_data(self, target):
         return self.requester.request_dnstxt(target.ip)
 
+    async def async_request_data(self, target):
+        return await self.requester.async_request_dnstxt(target.ip)
+
     def get_requires(self):
         return ['cidr', 'network_start', 'network_end', 'country', 'rir']
 
+    def get_cache_key(self, target):
+        return target.ip
+
     def get_cidr(self, response):
         return response.get('cidr')
 
@@ -93,13 +115,19 @@ class IpInfoCollector(DataCollector):
         return 'IPINFO'
 
     def request_data(self, target):
-        DnsUtil.resolve(self.requester.get_host(), timeout=self.dns_timeout)
+        self._resolve_host(self.requester.get_host(), self.dns_timeout)
 
         return self.requester.request(target.ip)
 
+    async def async_request_data(self, target):
+        return await self.requester.async_request(target.ip)
+
     def get_requires(self):
         return ['ip', 'hostname', 'country', 'region', 'region', 'postal', 'geo', 'org', 'timezone']
 
+    def get_cache_key(self, target):
+        return target.ip
+
     def build_data(self, target, data, success, response, response_time):
         data.set('ipinfo_time', response_time)
 
@@ -123,6 +151,9 @@ class DnsReverseCollector(DataCollector):
     def request_data(self, target):
         return self.requester.request_reverse(target.ip)
 
+    async def async_request_data(self, target):
+        return await self.requester.async_request_reverse(target.ip)
+
     def get_requires(self):
         return ['hostname']
 
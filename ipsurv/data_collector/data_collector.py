@@ -1,18 +1,45 @@
+import asyncio
 import logging
 import time
 from abc import ABC, abstractmethod
 
 from ipsurv.core.entity import Target, ValueData
+from ipsurv.data_collector.network_cache import NetworkCache
+from ipsurv.data_collector.response_cache import ResponseCache
+from ipsurv.util.network_util import DnsUtil, ResolveCache
 from ipsurv.util.sys_util import System
 
 
 class DataCollector(ABC):
     def __init__(self, requester, args):
         self.requester = requester
+        self.response_cache = None  # type: ResponseCache
+        self.network_cache = None  # type: NetworkCache
+        self.resolve_cache = None  # type: ResolveCache
 
     def initialize(self):
         pass
 
+    def set_response_cache(self, response_cache):
+        self.response_cache = response_cache
+
+    def set_network_cache(self, network_cache):
+        self.network_cache = network_cache
+
+    def set_resolve_cache(self, resolve_cache):
+        self.resolve_cache = resolve_cache
+
+    def _resolve_host(self, host, timeout):
+        if self.resolve_cache is not None:
+            return self.resolve_cache.resolve(host, timeout)
+
+        return DnsUtil.resolve(host, timeout=timeout)
+
+    def get_cache_key(self, target):
+        # type: (Target) -> str
+
+        return None
+
     @abstractmethod
     def get_name(self):  # pragma: no cover
         return ''
@@ -26,21 +53,95 @@ class DataCollector(ABC):
 
         begin_time = time.time()
 
-        success = False
-        response = {}
+        response = self._load_cache(name, target)
+
+        if response is not None:
+            return self._complete_request(name, True, response, begin_time)
 
         try:
             (success, response) = self.request_data(target)
         except Exception as e:
-            error_name = name + ' ERROR'
-            error = str(e)
-            response['error'] = error
+            success, response = self._catch_error(name, e)
+
+        self._save_cache(name, target, success, response)
+
+        return self._complete_request(name, success, response, begin_time)
+
+    async def async_request(self, target):
+        # type: (Target) -> tuple
+
+        name = self.get_name()
+
+        logging.info('REQUEST ' + name + '...')
+
+        begin_time = time.time()
+
+        response = self._load_cache(name, target)
+
+        if response is not None:
+            return self._complete_request(name, True, response, begin_time)
+
+        try:
+            (success, response) = await self.async_request_data(target)
+        except Exception as e:
+            success, response = self._catch_error(name, e)
+
+        self._save_cache(name, target, success, response)
+
+        return self._complete_request(name, success, response, begin_time)
 
-            if System.get_log_level() == logging.INFO:
-                logging.log(logging.INFO, error_name + ':' + error)
-            else:
-                logging.log(logging.DEBUG, error_name, exc_info=True)
+    def _load_cache(self, name, target):
+        if self.network_cache is not None and target.ip:
+            response = self.network_cache.get(name, target.ip)
 
+            if response is not None:
+                logging.log(logging.INFO, name + ':NETWORK_CACHE_HIT')
+
+                return response
+
+        key = self.get_cache_key(target) if self.response_cache is not None else None
+
+        if not key:
+            return None
+
+        response = self.response_cache.get(name, key)
+
+        if response is not None:
+            logging.log(logging.INFO, name + ':CACHE_HIT')
+
+            self._save_network_cache(name, response)
+
+        return response
+
+    def _save_cache(self, name, target, success, response):
+        if not success:
+            return
+
+        key = self.get_cache_key(target) if self.response_cache is not None else None
+
+        if key:
+            self.response_cache.put(name, key, response)
+
+        self._save_network_cache(name, response)
+
+    def _save_network_cache(self, name, response):
+        cidr = self.get_cidr(response) if self.network_cache is not None else None
+
+        if cidr:
+            self.network_cache.put(name, cidr, response)
+
+    def _catch_error(self, name, e):
+        error_name = name + ' ERROR'
+        error = str(e)
+
+        if System.get_log_level() == logging.INFO:
+            logging.log(logging.INFO, error_name + ':' + error)
+        else:
+            logging.log(logging.DEBUG, error_name, exc_info=True)
+
+        return False, {'error': error}
+
+    def _complete_request(self, name, success, response, begin_time):
         response_time = self._get_measure_time(begin_time)
 
         if System.is_logging():
@@ -57,6 +158,13 @@ class DataCollector(ABC):
 
         return None, None
 
+    async def async_request_data(self, target):
+        # type: (Target) -> tuple
+
+        loop = asyncio.get_running_loop()
+
+        return await loop.run_in_executor(None, self.request_data, target)
+
     @abstractmethod
     def get_requires(self):  # pragma: no cover
         return []
@@ -64,6 +172,13 @@ class DataCollector(ABC):
     def get_cidr(self, response):
         return None
 
+    def export_learned(self):
+        # The state learned in a worker process, which is merged into the parent process.
+        return None
+
+    def import_learned(self, learned):
+        pass
+
     @abstractmethod
     def build_data(self, target, data, success, response, response_time):  # pragma: no cover
         # type: (Target, ValueData, bool, dict, float) -> None
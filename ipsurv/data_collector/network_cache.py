@@ -0,0 +1,38 @@
+import logging
+import threading
+
+from ipsurv.util.network_util import PrefixIndex
+
+
+class NetworkCache:
+    def __init__(self):
+        self.indexes = {}
+
+        self.hits = {}
+
+        self.lock = threading.Lock()
+
+    def get(self, name, ip):
+        index = self.indexes.get(name)
+
+        response = index.find(ip) if index is not None else None
+
+        if response is not None:
+            with self.lock:
+                self.hits[name] = self.hits.get(name, 0) + 1
+
+        return response
+
+    def put(self, name, cidr, response):
+        try:
+            with self.lock:
+                if name not in self.indexes:
+                    self.indexes[name] = PrefixIndex()
+
+                self.indexes[name].put(cidr, response)
+        except ValueError:
+            logging.log(logging.DEBUG, 'Illegal network:' + str(cidr))
+
+    def get_stats(self):
+        with self.lock:
+            return {name: (self.hits.get(name, 0), len(index)) for name, index in sorted(self.indexes.items())}
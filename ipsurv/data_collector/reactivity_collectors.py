@@ -94,12 +94,11 @@ class HttpCollector(DataCollector):
 
         logging.log(logging.INFO, 'HTTP requesting(' + url + ')...')
 
-        success, response = self.requester.request(url)
-
+        # The body isn't necessary for the output.
         if self.http == 2:
-            response['http_h2'] = self.requester.request_alpn_h2(url)
+            return self.requester.request_h2(url, keep_body=False)
 
-        return success, response
+        return self.requester.request(url, keep_body=False)
 
     def get_requires(self):
         return ['http', 'http_status', 'http_size', 'http_h2']
@@ -0,0 +1,98 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+
+class ResponseCache:
+    EVICT_INTERVAL = 1000
+
+    def __init__(self, path, ttls=None, max_size=100000):
+        self.path = path
+        self.ttls = ttls if ttls is not None else {}
+        self.max_size = max_size
+
+        self.conn = None
+        self.pid = None
+        self.puts = 0
+
+        self.hits = {}
+        self.misses = {}
+
+        self.lock = threading.Lock()
+
+    def get(self, name, key):
+        ttl = self.get_ttl(name)
+
+        with self.lock:
+            conn = self._get_connection()
+
+            row = conn.execute('SELECT value, created FROM responses WHERE name = ? AND key = ?', (name, key)).fetchone()
+
+            if row is not None and (ttl <= 0 or time.time() - row[1] <= ttl):
+                self._count(self.hits, name)
+
+                return json.loads(row[0])
+
+            self._count(self.misses, name)
+
+        return None
+
+    def put(self, name, key, response):
+        value = json.dumps(response)
+
+        with self.lock:
+            conn = self._get_connection()
+
+            conn.execute('REPLACE INTO responses (name, key, value, created) VALUES (?, ?, ?, ?)', (name, key, value, time.time()))
+
+            self.puts += 1
+
+            if self.puts % self.EVICT_INTERVAL == 0:
+                self._evict(conn)
+
+    def get_ttl(self, name):
+        return self.ttls.get(name.lower(), self.ttls.get('*', 0))
+
+    def get_stats(self):
+        with self.lock:
+            names = set(self.hits.keys()) | set(self.misses.keys())
+
+            return {name: (self.hits.get(name, 0), self.misses.get(name, 0)) for name in sorted(names)}
+
+    def close(self):
+        with self.lock:
+            if self.conn is not None and self.pid == os.getpid():
+                self._evict(self.conn)
+
+                self.conn.close()
+
+            self.conn = None
+
+    def _get_connection(self):
+        # A connection mustn't be shared with forked processes.
+        if self.conn is None or self.pid != os.getpid():
+            self.conn = sqlite3.connect(self.path, timeout=10.0, isolation_level=None, check_same_thread=False)
+            self.pid = os.getpid()
+
+            self.conn.execute('PRAGMA journal_mode=WAL')
+            self.conn.execute('CREATE TABLE IF NOT EXISTS responses (name TEXT, key TEXT, value TEXT, created REAL, PRIMARY KEY (name, key))')
+            self.conn.execute('CREATE INDEX IF NOT EXISTS responses_created ON responses (created)')
+
+        return self.conn
+
+    def _evict(self, conn):
+        if self.max_size <= 0:
+            return
+
+        num = conn.execute('SELECT COUNT(*) FROM responses').fetchone()[0]
+
+        if num > self.max_size:
+            conn.execute('DELETE FROM responses WHERE rowid IN (SELECT rowid FROM responses ORDER BY created LIMIT ?)', (num - self.max_size,))
+
+            logging.log(logging.DEBUG, 'CACHE_EVICT:' + str(num - self.max_size))
+
+    def _count(self, counts, name):
+        counts[name] = counts.get(name, 0) + 1
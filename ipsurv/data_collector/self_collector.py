@@ -1,7 +1,6 @@
 import random
 
 from ipsurv.data_collector.data_collector import DataCollector
-from ipsurv.util.network_util import DnsUtil
 
 
 class SelfCollector(DataCollector):
@@ -19,7 +18,7 @@ class SelfCollector(DataCollector):
         return []
 
     def request_data(self, target):
-        DnsUtil.resolve(self.requester.get_host(), timeout=self.dns_timeout)
+        self._resolve_host(self.requester.get_host(), self.dns_timeout)
 
         success, response = self.requester.request(None)
 
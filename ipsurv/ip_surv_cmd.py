@@ -1,9 +1,11 @@
+import itertools
 import logging
 
 from ipsurv.configs import Config, Constant
 from ipsurv.core.pipeline import Pipeline
 from ipsurv.survey_ips import SurveyIps
 from ipsurv.survey_self import SurveySelf
+from ipsurv.util.network_util import DnsUtil
 from ipsurv.util.sys_util import System
 from ipsurv import __version__
 
@@ -26,12 +28,13 @@ class IpSurvCmd:
 
         data_factory = self.factory.create_value_data_factory(args, self.config)
 
-        num = len(rows)
-        mode = self._detect_survey_mode(num, rows)
+        heads, rows = self._peek_rows(rows)
+
+        mode = self._detect_survey_mode(len(heads), heads)
 
         self.pipeline.begin_process(mode, args, rows)
 
-        if num >= 1:
+        if len(heads) >= 1:
             if mode == Constant.MODE_SURVEY_IPS:
                 self._survey_ips(args, data_factory, serializer, rows)
             else:
@@ -41,6 +44,20 @@ class IpSurvCmd:
 
         self.pipeline.complete_process(mode, args, rows)
 
+    def _peek_rows(self, rows):
+        rows = iter(rows)
+
+        heads = []
+
+        for row in rows:
+            heads.append(row)
+
+            # The second row is only needed to distinguish "self", so a streaming input isn't blocked.
+            if len(heads) >= 2 or 'self' not in row.lower():
+                break
+
+        return heads, itertools.chain(heads, rows)
+
     def _detect_survey_mode(self, num, rows):
         if num == 1 and 'self' in rows[0].lower():
             mode = Constant.MODE_SURVEY_SELF
@@ -65,9 +82,70 @@ class IpSurvCmd:
 
         survey_ips.initialize()
 
+        survey_ips.load_groups(args)
+
         survey_ips.dispatch(rows, args)
 
+        survey_ips.save_groups(args)
+
+        self._complete_survey(args)
+
+    def _complete_survey(self, args):
+        self.factory.get_connection_pool(args).close()
+
+        resolver_pool = self.factory.get_resolver_pool(args)
+
+        stats = resolver_pool.get_stats()
+
+        logging.log(logging.INFO, 'RESOLVER:SUBMITTED:' + str(stats['submitted']) + ',MAX_QUEUED:' + str(stats['max_queued']) + ',TIMEOUT:' + str(stats['timeouts']))
+
+        resolver_pool.shutdown()
+
+        dns_multiplexer = self.factory.get_dns_multiplexer(args)
+
+        if dns_multiplexer is not None:
+            dns_multiplexer.close()
+
+        icmp_sweeper = self.factory.get_icmp_sweeper(args) if args.icmp else None
+
+        if icmp_sweeper is not None:
+            icmp_sweeper.close()
+
+        if args.tcp:
+            self.factory.get_tcp_prober(args).close()
+
+        if args.udp:
+            self.factory.get_udp_prober(args).close()
+
+        throttled = self.factory.get_host_limiter(args).get_throttled()
+
+        for host, (count, seconds) in throttled.items():
+            logging.log(logging.INFO, 'THROTTLED:' + host + ',COUNT:' + str(count) + ',TIME(s):' + str(round(seconds, 2)))
+
+        response_cache = self.factory.get_response_cache(args)
+
+        if response_cache is not None:
+            for name, (hits, misses) in response_cache.get_stats().items():
+                logging.log(logging.INFO, 'CACHE:' + name + ',HIT:' + str(hits) + ',MISS:' + str(misses))
+
+            response_cache.close()
+
+        network_cache = self.factory.get_network_cache(args)
+
+        if network_cache is not None:
+            for name, (hits, num) in network_cache.get_stats().items():
+                logging.log(logging.INFO, 'NETWORK_CACHE:' + name + ',HIT:' + str(hits) + ',NETWORKS:' + str(num))
+
+        if args.rdap_map and 'rdap' in args.fixed_collectors:
+            server_map = self.factory.get_rdap_server_map(args)
+
+            logging.log(logging.INFO, 'RDAP_MAP:' + str(len(server_map)))
+
+            server_map.save(args.rdap_map)
+
     def _build(self, args, data_factory, serializer):
+        DnsUtil.set_pool(self.factory.get_resolver_pool(args))
+
         dns_resolver = self.factory.create_dns_resolver(args)
 
         target_parser = self.factory.create_target_parser(args, self.pipeline, dns_resolver)
@@ -0,0 +1,221 @@
+import concurrent.futures
+import dns.exception
+import dns.flags
+import dns.message
+import dns.query
+import dns.rcode
+import dns.rdatatype
+import dns.resolver
+import logging
+import os
+import random
+import select
+import socket
+import threading
+import time
+
+
+class DnsMultiplexer:
+    # Sends many queries over one UDP socket. Responses are matched to the queries by the query ID, the nameserver and the question as they arrive.
+    RETRANSMIT_INTERVAL = 1.0
+
+    def __init__(self, nameserver=None, port=53, timeout=4.0, retransmit_interval=RETRANSMIT_INTERVAL):
+        self.nameservers = [nameserver] if isinstance(nameserver, str) else nameserver
+        self.port = port
+        self.timeout = timeout
+        self.retransmit_interval = retransmit_interval
+
+        self.sock = None
+        self.pid = None
+        self.receiver = None
+        self.pending = {}  # query_id: PendingQuery
+
+        self.lock = threading.Lock()
+
+    def query(self, name, rdtype='TXT', timeout=None):
+        future = self._send(name, rdtype)
+
+        return self._wait(future, timeout)
+
+    def query_bulk(self, names, rdtype='TXT', timeout=None):
+        futures = [(name, self._send(name, rdtype)) for name in names]
+
+        deadline = time.time() + (timeout if timeout is not None else self.timeout)
+
+        answers = {}
+
+        for name, future in futures:
+            try:
+                answers[name] = self._wait(future, max(deadline - time.time(), 0))
+            except dns.exception.DNSException as e:
+                answers[name] = e
+
+        return answers
+
+    def _send(self, name, rdtype):
+        query = dns.message.make_query(name, rdtype)
+
+        future = concurrent.futures.Future()
+
+        with self.lock:
+            sock = self._get_socket()
+
+            query.id = self._create_id()
+
+            entry = PendingQuery(query, future, self.get_nameservers()[0])
+
+            self.pending[query.id] = entry
+
+        future.query = query
+
+        sock.sendto(query.to_wire(), (entry.nameserver, self.port))
+
+        return future
+
+    def _wait(self, future, timeout):
+        timeout = timeout if timeout is not None else self.timeout
+
+        try:
+            response, nameserver = future.result(timeout)
+        except concurrent.futures.TimeoutError:
+            with self.lock:
+                self.pending.pop(future.query.id, None)
+
+            raise dns.exception.Timeout(timeout=timeout)
+
+        if response.flags & dns.flags.TC:
+            response = dns.query.tcp(future.query, nameserver, timeout=timeout, port=self.port)
+
+        return self._get_answer(future.query, response, nameserver)
+
+    def _get_answer(self, query, response, nameserver):
+        question = query.question[0]
+
+        rcode = response.rcode()
+
+        if rcode == dns.rcode.NXDOMAIN:
+            raise dns.resolver.NXDOMAIN(qnames=[question.name], responses={question.name: response})
+        elif rcode != dns.rcode.NOERROR:
+            raise dns.resolver.NoNameservers(request=query, errors=[(nameserver, False, self.port, dns.rcode.to_text(rcode), response)])
+
+        for rrset in response.answer:
+            if rrset.rdtype == question.rdtype and rrset.name == question.name:
+                return rrset
+
+        raise dns.resolver.NoAnswer(response=response)
+
+    def _create_id(self):
+        while True:
+            query_id = random.randint(0, 65535)
+
+            if query_id not in self.pending:
+                return query_id
+
+    def _get_socket(self):
+        # A socket and its receiver mustn't be shared with forked processes.
+        if self.sock is None or self.pid != os.getpid():
+            self.sock = socket.socket(self._get_family(self.get_nameservers()[0]), socket.SOCK_DGRAM)
+            self.pid = os.getpid()
+            self.pending = {}
+
+            self.receiver = threading.Thread(target=self._receive, args=(self.sock,), daemon=True)
+            self.receiver.start()
+
+        return self.sock
+
+    def _receive(self, sock):
+        interval = min(self.retransmit_interval, 1.0)
+
+        while True:
+            try:
+                readable, _, _ = select.select([sock], [], [], interval)
+
+                if readable:
+                    wire, address = sock.recvfrom(65535)
+
+                    self._dispatch(wire, address)
+
+                self._retransmit(sock)
+            except (OSError, ValueError):
+                break
+
+    def _dispatch(self, wire, address):
+        try:
+            response = dns.message.from_wire(wire)
+        except dns.exception.DNSException:
+            logging.log(logging.DEBUG, 'DNS_MULTIPLEXER:Broken response.')
+            return
+
+        nameserver, port = address[0], address[1]
+
+        with self.lock:
+            entry = self.pending.get(response.id)
+
+            # A spoofed or stale reply must not resolve a query, so the sender and the question are checked besides the ID.
+            if entry is None or port != self.port or nameserver not in entry.nameservers or not self._is_response(entry.query, response):
+                logging.log(logging.DEBUG, 'DNS_MULTIPLEXER:Unexpected response.')
+                return
+
+            del self.pending[response.id]
+
+        entry.future.set_result((response, nameserver))
+
+    def _is_response(self, query, response):
+        return query.is_response(response) and response.question == query.question
+
+    def _retransmit(self, sock):
+        # Unanswered queries are sent again, to the next nameserver in turn, until the waiter times out.
+        now = time.time()
+
+        nameservers = self.get_nameservers()
+
+        retransmits = []
+
+        with self.lock:
+            for entry in self.pending.values():
+                if now - entry.sent_time >= self.retransmit_interval:
+                    entry.attempts += 1
+                    entry.nameserver = nameservers[entry.attempts % len(nameservers)]
+                    entry.nameservers.add(entry.nameserver)
+                    entry.sent_time = now
+
+                    retransmits.append((entry.query.to_wire(), entry.nameserver))
+
+        for wire, nameserver in retransmits:
+            logging.log(logging.DEBUG, 'DNS_MULTIPLEXER:Retransmit to ' + nameserver)
+
+            sock.sendto(wire, (nameserver, self.port))
+
+    def get_nameservers(self):
+        if self.nameservers is None:
+            nameservers = dns.resolver.Resolver().nameservers
+
+            # One socket serves all nameservers, so the failover is limited to the family of the first one.
+            family = self._get_family(nameservers[0])
+
+            self.nameservers = [nameserver for nameserver in nameservers if self._get_family(nameserver) == family]
+
+        return self.nameservers
+
+    def _get_family(self, nameserver):
+        return socket.AF_INET6 if ':' in nameserver else socket.AF_INET
+
+    def close(self):
+        with self.lock:
+            sock = self.sock if self.pid == os.getpid() else None
+
+            self.sock = None
+            self.pending = {}
+
+        if sock is not None:
+            sock.close()
+
+
+class PendingQuery:
+    def __init__(self, query, future, nameserver):
+        self.query = query
+        self.future = future
+        self.nameserver = nameserver
+        self.nameservers = {nameserver}
+        self.attempts = 0
+        self.sent_time = time.time()
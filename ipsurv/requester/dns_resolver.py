@@ -1,15 +1,28 @@
+import dns.asyncresolver
+import dns.exception
 import dns.resolver
+import dns.reversename
 import ipaddress
+import socket
 
+from ipsurv.requester.dns_multiplexer import DnsMultiplexer
 from ipsurv.requester.requester import Requester
 from ipsurv.util.network_util import DnsUtil
 
 
 class DnsResolveRequester(Requester):
+    HOST_DNS = 'dns'
+    HOST_DNSTXT = 'origin.asn.cymru.com'
+
     def __init__(self, resolver=None, timeout=4.0):
         super().__init__(timeout)
 
         self.resolver = resolver
+        self.async_resolver = None
+        self.multiplexer = None  # type: DnsMultiplexer
+
+    def set_multiplexer(self, multiplexer):
+        self.multiplexer = multiplexer
 
     def request_resolve(self, hostname):
         success = False
@@ -24,32 +37,75 @@ class DnsResolveRequester(Requester):
         return success, response
 
     def resolve_ip(self, hostname, port=None):
-        ip = DnsUtil.resolve(hostname, port, timeout=self.timeout)
+        with self._limit_host(self.HOST_DNS):
+            ip = DnsUtil.resolve(hostname, port, timeout=self.timeout)
 
         return ip
 
     def request_reverse(self, ip):
-        hostname = DnsUtil.reverse(ip, timeout=self.timeout)
+        # A reverse lookup times out when the nameservers of the PTR zone are dead, so it doesn't slow down the other lookups.
+        with self._limit_host(self.HOST_DNS, backoff=False):
+            hostname = DnsUtil.reverse(ip, timeout=self.timeout)
 
         response = {'hostname': hostname}
         success = True
 
         return success, response
 
+    async def async_resolve_ip(self, hostname):
+        resolver = self.get_async_resolver()
+
+        async with self._async_limit_host(self.HOST_DNS):
+            answer = await resolver.resolve(hostname, 'A', lifetime=self.timeout)
+
+        return str(answer[0])
+
+    async def async_request_reverse(self, ip):
+        resolver = self.get_async_resolver()
+
+        async with self._async_limit_host(self.HOST_DNS, backoff=False):
+            answer = await resolver.resolve_address(ip, lifetime=self.timeout)
+
+        response = {'hostname': str(answer[0]).rstrip('.')}
+        success = True
+
+        return success, response
+
     # "15169 | 8.8.8.0/24 | US | arin | 2023-12-28"
     def request_dnstxt(self, ip):
-        server = 'origin.asn.cymru.com'
+        if self.multiplexer is not None:
+            with self._limit_host(self.HOST_DNSTXT):
+                tv = self.multiplexer.query(self._create_dnstxt_name(ip), 'TXT', self.timeout)
+
+            return self._parse_dnstxt(tv)
 
         resolver = self.get_resolver()
 
         resolver.lifetime = self.timeout
 
-        reversed_ip = str(dns.reversename.from_address(ip, v4_origin=None))
+        with self._limit_host(self.HOST_DNSTXT):
+            tv = resolver.query(self._create_dnstxt_name(ip), 'TXT')
+
+        return self._parse_dnstxt(tv)
+
+    async def async_request_dnstxt(self, ip):
+        resolver = self.get_async_resolver()
 
-        v = reversed_ip + '.' + server
+        async with self._async_limit_host(self.HOST_DNSTXT):
+            tv = await resolver.resolve(self._create_dnstxt_name(ip), 'TXT', lifetime=self.timeout)
 
-        tv = resolver.query(v, 'TXT')
+        return self._parse_dnstxt(tv)
+
+    def _is_overload_error(self, e):
+        # Nonexistent names are normal answers, so only timeouts and server failures slow down the pace.
+        return isinstance(e, (socket.timeout, dns.exception.Timeout, dns.resolver.NoNameservers))
+
+    def _create_dnstxt_name(self, ip):
+        reversed_ip = str(dns.reversename.from_address(ip, v4_origin=None))
 
+        return reversed_ip + '.' + self.HOST_DNSTXT
+
+    def _parse_dnstxt(self, tv):
         vals = str(tv[0]).strip("\"'\t ").split('|')
 
         vals = list(map(lambda v: v.strip(), vals))
@@ -77,3 +133,16 @@ class DnsResolveRequester(Requester):
             self.resolver.timeout = self.timeout
 
         return self.resolver
+
+    def get_multiplexer(self):
+        if self.multiplexer is None:
+            self.multiplexer = DnsMultiplexer(timeout=self.timeout)
+
+        return self.multiplexer
+
+    def get_async_resolver(self):
+        if self.async_resolver is None:
+            self.async_resolver = dns.asyncresolver.Resolver()
+            self.async_resolver.timeout = self.timeout
+
+        return self.async_resolver
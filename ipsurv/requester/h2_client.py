@@ -0,0 +1,326 @@
+import struct
+
+
+class H2Client:
+    # Minimal HTTP/2 client for one GET request over a socket which negotiated "h2" by ALPN.
+    PREFACE = b'PRI * HTTP/2.0\r\n\r\nSM\r\n\r\n'
+
+    DATA = 0x0
+    HEADERS = 0x1
+    RST_STREAM = 0x3
+    SETTINGS = 0x4
+    PING = 0x6
+    GOAWAY = 0x7
+    WINDOW_UPDATE = 0x8
+    CONTINUATION = 0x9
+
+    END_STREAM = 0x1
+    ACK = 0x1
+    END_HEADERS = 0x4
+    PADDED = 0x8
+    PRIORITY = 0x20
+
+    MAX_WINDOW = 0x7fffffff
+    DEFAULT_WINDOW = 65535
+
+    # HPACK static table entries of ":status".
+    STATUSES = {8: 200, 9: 204, 10: 206, 11: 304, 12: 400, 13: 404, 14: 500}
+
+    # Static table indexes of the decoded fields.
+    NAMES = {8: ':status', 9: ':status', 10: ':status', 11: ':status', 12: ':status', 13: ':status', 14: ':status', 28: 'content-length', 46: 'location'}
+
+    # Huffman code lengths of the symbols 0-256(EOS) in RFC 7541 Appendix B. The codes are canonical, so they are made from the lengths.
+    HUFFMAN_LENGTHS = (
+        13, 23, 28, 28, 28, 28, 28, 28, 28, 24, 30, 28, 28, 30, 28, 28, 28, 28, 28, 28, 28, 28, 30, 28, 28, 28, 28, 28, 28, 28, 28, 28,
+        6, 10, 10, 12, 13, 6, 8, 11, 10, 10, 8, 11, 8, 6, 6, 6, 5, 5, 5, 6, 6, 6, 6, 6, 6, 6, 7, 8, 15, 6, 12, 10,
+        13, 6, 7, 7, 7, 7, 7, 7, 7, 7, 7, 7, 7, 7, 7, 7, 7, 7, 7, 7, 7, 7, 7, 7, 8, 7, 8, 13, 19, 13, 14, 6,
+        15, 5, 6, 5, 6, 5, 6, 6, 6, 5, 7, 7, 6, 6, 6, 5, 6, 7, 6, 5, 5, 6, 7, 7, 7, 7, 7, 15, 11, 14, 13, 28,
+        20, 22, 20, 20, 22, 22, 22, 23, 22, 23, 23, 23, 23, 23, 24, 23, 24, 24, 22, 23, 24, 23, 23, 23, 23, 21, 22, 23, 22, 23, 23, 24,
+        22, 21, 20, 22, 22, 23, 23, 21, 23, 22, 22, 24, 21, 22, 23, 23, 21, 21, 22, 21, 23, 22, 23, 23, 20, 22, 22, 22, 23, 22, 22, 23,
+        26, 26, 20, 19, 22, 23, 22, 25, 26, 26, 26, 27, 27, 26, 24, 25, 19, 21, 26, 27, 27, 26, 27, 24, 21, 21, 26, 26, 28, 27, 27, 27,
+        20, 24, 20, 21, 22, 21, 21, 23, 22, 22, 25, 25, 24, 24, 26, 23, 26, 27, 26, 26, 27, 27, 27, 27, 27, 28, 27, 27, 27, 27, 27, 26,
+        30
+    )
+
+    huffman_codes = None
+
+    CANCEL = 0x8
+
+    def __init__(self, sock):
+        self.sock = sock
+        self.buffer = b''
+        self.location = None
+
+    def request(self, host, path, headers=None, limit=0, keep_body=True):
+        # The body is read up to the limit, and returns the body size. "Location" of the response is kept in the location.
+        stream_id = 1
+
+        self._send_preface()
+        self._send_frame(self.HEADERS, self.END_STREAM | self.END_HEADERS, stream_id, self._encode_headers(host, path, headers))
+
+        status = None
+        length = None
+        block = b''
+        chunks = []
+        size = 0
+
+        while True:
+            frame_type, flags, frame_stream_id, payload = self._read_frame()
+
+            if frame_type == self.SETTINGS and not flags & self.ACK:
+                self._send_frame(self.SETTINGS, self.ACK, 0, b'')
+            elif frame_type == self.PING and not flags & self.ACK:
+                self._send_frame(self.PING, self.ACK, 0, payload)
+            elif frame_type == self.GOAWAY:
+                raise ConnectionError('HTTP/2 GOAWAY received.')
+            elif frame_stream_id != stream_id:
+                continue
+            elif frame_type == self.RST_STREAM:
+                raise ConnectionError('HTTP/2 RST_STREAM received.')
+            elif frame_type in (self.HEADERS, self.CONTINUATION):
+                block += self._get_header_block(frame_type, flags, payload)
+
+                if flags & self.END_HEADERS:
+                    # Informational responses(1xx) such as "103 Early Hints" precede the final response.
+                    if status is None:
+                        headers = self._decode_headers(block)
+
+                        status = int(headers[':status']) if headers.get(':status') else None
+                        length = headers.get('content-length')
+
+                        self.location = headers.get('location')
+
+                        if status is not None and status < 200:
+                            status = None
+
+                    block = b''
+            elif frame_type == self.DATA:
+                data = self._strip_padding(flags, payload)
+
+                size += len(data)
+
+                if keep_body:
+                    chunks.append(data)
+
+                if 0 < limit <= size:
+                    # The rest of the body is cancelled, so the connection is reusable.
+                    self._send_frame(self.RST_STREAM, 0, stream_id, struct.pack('!I', self.CANCEL))
+                    break
+
+            if frame_stream_id == stream_id and flags & self.END_STREAM and frame_type in (self.DATA, self.HEADERS):
+                break
+
+        if status is None:
+            raise ConnectionError('HTTP/2 status is not received.')
+
+        body = b''.join(chunks)
+
+        # The size is Content-Length as same as HTTP/1.1, otherwise the read bytes.
+        if length is not None and length.isdigit():
+            size = int(length)
+
+        return status, size, body[:limit] if limit > 0 else body
+
+    def _send_preface(self):
+        # The windows are opened fully, so the server sends the body without waiting for WINDOW_UPDATE.
+        settings = struct.pack('!HI', 0x4, self.MAX_WINDOW)
+
+        self.sock.sendall(self.PREFACE)
+
+        self._send_frame(self.SETTINGS, 0, 0, settings)
+        self._send_frame(self.WINDOW_UPDATE, 0, 0, struct.pack('!I', self.MAX_WINDOW - self.DEFAULT_WINDOW))
+
+    def _send_frame(self, frame_type, flags, stream_id, payload):
+        header = struct.pack('!I', len(payload))[1:] + struct.pack('!BBI', frame_type, flags, stream_id)
+
+        self.sock.sendall(header + payload)
+
+    def _read_frame(self):
+        header = self._read(9)
+
+        length = struct.unpack('!I', b'\x00' + header[:3])[0]
+        frame_type, flags, stream_id = struct.unpack('!BBI', header[3:])
+
+        return frame_type, flags, stream_id & 0x7fffffff, self._read(length)
+
+    def _read(self, n):
+        while len(self.buffer) < n:
+            data = self.sock.recv(65536)
+
+            if not data:
+                raise ConnectionError('HTTP/2 connection closed.')
+
+            self.buffer += data
+
+        data, self.buffer = self.buffer[:n], self.buffer[n:]
+
+        return data
+
+    def _strip_padding(self, flags, payload):
+        if flags & self.PADDED:
+            pad_length = payload[0]
+
+            payload = payload[1:len(payload) - pad_length]
+
+        return payload
+
+    def _get_header_block(self, frame_type, flags, payload):
+        if frame_type == self.HEADERS:
+            payload = self._strip_padding(flags, payload)
+
+            if flags & self.PRIORITY:
+                payload = payload[5:]
+
+        return payload
+
+    def _encode_headers(self, host, path, headers):
+        # Literal representations without Huffman coding. ":method: GET" and ":scheme: https" are indexed.
+        block = b'\x82\x87'
+
+        block += b'\x84' if path == '/' else self._encode_literal(4, path)
+        block += self._encode_literal(1, host)
+
+        for name, value in (headers or {}).items():
+            block += b'\x00' + self._encode_string(name.lower()) + self._encode_string(value)
+
+        return block
+
+    def _encode_literal(self, index, value):
+        return self._encode_integer(index, 4, 0x00) + self._encode_string(value)
+
+    def _encode_string(self, value):
+        value = value.encode('latin-1')
+
+        return self._encode_integer(len(value), 7, 0x00) + value
+
+    def _encode_integer(self, value, prefix, flags):
+        limit = (1 << prefix) - 1
+
+        if value < limit:
+            return bytes([flags | value])
+
+        data = [flags | limit]
+        value -= limit
+
+        while value >= 0x80:
+            data.append((value & 0x7f) | 0x80)
+            value >>= 7
+
+        data.append(value)
+
+        return bytes(data)
+
+    def _decode_integer(self, block, pos, prefix):
+        limit = (1 << prefix) - 1
+
+        value = block[pos] & limit
+        pos += 1
+
+        if value < limit:
+            return value, pos
+
+        shift = 0
+
+        while True:
+            b = block[pos]
+            pos += 1
+
+            value += (b & 0x7f) << shift
+            shift += 7
+
+            if not b & 0x80:
+                return value, pos
+
+    def _decode_status(self, block):
+        status = self._decode_headers(block).get(':status')
+
+        return int(status) if status else None
+
+    def _decode_headers(self, block):
+        # Only ":status", "content-length" and "location" are decoded. Their names are in the static table or literal.
+        headers = {}
+        pos = 0
+
+        while pos < len(block):
+            b = block[pos]
+
+            if b & 0x80:
+                index, pos = self._decode_integer(block, pos, 7)
+
+                if index in self.STATUSES:
+                    headers.setdefault(':status', str(self.STATUSES[index]))
+
+                continue
+            elif b & 0xe0 == 0x20:
+                _, pos = self._decode_integer(block, pos, 5)
+                continue
+
+            index, pos = self._decode_integer(block, pos, 6 if b & 0x40 else 4)
+
+            if index == 0:
+                name, pos = self._decode_string(block, pos)
+
+                name = name.decode('latin-1').lower()
+            else:
+                name = self.NAMES.get(index)
+
+            value, pos = self._decode_string(block, pos)
+
+            if name in (':status', 'content-length', 'location'):
+                headers.setdefault(name, value.decode('latin-1'))
+
+        return headers
+
+    def _decode_string(self, block, pos):
+        huffman = block[pos] & 0x80
+
+        length, pos = self._decode_integer(block, pos, 7)
+
+        value = block[pos:pos + length]
+
+        return self._decode_huffman(value) if huffman else value, pos + length
+
+    def _decode_huffman(self, data):
+        # The bits are matched to the codes bit by bit. The remaining bits are the padding by the EOS prefix.
+        codes = self._get_huffman_codes()
+
+        decoded = bytearray()
+        code = 0
+        length = 0
+
+        for b in data:
+            for shift in range(7, -1, -1):
+                code = (code << 1) | (b >> shift) & 0x1
+                length += 1
+
+                symbol = codes.get((length, code))
+
+                if symbol is not None:
+                    if symbol == 256:
+                        raise ConnectionError('HTTP/2 Huffman EOS is received.')
+
+                    decoded.append(symbol)
+                    code = 0
+                    length = 0
+
+        return bytes(decoded)
+
+    @classmethod
+    def _get_huffman_codes(cls):
+        if cls.huffman_codes is None:
+            codes = {}
+            code = 0
+            prev = 0
+
+            for symbol in sorted(range(len(cls.HUFFMAN_LENGTHS)), key=lambda v: (cls.HUFFMAN_LENGTHS[v], v)):
+                length = cls.HUFFMAN_LENGTHS[symbol]
+
+                code <<= length - prev
+                codes[(length, code)] = symbol
+
+                code += 1
+                prev = length
+
+            cls.huffman_codes = codes
+
+        return cls.huffman_codes
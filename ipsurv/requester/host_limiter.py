@@ -0,0 +1,134 @@
+import asyncio
+import logging
+import threading
+import time
+
+
+class HostLimiter:
+    BACKOFF_MIN = 0.2
+    BACKOFF_MAX = 10.0
+
+    def __init__(self, rates=None, max_inflights=None, burst=1.0):
+        self.rates = rates if rates is not None else {}
+        self.max_inflights = max_inflights if max_inflights is not None else {}
+        self.burst = burst
+
+        self.buckets = {}
+        self.semaphores = {}
+
+        self.backoffs = {}  # host: (backoff, paused_until)
+        self.throttled = {}  # host: (count, seconds)
+
+        self.lock = threading.Lock()
+
+    def acquire(self, host):
+        semaphore = self._get_semaphore(host)
+
+        if semaphore is not None:
+            semaphore.acquire()
+
+        wait = self._reserve(host)
+
+        if wait > 0:
+            time.sleep(wait)
+
+    async def async_acquire(self, host):
+        semaphore = self._get_semaphore(host)
+
+        if semaphore is not None:
+            while not semaphore.acquire(blocking=False):
+                await asyncio.sleep(0.01)
+
+        wait = self._reserve(host)
+
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def release(self, host, healthy=True):
+        semaphore = self._get_semaphore(host)
+
+        if semaphore is not None:
+            semaphore.release()
+
+        self._update_backoff(host, healthy)
+
+    def get_throttled(self):
+        with self.lock:
+            return dict(self.throttled)
+
+    def get_rate(self, host):
+        return self._get_value(self.rates, host)
+
+    def get_max_inflight(self, host):
+        return int(self._get_value(self.max_inflights, host))
+
+    def _get_value(self, values, host):
+        return values.get(host, values.get('*', 0))
+
+    def _get_semaphore(self, host):
+        with self.lock:
+            if host not in self.semaphores:
+                max_inflight = self.get_max_inflight(host)
+
+                self.semaphores[host] = threading.BoundedSemaphore(max_inflight) if max_inflight > 0 else None
+
+            return self.semaphores[host]
+
+    def _reserve(self, host):
+        rate = self.get_rate(host)
+
+        with self.lock:
+            now = time.time()
+
+            wait = 0
+
+            if rate > 0:
+                tokens, updated = self.buckets.get(host, (self.burst, now))
+
+                tokens = min(self.burst, tokens + (now - updated) * rate) - 1
+
+                self.buckets[host] = (tokens, now)
+
+                wait = -tokens / rate if tokens < 0 else 0
+
+            backoff, paused_until = self.backoffs.get(host, (0, 0))
+
+            if backoff > 0:
+                # Requests to an unhealthy host are spaced by the backoff time.
+                begin = max(now + wait, paused_until)
+
+                self.backoffs[host] = (backoff, begin + backoff)
+
+                wait = begin - now
+
+            if wait > 0:
+                count, seconds = self.throttled.get(host, (0, 0))
+
+                self.throttled[host] = (count + 1, seconds + wait)
+
+        if wait > 0:
+            logging.log(logging.DEBUG, 'RATE_LIMIT:' + host + ',WAIT(ms):' + str(round(wait * 1000, 1)))
+
+        return wait
+
+    def _update_backoff(self, host, healthy):
+        # "healthy=None" is the result which doesn't tell the state of the host.
+        if healthy is None:
+            return
+
+        with self.lock:
+            backoff, paused_until = self.backoffs.get(host, (0, 0))
+
+            if healthy:
+                if backoff == 0:
+                    return
+
+                backoff = backoff / 2 if backoff >= self.BACKOFF_MIN * 2 else 0
+            else:
+                backoff = min(max(backoff * 2, self.BACKOFF_MIN), self.BACKOFF_MAX)
+
+                paused_until = max(paused_until, time.time() + backoff)
+
+                logging.log(logging.DEBUG, 'BACKOFF:' + host + ',TIME(ms):' + str(round(backoff * 1000, 1)))
+
+            self.backoffs[host] = (backoff, paused_until)
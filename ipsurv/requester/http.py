@@ -1,3 +1,4 @@
+import http.client
 import logging
 import re
 import socket
@@ -6,14 +7,23 @@ import urllib.parse
 import urllib.request
 import urllib.error
 
+from ipsurv.requester.h2_client import H2Client
 from ipsurv.requester.requester import Requester
 
 
 class HttpRequester(Requester):
-    def __init__(self, timeout=None):
+    CHUNK_SIZE = 65536
+
+    # Redirects are followed up to max_redirections of urllib.request.HTTPRedirectHandler.
+    MAX_REDIRECTS = 10
+    REDIRECT_STATUSES = (301, 302, 303, 307, 308)
+
+    def __init__(self, timeout=None, body_limit=0, head=False):
         super().__init__(timeout)
 
         self.host = None
+        self.body_limit = body_limit
+        self.head = head
 
         self.headers = {
             'User-Agent': 'Requester',
@@ -23,8 +33,8 @@ class HttpRequester(Requester):
     def set_headers(self, headers):
         self.headers = headers
 
-    def request(self, url, encoding='utf-8'):
-        res, body = self.request_http(url)
+    def request(self, url, encoding='utf-8', keep_body=True):
+        res, size, body = self._request_size(url, keep_body)
 
         success = False
         response = {}
@@ -32,33 +42,75 @@ class HttpRequester(Requester):
         if res.status != 0:
             response = {
                 'http_status': res.status,
-                'http_size': len(body),
-                'body': body.decode(encoding)
+                'http_size': size
             }
+
+            if keep_body:
+                response['body'] = body.decode(encoding, errors='replace' if self.body_limit > 0 else 'strict')
+
             success = True
         else:
             raise self._http_exception(res, body)
 
         return success, response
 
-    def request_http(self, url):
+    def _request_size(self, url, keep_body):
+        # HEAD request gets the size by Content-Length without transferring the body.
+        if self.head and not keep_body:
+            res, size, body = self._open_http(url, 'HEAD', False)
+
+            if res.status not in (405, 501) and res.headers.get('Content-Length') is not None:
+                return res, size, body
+
+        return self._open_http(url, 'GET', keep_body)
+
+    def request_http(self, url, method='GET'):
+        res, size, body = self._open_http(url, method, True)
+
+        return res, body
+
+    def _open_http(self, url, method, keep_body):
         url = self._create_url(url)
 
-        logging.info('URL:' + url)
+        logging.info('URL:' + url + (' (' + method + ')' if method != 'GET' else ''))
 
-        req = urllib.request.Request(url)
+        req = urllib.request.Request(url, method=method)
 
         for name, value in self.headers.items():
             req.add_header(name, value)
 
         try:
             with urllib.request.urlopen(req, timeout=self.timeout) as res:
-                body = res.read()
+                size, body = self._read_body(res, keep_body)
         except urllib.error.URLError as e:
             res = e
-            body = res.read()
+            size, body = self._read_body(res, keep_body)
 
-        return res, body
+        return res, size, body
+
+    def _read_body(self, res, keep_body):
+        # The body is read by chunks up to the limit. It isn't buffered unless it's kept.
+        length = res.headers.get('Content-Length') if res.headers is not None else None
+
+        chunks = []
+        num = 0
+
+        while self.body_limit <= 0 or num < self.body_limit:
+            n = self.CHUNK_SIZE if self.body_limit <= 0 else min(self.CHUNK_SIZE, self.body_limit - num)
+
+            chunk = res.read(n)
+
+            if not chunk:
+                break
+
+            num += len(chunk)
+
+            if keep_body:
+                chunks.append(chunk)
+
+        size = int(length) if length is not None and length.isdigit() else num
+
+        return size, b''.join(chunks)
 
     def request_alpn_h2(self, url, port=443):
         url = self._create_url(url)
@@ -82,6 +134,77 @@ class HttpRequester(Requester):
 
         return 0
 
+    def request_h2(self, url, encoding='utf-8', keep_body=True):
+        # One TLS connection negotiates ALPN and requests. Only https URL is possible, otherwise ALPN is checked by another connection.
+        # Redirects are followed by one connection per hop as same as urllib.
+        url = self._create_url(url)
+
+        for _ in range(self.MAX_REDIRECTS + 1):
+            parsed_url = urllib.parse.urlparse(url)
+
+            if parsed_url.scheme.lower() != 'https':
+                success, response = self.request(url, encoding, keep_body)
+
+                response['http_h2'] = self.request_alpn_h2(url)
+
+                return success, response
+
+            logging.info('URL:' + url)
+
+            status, size, body, location, h2 = self._request_https(parsed_url, keep_body)
+
+            if status not in self.REDIRECT_STATUSES or not location:
+                break
+
+            url = urllib.parse.urljoin(url, location)
+
+        response = {
+            'http_status': status,
+            'http_size': size,
+            'http_h2': h2
+        }
+
+        if keep_body:
+            response['body'] = body.decode(encoding, errors='replace')
+
+        return True, response
+
+    def _request_https(self, parsed_url, keep_body):
+        host = parsed_url.hostname
+        path = parsed_url.path if parsed_url.path else '/'
+
+        if parsed_url.query:
+            path += '?' + parsed_url.query
+
+        context = ssl.create_default_context()
+
+        context.set_alpn_protocols(['h2', 'http/1.1'])
+
+        with socket.create_connection((host, parsed_url.port or 443), timeout=self.timeout) as sock:
+            with context.wrap_socket(sock, server_hostname=host) as ssock:
+                if ssock.selected_alpn_protocol() == 'h2':
+                    client = H2Client(ssock)
+
+                    status, size, body = client.request(parsed_url.netloc, path, self.headers, self.body_limit, keep_body)
+
+                    return status, size, body, client.location, 1
+
+                status, size, body, location = self._request_http1(ssock, parsed_url.netloc, path, keep_body)
+
+                return status, size, body, location, 0
+
+    def _request_http1(self, sock, host, path, keep_body=True):
+        conn = http.client.HTTPSConnection(host, timeout=self.timeout)
+        conn.sock = sock
+
+        conn.request('GET', path, headers=self.headers)
+
+        res = conn.getresponse()
+
+        size, body = self._read_body(res, keep_body)
+
+        return res.status, size, body, res.getheader('Location')
+
     def _create_url(self, url):
         if not re.search(r'^https?:\/\/', url, flags=re.IGNORECASE):
             url = 'http://' + url
@@ -0,0 +1,82 @@
+import http.client
+import logging
+import threading
+import time
+
+
+class HttpConnectionPool:
+    def __init__(self, max_size=16, idle_timeout=30.0):
+        self.max_size = max_size
+        self.idle_timeout = idle_timeout
+
+        self.pools = {}  # (host, https): [(conn, released_time)]
+        self.lock = threading.Lock()
+
+    def get(self, host, https=True, timeout=None):
+        key = (host, https)
+
+        now = time.time()
+
+        expires = []
+        conn = None
+
+        with self.lock:
+            pool = self.pools.get(key, [])
+
+            while pool:
+                _conn, released_time = pool.pop()
+
+                if now - released_time < self.idle_timeout:
+                    conn = _conn
+                    break
+
+                expires.append(_conn)
+
+        for _conn in expires:
+            _conn.close()
+
+        if conn is not None:
+            conn.timeout = timeout
+            conn.reused = True
+
+            if conn.sock is not None:
+                conn.sock.settimeout(timeout)
+
+            logging.log(logging.DEBUG, 'HTTP_POOL:REUSE:' + host)
+        else:
+            conn = self.create_connection(host, https, timeout)
+
+        return conn
+
+    def put(self, conn):
+        key = conn.pool_key
+
+        with self.lock:
+            pool = self.pools.setdefault(key, [])
+
+            if len(pool) < self.max_size:
+                pool.append((conn, time.time()))
+
+                return
+
+        conn.close()
+
+    def create_connection(self, host, https=True, timeout=None):
+        if https:
+            conn = http.client.HTTPSConnection(host, timeout=timeout)
+        else:
+            conn = http.client.HTTPConnection(host, timeout=timeout)
+
+        conn.pool_key = (host, https)
+        conn.reused = False
+
+        return conn
+
+    def close(self):
+        with self.lock:
+            pools = self.pools
+            self.pools = {}
+
+        for pool in pools.values():
+            for conn, released_time in pool:
+                conn.close()
@@ -0,0 +1,188 @@
+import concurrent.futures
+import logging
+import os
+import random
+import select
+import socket
+import struct
+import threading
+import time
+
+
+class IcmpSweeper:
+    # Sends ICMP echo requests in process. Many requests are in flight over one socket and replies are matched by IP and sequence.
+    ECHO_REQUEST = 8
+    ECHO_REPLY = 0
+
+    PAYLOAD = b'ipsurv-icmp-echo'
+
+    # Many replies arrive at once. The size is capped by net.core.rmem_max.
+    RCVBUF_SIZE = 4 * 1024 * 1024
+
+    def __init__(self, timeout=4.0):
+        self.timeout = timeout
+
+        self.sock = None
+        self.raw = False
+        self.pid = None
+        self.identifier = 0
+        self.sequence = 0
+        self.pending = {}  # (ip, sequence): future
+
+        self.lock = threading.Lock()
+
+    @classmethod
+    def is_available(cls):
+        try:
+            sock, raw = cls._open_socket()
+
+            sock.close()
+
+            return True
+        except OSError:
+            return False
+
+    def ping(self, ip, timeout=None):
+        future = self._send(ip)
+
+        return self._wait(future, timeout)
+
+    def sweep(self, ips, timeout=None):
+        futures = [(ip, self._send(ip)) for ip in ips]
+
+        deadline = time.time() + (timeout if timeout is not None else self.timeout)
+
+        rtts = {}
+
+        for ip, future in futures:
+            try:
+                rtts[ip] = self._wait(future, max(deadline - time.time(), 0))
+            except socket.timeout:
+                rtts[ip] = None
+
+        return rtts
+
+    def _send(self, ip):
+        future = concurrent.futures.Future()
+
+        with self.lock:
+            sock = self._get_socket()
+
+            sequence = self._create_sequence(ip)
+
+            future.key = (ip, sequence)
+            future.sent = time.time()
+
+            self.pending[future.key] = future
+
+        try:
+            sock.sendto(self._build_packet(self.identifier, sequence), (ip, 0))
+        except OSError as e:
+            with self.lock:
+                self.pending.pop(future.key, None)
+
+            raise e
+
+        return future
+
+    def _wait(self, future, timeout):
+        timeout = timeout if timeout is not None else self.timeout
+
+        try:
+            return future.result(timeout)
+        except concurrent.futures.TimeoutError:
+            with self.lock:
+                self.pending.pop(future.key, None)
+
+            raise socket.timeout('ICMP timeout.')
+
+    def _create_sequence(self, ip):
+        while True:
+            self.sequence = (self.sequence + 1) & 0xffff
+
+            if (ip, self.sequence) not in self.pending:
+                return self.sequence
+
+    def _build_packet(self, identifier, sequence):
+        header = struct.pack('!BBHHH', self.ECHO_REQUEST, 0, 0, identifier, sequence)
+
+        checksum = self._checksum(header + self.PAYLOAD)
+
+        return struct.pack('!BBHHH', self.ECHO_REQUEST, 0, checksum, identifier, sequence) + self.PAYLOAD
+
+    def _checksum(self, data):
+        if len(data) % 2:
+            data += b'\x00'
+
+        total = sum(struct.unpack('!%dH' % (len(data) // 2), data))
+
+        total = (total >> 16) + (total & 0xffff)
+        total += total >> 16
+
+        return ~total & 0xffff
+
+    @classmethod
+    def _open_socket(cls):
+        # Unprivileged ICMP socket by net.ipv4.ping_group_range, otherwise raw socket which requires the privilege.
+        try:
+            return socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_ICMP), False
+        except OSError:
+            return socket.socket(socket.AF_INET, socket.SOCK_RAW, socket.IPPROTO_ICMP), True
+
+    def _get_socket(self):
+        # A socket and its receiver mustn't be shared with forked processes.
+        if self.sock is None or self.pid != os.getpid():
+            self.sock, self.raw = self._open_socket()
+            self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, self.RCVBUF_SIZE)
+            self.pid = os.getpid()
+            self.identifier = random.randint(0, 0xffff)
+            self.pending = {}
+
+            logging.log(logging.DEBUG, 'ICMP_SWEEPER:' + ('RAW' if self.raw else 'DGRAM'))
+
+            threading.Thread(target=self._receive, args=(self.sock, self.raw), daemon=True).start()
+
+        return self.sock
+
+    def _receive(self, sock, raw):
+        while True:
+            try:
+                readable, _, _ = select.select([sock], [], [], 1.0)
+
+                if not readable:
+                    continue
+
+                data, address = sock.recvfrom(65535)
+            except (OSError, ValueError):
+                break
+
+            self._dispatch(data, address[0], raw)
+
+    def _dispatch(self, data, ip, raw):
+        if raw:
+            data = data[(data[0] & 0x0f) * 4:]
+
+        if len(data) < 8:
+            return
+
+        icmp_type, code, checksum, identifier, sequence = struct.unpack('!BBHHH', data[:8])
+
+        # The kernel rewrites the identifier of unprivileged socket and delivers only the replies to the socket.
+        if icmp_type != self.ECHO_REPLY or (raw and identifier != self.identifier):
+            return
+
+        with self.lock:
+            future = self.pending.pop((ip, sequence), None)
+
+        if future is not None:
+            future.set_result(time.time() - future.sent)
+
+    def close(self):
+        with self.lock:
+            sock = self.sock if self.pid == os.getpid() else None
+
+            self.sock = None
+            self.pending = {}
+
+        if sock is not None:
+            sock.close()
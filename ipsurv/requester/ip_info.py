@@ -22,6 +22,14 @@ class IpInfoRequester(Requester):
     def request(self, ip):
         res, body = self.request_ip(ip)
 
+        return self._build_response(res, body)
+
+    async def async_request(self, ip):
+        res, body = await self.async_request_ip(ip)
+
+        return self._build_response(res, body)
+
+    def _build_response(self, res, body):
         success = False
         response = {}
 
@@ -34,28 +42,32 @@ class IpInfoRequester(Requester):
         return success, response
 
     def request_ip(self, ip):
-        if not ip:
-            path = '/json?'
-        else:
-            path = '/' + ip + '/json?'
-
-        if self.token:
-            path += 'token=' + self.token
+        path = self._create_path(ip)
 
         url = 'https://' + self.host + path
         logging.info('IPINFO_URL:' + url)
 
-        conn = self._create_http_connection(self.host)
+        res, body = self._request_http(self.host, path, self.headers)
 
-        try:
-            conn.request('GET', path, headers=self.headers)
+        return res, body
 
-            res = conn.getresponse()
+    async def async_request_ip(self, ip):
+        path = self._create_path(ip)
 
-            body = res.read()
-        except Exception as e:
-            raise e
-        finally:
-            conn.close()
+        url = 'https://' + self.host + path
+        logging.info('IPINFO_URL:' + url)
+
+        res, body = await self._async_request_http(self.host, path, self.headers)
 
         return res, body
+
+    def _create_path(self, ip):
+        if not ip:
+            path = '/json?'
+        else:
+            path = '/' + ip + '/json?'
+
+        if self.token:
+            path += 'token=' + self.token
+
+        return path
@@ -1,9 +1,13 @@
+import ipaddress
 import json
 import logging
 import re
+import threading
 from urllib.parse import urlparse
 
 from ipsurv.requester.requester import Requester
+from ipsurv.util.network_util import PrefixIndex
+from ipsurv.util.sys_util import System
 
 
 class CountryDetector:
@@ -98,6 +102,126 @@ class CountryDetector:
         return code
 
 
+class RdapServerMap:
+    PREFIX_LENGTH = 16
+
+    def __init__(self):
+        self.servers = {}  # octet2: server
+        self.updates = {}  # Learned servers which aren't drained yet.
+
+        self.lock = threading.Lock()
+
+    def get(self, octet2):
+        return self.servers.get(octet2)
+
+    def put(self, octet2, server):
+        with self.lock:
+            if self.servers.get(octet2) == server:
+                return
+
+            self.servers[octet2] = server
+            self.updates[octet2] = server
+
+        logging.log(logging.DEBUG, 'RDAP_MAP:' + str(octet2) + '->' + server)
+
+    def drain_updates(self):
+        with self.lock:
+            updates = self.updates
+            self.updates = {}
+
+        return updates
+
+    def merge(self, servers):
+        with self.lock:
+            self.servers.update(servers)
+
+    def load(self, path):
+        try:
+            with open(path, 'r') as f:
+                servers = json.load(f)
+
+            # {"octet2": server, ...}
+            if not isinstance(servers, dict) or not all(isinstance(v, str) for v in servers.values()):
+                raise ValueError('RDAP map must be an object of the servers.')
+
+            self.servers.update({int(k): v for k, v in servers.items()})
+        except FileNotFoundError:
+            pass
+        except (ValueError, TypeError):
+            logging.log(logging.INFO, 'Fail to load RDAP map.(' + path + ')')
+
+    def save(self, path):
+        with self.lock:
+            servers = {str(k): v for k, v in sorted(self.servers.items())}
+
+        System.replace_file(path, lambda f: json.dump(servers, f))
+
+    def __len__(self):
+        return len(self.servers)
+
+
+class RdapBootstrap:
+    # IANA RDAP bootstrap files. ex: https://data.iana.org/rdap/ipv4.json, ipv6.json
+    def __init__(self):
+        self.index = PrefixIndex()
+
+    def load(self, path):
+        for prefixes, urls in self.read_services(path):
+            server = self._select_url(urls)
+
+            if server is None:
+                continue
+
+            for prefix in prefixes:
+                self.index.put(prefix, server)
+
+        logging.log(logging.DEBUG, 'RDAP_BOOTSTRAP:' + path + ',PREFIXES:' + str(len(self.index)))
+
+    @classmethod
+    def read_services(cls, path):
+        with open(path, 'r') as f:
+            data = json.load(f)
+
+        # {"services": [[[prefix, ...], [url, ...]], ...]}
+        services = data.get('services') if isinstance(data, dict) else None
+
+        if not isinstance(services, list):
+            raise ValueError('RDAP bootstrap must have "services" list.')
+
+        for service in services:
+            if not isinstance(service, list) or len(service) < 2 or not all(isinstance(v, list) for v in service[:2]):
+                raise ValueError('Illegal RDAP bootstrap service.(' + str(service) + ')')
+
+            for prefix in service[0]:
+                ipaddress.ip_network(prefix, strict=False)
+
+        return [(service[0], [url for url in service[1] if isinstance(url, str)]) for service in services]
+
+    def _select_url(self, urls):
+        urls = sorted(urls, key=lambda url: not url.startswith('https:'))
+
+        if not urls:
+            return None
+
+        url = urls[0]
+
+        return url if url.endswith('/') else url + '/'
+
+    def find(self, ip):
+        length, server = self.match(ip)
+
+        return server
+
+    def match(self, ip):
+        try:
+            return self.index.match(ip)
+        except ValueError:
+            return None, None
+
+    def __len__(self):
+        return len(self.index)
+
+
 class RdapRequester(Requester):
     ID_ICANN = 0
     ID_ARIN = 1
@@ -142,13 +266,32 @@ class RdapRequester(Requester):
         self.host = 'rdap.arin.net'
         self.country_detector = country_detector  # type: CountryDetector
         self.fill = fill
+        self.server_map = None  # type: RdapServerMap
+        self.bootstrap = None  # type: RdapBootstrap
+
+    def set_server_map(self, server_map):
+        self.server_map = server_map
+
+    def set_bootstrap(self, bootstrap):
+        self.bootstrap = bootstrap
 
     def detect_server_from_ip(self, ip):
         serial1 = self.get_octet1_by_ip(ip)
 
         server = None
+        length = None
+
+        if self.bootstrap is not None:
+            length, server = self.bootstrap.match(ip)
 
-        if serial1 is not None:
+        # The more specific prefix wins. A learned server covers /16, and a bootstrap entry is mostly /8.
+        if self.server_map is not None and (server is None or length < RdapServerMap.PREFIX_LENGTH):
+            learned = self.server_map.get(self.get_octet2_by_ip(ip))
+
+            if learned is not None:
+                server = learned
+
+        if server is None and serial1 is not None:
             if serial1 in self.COLLATIONS:
                 server_id = self.COLLATIONS[serial1]
 
@@ -195,6 +338,32 @@ class RdapRequester(Requester):
 
         res, body = self.request_ip(url, ip)
 
+        self._learn_server(ip, res)
+
+        return self._build_response(res, body)
+
+    async def async_request(self, ip, url=None):
+        if url is None:
+            url = self.detect_server_from_ip(ip)
+
+        res, body = await self.async_request_ip(url, ip)
+
+        self._learn_server(ip, res)
+
+        return self._build_response(res, body)
+
+    def _learn_server(self, ip, res):
+        # Record the server which answered finally, so the later requests in the same /16 skip the redirects.
+        if self.server_map is None or res is None or res.status != 200:
+            return
+
+        octet2 = self.get_octet2_by_ip(ip)
+        suffix = 'ip/' + ip
+
+        if octet2 is not None and res.url.endswith(suffix):
+            self.server_map.put(octet2, res.url[:-len(suffix)])
+
+    def _build_response(self, res, body):
         success = False
         response = {}
 
@@ -277,37 +446,44 @@ class RdapRequester(Requester):
 
         return res, body
 
-    def request_http(self, url, n=1, max_redirect=5):
+    async def async_request_ip(self, url, ip=None):
+        if ip is not None:
+            url = url + 'ip/' + ip
+
+        logging.info('RDAP_URL:' + url)
+
+        res, body = await self.async_request_http(url)
+
+        return res, body
+
+    async def async_request_http(self, url, n=1, max_redirect=5):
         if n >= max_redirect:
             return None, None
 
         parsed_url = urlparse(url)
-        host = parsed_url.hostname
 
-        conn = self._create_http_connection(host)
+        res, body = await self._async_request_http(parsed_url.hostname, parsed_url.path)
 
-        res = None
-        body = None
+        res.url = url
 
-        redirect = False
+        if res.status in (301, 302, 303, 307, 308):
+            redirect_url = res.getheader('Location')
 
-        try:
-            conn.request('GET', parsed_url.path)
-
-            res = conn.getresponse()
-
-            if res.status == 200:
-                body = res.read()
-            elif res.status in (301, 302, 303, 307, 308):
-                redirect = True
-            else:
-                body = res.read()
-        except Exception as e:
-            raise e
-        finally:
-            conn.close()
-
-        if redirect:
+            res, body = await self.async_request_http(redirect_url, n + 1)
+
+        return res, body
+
+    def request_http(self, url, n=1, max_redirect=5):
+        if n >= max_redirect:
+            return None, None
+
+        parsed_url = urlparse(url)
+
+        res, body = self._request_http(parsed_url.hostname, parsed_url.path)
+
+        res.url = url
+
+        if res.status in (301, 302, 303, 307, 308):
             redirect_url = res.getheader('Location')
 
             res, body = self.request_http(redirect_url, n + 1)
@@ -1,27 +1,246 @@
+import asyncio
 import logging
+import socket
+import ssl
 from abc import ABC
+from contextlib import contextmanager
 import http.client
 
+from ipsurv.requester.host_limiter import HostLimiter
+from ipsurv.requester.http_connection_pool import HttpConnectionPool
+
 
 class Requester(ABC):
     def __init__(self, timeout=None):
         self.timeout = timeout
         self.host = None
+        self.host_limiter = None  # type: HostLimiter
+        self.connection_pool = None  # type: HttpConnectionPool
 
     def get_host(self):
         return self.host
 
+    def set_host_limiter(self, host_limiter):
+        self.host_limiter = host_limiter
+
+    def set_connection_pool(self, connection_pool):
+        self.connection_pool = connection_pool
+
+    def _acquire_host(self, host):
+        if self.host_limiter is not None:
+            self.host_limiter.acquire(host)
+
+    async def _async_acquire_host(self, host):
+        if self.host_limiter is not None:
+            await self.host_limiter.async_acquire(host)
+
+    def _release_host(self, host, healthy=True):
+        if self.host_limiter is not None:
+            self.host_limiter.release(host, healthy)
+
+    @contextmanager
+    def _limit_host(self, host, backoff=True):
+        # "backoff=False" keeps the rate and in-flight limits, but the errors don't change the pace.
+        self._acquire_host(host)
+
+        healthy = True
+
+        try:
+            yield
+        except Exception as e:
+            healthy = not self._is_overload_error(e) if backoff else None
+            raise e
+        finally:
+            self._release_host(host, healthy)
+
+    def _async_limit_host(self, host, backoff=True):
+        # "contextlib.asynccontextmanager" requires Python 3.7.
+        return AsyncHostLimit(self, host, backoff)
+
+    def _is_overload_error(self, e):
+        # Only the errors which a busy server causes slow down the pace. Subclasses widen it for their protocols.
+        if isinstance(e, (socket.timeout, asyncio.TimeoutError, TimeoutError, ConnectionResetError)):
+            return True
+
+        return getattr(e, 'code', None) in (429, 503)
+
+    def _is_healthy_status(self, status):
+        return status != 429 and status < 500
+
     def _create_http_connection(self, host, https=True):
-        if https:
+        self._acquire_host(host)
+
+        if self.connection_pool is not None:
+            conn = self.connection_pool.get(host, https, self.timeout)
+        elif https:
             conn = http.client.HTTPSConnection(host, timeout=self.timeout)
         else:
             conn = http.client.HTTPConnection(host, timeout=self.timeout)
 
+        conn.request_host = host
+
         return conn
 
+    def _release_http_connection(self, conn, healthy=True, res=None):
+        # The connection is kept alive only if the response has been read completely.
+        if self.connection_pool is not None and res is not None and not res.will_close and res.isclosed():
+            self.connection_pool.put(conn)
+        else:
+            conn.close()
+
+        self._release_host(conn.request_host, healthy)
+
+    def _request_http(self, host, path, headers=None, https=True):
+        conn = self._create_http_connection(host, https)
+
+        res = None
+        healthy = False
+
+        try:
+            res, body = self._request_connection(conn, path, headers)
+
+            healthy = self._is_healthy_status(res.status)
+        finally:
+            self._release_http_connection(conn, healthy, res)
+
+        return res, body
+
+    def _request_connection(self, conn, path, headers):
+        headers = headers if headers is not None else {}
+
+        try:
+            conn.request('GET', path, headers=headers)
+
+            res = conn.getresponse()
+        except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+            if not getattr(conn, 'reused', False):
+                raise
+
+            # The kept-alive connection was closed by the server. Retry by new connection.
+            conn.close()
+            conn.reused = False
+
+            conn.request('GET', path, headers=headers)
+
+            res = conn.getresponse()
+
+        return res, res.read()
+
+    async def _async_request_http(self, host, path, headers=None, https=True):
+        await self._async_acquire_host(host)
+
+        healthy = False
+
+        try:
+            res = await self._async_request_connection(host, path, headers, https)
+
+            healthy = self._is_healthy_status(res.status)
+        finally:
+            self._release_host(host, healthy)
+
+        return res, res.body
+
+    async def _async_request_connection(self, host, path, headers, https):
+        port = 443 if https else 80
+        context = ssl.create_default_context() if https else None
+
+        reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port, ssl=context), self.timeout)
+
+        try:
+            lines = ['GET ' + path + ' HTTP/1.1', 'Host: ' + host, 'Connection: close']
+
+            if headers:
+                lines += [name + ': ' + value for name, value in headers.items()]
+
+            writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1'))
+
+            await writer.drain()
+
+            res = await asyncio.wait_for(self._async_read_response(reader), self.timeout)
+        finally:
+            writer.close()
+
+        return res
+
+    async def _async_read_response(self, reader):
+        status_line = await reader.readline()
+
+        vals = status_line.decode('latin-1').strip().split(' ', 2)
+
+        if len(vals) < 2 or not vals[0].startswith('HTTP/'):
+            raise http.client.BadStatusLine(status_line)
+
+        headers = {}
+
+        while True:
+            line = await reader.readline()
+
+            if line in (b'\r\n', b'\n', b''):
+                break
+
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        if headers.get('transfer-encoding', '').lower() == 'chunked':
+            body = await self._async_read_chunked(reader)
+        elif 'content-length' in headers:
+            body = await reader.readexactly(int(headers['content-length']))
+        else:
+            body = await reader.read()
+
+        return AsyncHttpResponse(int(vals[1]), vals[2] if len(vals) > 2 else '', headers, body)
+
+    async def _async_read_chunked(self, reader):
+        body = b''
+
+        while True:
+            line = await reader.readline()
+
+            size = int(line.split(b';')[0].strip(), 16)
+
+            if size == 0:
+                break
+
+            body += await reader.readexactly(size)
+
+            await reader.readline()
+
+        return body
+
     def _http_exception(self, res, body):
         msg = 'Failure response.(Status:' + str(res.status) + ')'
 
         logging.log(logging.DEBUG, msg + '\n' + str(body, 'utf-8'))
 
         return http.client.HTTPException(msg)
+
+
+class AsyncHttpResponse:
+    def __init__(self, status, reason, headers, body):
+        self.status = status
+        self.reason = reason
+        self.headers = headers
+        self.body = body
+
+    def getheader(self, name, default=None):
+        return self.headers.get(name.lower(), default)
+
+
+class AsyncHostLimit:
+    def __init__(self, requester, host, backoff=True):
+        self.requester = requester
+        self.host = host
+        self.backoff = backoff
+
+    async def __aenter__(self):
+        await self.requester._async_acquire_host(self.host)
+
+    async def __aexit__(self, exc_type, e, tb):
+        healthy = True
+
+        if isinstance(e, Exception):
+            healthy = not self.requester._is_overload_error(e) if self.backoff else None
+
+        self.requester._release_host(self.host, healthy)
+
+        return False
@@ -1,15 +1,38 @@
+import ipaddress
 import socket
 import struct
 import subprocess
 
+from ipsurv.requester.icmp_sweeper import IcmpSweeper
 from ipsurv.requester.requester import Requester
+from ipsurv.requester.tcp_prober import TcpProber
+from ipsurv.requester.udp_prober import UdpProber
 
 
 class ServerReactivity(Requester):
     def __init__(self, timeout=4.0):
         super().__init__(timeout)
 
+        self.icmp_sweeper = None  # type: IcmpSweeper
+        self.tcp_prober = None  # type: TcpProber
+        self.udp_prober = None  # type: UdpProber
+
+    def set_icmp_sweeper(self, icmp_sweeper):
+        self.icmp_sweeper = icmp_sweeper
+
+    def set_tcp_prober(self, tcp_prober):
+        self.tcp_prober = tcp_prober
+
+    def set_udp_prober(self, udp_prober):
+        self.udp_prober = udp_prober
+
     def request_icmp(self, host, count=1):
+        if self.icmp_sweeper is not None and self._is_ipv4(host):
+            for i in range(count):
+                self.icmp_sweeper.ping(host, self.timeout)
+
+            return True
+
         timeout = round(self.timeout)
         timeout = timeout if timeout > 0 else 1
 
@@ -19,7 +42,21 @@ class ServerReactivity(Requester):
 
         return success
 
+    def _is_ipv4(self, host):
+        return self._get_ip_version(host) == 4
+
+    def _get_ip_version(self, host):
+        try:
+            return ipaddress.ip_address(host).version
+        except ValueError:
+            return None
+
     def request_tcpport(self, host, port):
+        if self.tcp_prober is not None and self._get_ip_version(host) is not None:
+            self.tcp_prober.probe(host, port, self.timeout)
+
+            return True
+
         success = False
         conn = None
 
@@ -38,7 +75,19 @@ class ServerReactivity(Requester):
 
         return success
 
+    def request_tcpport_batch(self, targets):
+        # targets: [(ip, port)], returns {(ip, port): latency seconds or exception}
+        if self.tcp_prober is None:
+            self.tcp_prober = TcpProber(self.timeout)
+
+        return self.tcp_prober.probe_batch(targets, self.timeout)
+
     def request_udpport(self, host, port):
+        if self.udp_prober is not None and self._get_ip_version(host) is not None:
+            self.udp_prober.probe(host, port, self.timeout)
+
+            return True
+
         success = False
         conn = None
 
@@ -47,7 +96,7 @@ class ServerReactivity(Requester):
 
             conn.settimeout(self.timeout)
 
-            v = self._build_query()
+            v = self.build_query()
 
             conn.sendto(v, (host, port))
 
@@ -61,6 +110,13 @@ class ServerReactivity(Requester):
 
         return success
 
+    def request_udpport_batch(self, targets):
+        # targets: [(ip, port)], returns {(ip, port): latency seconds or exception}
+        if self.udp_prober is None:
+            self.udp_prober = UdpProber(self.build_query, self.timeout)
+
+        return self.udp_prober.probe_batch(targets, self.timeout)
+
     def request_local_ip(self, ip='8.8.8.8', port=53):
         try:
             s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
@@ -71,8 +127,9 @@ class ServerReactivity(Requester):
         except Exception as e:
             return str(e)
 
-    def _build_query(self):
-        transaction_id = b'\x00\x01'
+    @classmethod
+    def build_query(cls, transaction_id=1):
+        transaction_id = struct.pack('>H', transaction_id)
         flags = b'\x01\x00'
 
         questions = struct.pack('>H', 1)
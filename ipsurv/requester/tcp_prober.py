@@ -0,0 +1,179 @@
+import concurrent.futures
+import errno
+import heapq
+import itertools
+import os
+import selectors
+import socket
+import threading
+import time
+
+
+class TcpProber:
+    # Runs many non-blocking connects on one selector(epoll on Linux). A connect completes by writable event or expires by its deadline.
+    def __init__(self, timeout=4.0):
+        self.timeout = timeout
+
+        self.selector = None
+        self.pid = None
+        self.wakeup = None
+        self.requests = []
+        self.serial = itertools.count()
+
+        self.lock = threading.Lock()
+
+    def probe(self, host, port, timeout=None):
+        future = self._start(host, port, timeout)
+
+        return future.result()
+
+    def probe_batch(self, targets, timeout=None):
+        futures = [((host, port), self._start(host, port, timeout)) for host, port in targets]
+
+        results = {}
+
+        for key, future in futures:
+            try:
+                results[key] = future.result()
+            except OSError as e:
+                results[key] = e
+
+        return results
+
+    def _start(self, host, port, timeout):
+        timeout = timeout if timeout is not None else self.timeout
+
+        future = concurrent.futures.Future()
+        future.deadline = time.time() + timeout
+
+        with self.lock:
+            self._initialize()
+
+            self.requests.append((host, port, future))
+
+            wakeup = self.wakeup
+
+        wakeup.send(b'\x00')
+
+        return future
+
+    def _initialize(self):
+        # A selector and its thread mustn't be shared with forked processes.
+        if self.selector is None or self.pid != os.getpid():
+            self.selector = selectors.DefaultSelector()
+            self.pid = os.getpid()
+            self.requests = []
+
+            self.wakeup, receiver = socket.socketpair()
+
+            receiver.setblocking(False)
+
+            self.selector.register(receiver, selectors.EVENT_READ, None)
+
+            threading.Thread(target=self._loop, args=(self.selector, receiver), daemon=True).start()
+
+    def _loop(self, selector, receiver):
+        deadlines = []  # heap of (deadline, serial, future)
+
+        try:
+            while True:
+                timeout = deadlines[0][0] - time.time() if deadlines else 1.0
+
+                events = selector.select(min(max(timeout, 0), 1.0))
+
+                for key, mask in events:
+                    if key.data is None:
+                        if not self._receive_wakeup(receiver):
+                            return
+
+                        self._register_requests(selector, deadlines)
+                    else:
+                        self._complete(selector, key.fileobj, key.data)
+
+                self._expire(selector, deadlines)
+        finally:
+            self._shutdown(selector)
+
+    def _shutdown(self, selector):
+        for key in list(selector.get_map().values()):
+            key.fileobj.close()
+
+            if key.data is not None and not key.data.done():
+                key.data.set_exception(OSError('Prober closed.'))
+
+        selector.close()
+
+    def _receive_wakeup(self, receiver):
+        try:
+            return len(receiver.recv(4096)) > 0
+        except BlockingIOError:
+            return True
+        except OSError:
+            return False
+
+    def _register_requests(self, selector, deadlines):
+        with self.lock:
+            requests = self.requests
+            self.requests = []
+
+        for host, port, future in requests:
+            sock = None
+
+            try:
+                sock = socket.socket(socket.AF_INET6 if ':' in host else socket.AF_INET, socket.SOCK_STREAM)
+                sock.setblocking(False)
+
+                future.sent = time.time()
+
+                err = sock.connect_ex((host, port))
+
+                if err not in (0, errno.EINPROGRESS, errno.EWOULDBLOCK):
+                    raise OSError(err, os.strerror(err))
+
+                selector.register(sock, selectors.EVENT_WRITE, future)
+
+                future.sock = sock
+
+                heapq.heappush(deadlines, (future.deadline, next(self.serial), future))
+            except OSError as e:
+                if sock is not None:
+                    sock.close()
+
+                future.set_exception(e)
+
+    def _complete(self, selector, sock, future):
+        selector.unregister(sock)
+
+        err = sock.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+
+        sock.close()
+
+        if err == 0:
+            future.set_result(time.time() - future.sent)
+        else:
+            future.set_exception(OSError(err, os.strerror(err)))
+
+    def _expire(self, selector, deadlines):
+        now = time.time()
+
+        while deadlines and deadlines[0][0] <= now:
+            deadline, serial, future = heapq.heappop(deadlines)
+
+            if future.done():
+                continue
+
+            selector.unregister(future.sock)
+
+            future.sock.close()
+
+            future.set_exception(socket.timeout('timed out'))
+
+    def close(self):
+        with self.lock:
+            wakeup = self.wakeup if self.pid == os.getpid() else None
+
+            self.selector = None
+            self.wakeup = None
+
+        if wakeup is not None:
+            wakeup.close()
@@ -0,0 +1,210 @@
+import concurrent.futures
+import os
+import select
+import socket
+import threading
+import time
+
+
+class TimerWheel:
+    # Hashed timer wheel. Adding and expiring an entry costs O(1) regardless of the number of entries.
+    def __init__(self, tick=0.05, size=512):
+        self.tick = tick
+        self.size = size
+
+        self.slots = [[] for i in range(size)]
+        self.current = int(time.time() / tick)
+        self.num = 0
+
+    def add(self, deadline, item):
+        index = max(int(deadline / self.tick), self.current)
+
+        self.slots[index % self.size].append((deadline, item))
+        self.num += 1
+
+    def advance(self, now):
+        target = int(now / self.tick)
+
+        # All slots are checked at once after a long interval.
+        self.current = max(self.current, target - self.size)
+
+        expired = []
+
+        # The slots which have passed entirely are expired. The remaining entries belong to the later rounds.
+        while self.current < target:
+            slot = self.slots[self.current % self.size]
+
+            if slot:
+                expired.extend(entry[1] for entry in slot if entry[0] <= now)
+
+                slot[:] = [entry for entry in slot if entry[0] > now]
+
+            self.current += 1
+
+        self.num -= len(expired)
+
+        return expired
+
+    def __len__(self):
+        return self.num
+
+
+class UdpProber:
+    # Sends probes to many hosts over shared UDP sockets. Responses are matched by source address and transaction ID.
+    RCVBUF_SIZE = 4 * 1024 * 1024
+
+    def __init__(self, build_payload, timeout=4.0, tick=0.05):
+        self.build_payload = build_payload
+        self.timeout = timeout
+        self.tick = tick
+
+        self.socks = {}  # family: socket
+        self.pid = None
+        self.generation = 0
+        self.running = False
+        self.wheel = None
+        self.pending = {}  # (ip, port): {transaction_id: future}
+        self.transaction_id = 0
+
+        self.lock = threading.Lock()
+
+    def probe(self, host, port, timeout=None):
+        future = self._send(host, port, timeout)
+
+        return future.result()
+
+    def probe_batch(self, targets, timeout=None):
+        futures = [((host, port), self._send(host, port, timeout)) for host, port in targets]
+
+        results = {}
+
+        for key, future in futures:
+            try:
+                results[key] = future.result()
+            except OSError as e:
+                results[key] = e
+
+        return results
+
+    def _send(self, host, port, timeout):
+        timeout = timeout if timeout is not None else self.timeout
+
+        future = concurrent.futures.Future()
+
+        family = socket.AF_INET6 if ':' in host else socket.AF_INET
+
+        with self.lock:
+            sock = self._get_socket(family)
+
+            self.transaction_id = (self.transaction_id + 1) & 0xffff
+
+            future.key = (host, port)
+            future.transaction_id = self.transaction_id
+            future.sent = time.time()
+
+            self.pending.setdefault(future.key, {})[future.transaction_id] = future
+            self.wheel.add(future.sent + timeout, future)
+
+        try:
+            sock.sendto(self.build_payload(future.transaction_id), (host, port))
+        except OSError as e:
+            self._complete(future, exception=e)
+
+        return future
+
+    def _get_socket(self, family):
+        # Sockets and the receiver mustn't be shared with forked processes.
+        if self.pid != os.getpid():
+            self.socks = {}
+            self.pending = {}
+            self.wheel = TimerWheel(self.tick)
+            self.pid = os.getpid()
+            self.running = False
+
+        if family not in self.socks:
+            self.socks[family] = socket.socket(family, socket.SOCK_DGRAM)
+            self.socks[family].setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, self.RCVBUF_SIZE)
+
+        if not self.running:
+            self.running = True
+
+            threading.Thread(target=self._loop, args=(self.generation,), daemon=True).start()
+
+        return self.socks[family]
+
+    def _loop(self, generation):
+        while True:
+            with self.lock:
+                if self.generation != generation or self.pid != os.getpid():
+                    break
+
+                socks = list(self.socks.values())
+
+            try:
+                readable, _, _ = select.select(socks, [], [], self.tick)
+            except (OSError, ValueError):
+                readable = []
+
+            for sock in readable:
+                self._receive(sock)
+
+            with self.lock:
+                expired = self.wheel.advance(time.time())
+
+            for future in expired:
+                self._complete(future, exception=socket.timeout('timed out'))
+
+    def _receive(self, sock):
+        try:
+            response, address = sock.recvfrom(65535)
+        except OSError:
+            return
+
+        key = (address[0], address[1])
+        transaction_id = int.from_bytes(response[:2], 'big') if len(response) >= 2 else None
+
+        with self.lock:
+            futures = self.pending.get(key, {})
+
+            future = futures.get(transaction_id)
+
+            # A service which doesn't echo the transaction ID is matched by the address only.
+            if future is None and len(futures) == 1:
+                future = next(iter(futures.values()))
+
+        if future is not None:
+            self._complete(future, result=time.time() - future.sent)
+
+    def _complete(self, future, result=None, exception=None):
+        with self.lock:
+            futures = self.pending.get(future.key, {})
+
+            if futures.get(future.transaction_id) is not future:
+                return
+
+            del futures[future.transaction_id]
+
+            if not futures:
+                del self.pending[future.key]
+
+        if exception is not None:
+            future.set_exception(exception)
+        else:
+            future.set_result(result)
+
+    def close(self):
+        with self.lock:
+            socks = self.socks if self.pid == os.getpid() else {}
+            futures = [future for futures in self.pending.values() for future in futures.values()]
+
+            self.socks = {}
+            self.pending = {}
+            self.running = False
+            self.generation += 1
+            self.pid = None
+
+        for future in futures:
+            future.set_exception(OSError('Prober closed.'))
+
+        for sock in socks.values():
+            sock.close()
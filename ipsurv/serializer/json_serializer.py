@@ -50,7 +50,7 @@ class JsonSerializer(Serializer):
 
         append = ',' if self.json_list else ''
 
-        print(r + append)
+        print(r + append, flush=True)
 
     def transform_key_labels(self, data, mode):
         pass
@@ -70,7 +70,7 @@ class LineSerializer(Serializer):
         return line
 
     def output(self, v):
-        print(v)
+        print(v, flush=True)
 
     def transform_key_labels(self, data, mode):
         # type: (ValueData, int) -> None
@@ -92,7 +92,7 @@ class Serializer(ABC):
         self.output(v)
 
     def output(self, v):
-        print(v)
+        print(v, flush=True)
 
     def output_complete(self, mode, args, rows):
         pass
@@ -1,9 +1,14 @@
+import argparse
 import logging
-import time
+import multiprocessing
+import queue
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 
 from ipsurv.configs import Constant
 from ipsurv.core.pipeline import Pipeline
-from ipsurv.core.target_groups import TargetGroups
+from ipsurv.core.target_groups import TargetGroups, SharedTargetGroups, TargetGroupsManager
 from ipsurv.core.target_parser import TargetParser
 from ipsurv.core.entity import HeaderTarget
 from ipsurv.serializer.serializer import Serializer
@@ -11,6 +16,8 @@ from ipsurv.util.sys_util import AppException, System
 
 
 class SurveyIps:
+    IDLE_INTERVAL = 0.1
+
     def __init__(self, args, config, data_factory, target_parser, collectors, reactivities, pipeline, serializer):
         self.config = config
         self.data_factory = data_factory
@@ -23,6 +30,8 @@ class SurveyIps:
         self.pipeline = pipeline  # type: Pipeline
         self.serializer = serializer  # type: Serializer
 
+        self.collect_executor = None
+
     def initialize(self):
         for collector in self.collectors:
             collector.initialize()
@@ -30,10 +39,57 @@ class SurveyIps:
         for reactivity in self.reactivities:
             reactivity.initialize()
 
+    def load_groups(self, args):
+        if self.target_groups.ignore:
+            return
+
+        if args.group_seed:
+            self.target_groups.seed(args.group_seed)
+
+        if args.group_index:
+            self.target_groups.load(args.group_index)
+
+        logging.log(logging.INFO, 'GROUPS:LOADED:' + str(len(self.target_groups.get_buckets())))
+
+    def save_groups(self, args):
+        if self.target_groups.ignore or not args.group_index:
+            return
+
+        self.target_groups.save(args.group_index)
+
+        logging.log(logging.INFO, 'GROUPS:SAVED:' + str(len(self.target_groups.get_completed_buckets())))
+
     def dispatch(self, rows, args):
         if args.headers:
             self._output_headers(args)
 
+        if args.processes > 1:
+            self._dispatch_processes(rows, args)
+        else:
+            self._dispatch_rows(rows, args)
+
+    def _dispatch_rows(self, rows, args):
+        if args.workers > 1:
+            logging.log(logging.INFO, 'WORKERS:' + str(args.workers))
+
+        self._initialize_executor(args)
+
+        try:
+            for row in self._survey_rows(self._iterate_rows(rows, args), args):
+                self.pipeline.output_result(row)
+        finally:
+            self._shutdown_executor()
+
+    def _initialize_executor(self, args):
+        if args.parallel_collect:
+            self.collect_executor = ThreadPoolExecutor(max_workers=(len(self.collectors) + len(self.reactivities)) * max(args.workers, 1))
+
+    def _shutdown_executor(self):
+        if self.collect_executor is not None:
+            self.collect_executor.shutdown(wait=False)
+            self.collect_executor = None
+
+    def _iterate_rows(self, rows, args):
         sequence = 0
 
         for row in rows:
@@ -42,7 +98,152 @@ class SurveyIps:
             if (args.begin > sequence) or (args.end > 0 and args.end < sequence):
                 continue
 
-            self._survey_row(sequence, row, args)
+            yield sequence, row
+
+    def _survey_rows(self, items, args):
+        if args.workers > 1:
+            yield from self._survey_rows_by_workers(items, args)
+        else:
+            for sequence, row in items:
+                yield self._survey_row(sequence, row, args)
+
+    def _survey_rows_by_workers(self, items, args):
+        window = args.workers * 4
+
+        futures = deque()  # Reorder buffer. Results are output by sequence order.
+
+        with ThreadPoolExecutor(max_workers=args.workers) as executor:
+            for item in self._feed_rows(items, window):
+                if item is not None:
+                    sequence, row = item
+
+                    futures.append(executor.submit(self._survey_row, sequence, row, args))
+
+                while futures and (len(futures) >= window or futures[0].done()):
+                    yield futures.popleft().result()
+
+            while futures:
+                yield futures.popleft().result()
+
+    def _feed_rows(self, items, size):
+        # The input is read by a thread. None is yielded while the input is idle, so the finished rows are output without waiting for the next input.
+        rows = queue.Queue(maxsize=size)
+        end = object()
+        errors = []
+
+        def read():
+            try:
+                for item in items:
+                    rows.put(item)
+            except Exception as e:
+                errors.append(e)
+            finally:
+                rows.put(end)
+
+        threading.Thread(target=read, daemon=True).start()
+
+        while True:
+            try:
+                item = rows.get(timeout=self.IDLE_INTERVAL)
+            except queue.Empty:
+                item = None
+
+            if item is end:
+                break
+
+            yield item
+
+        if errors:
+            raise errors[0]
+
+    def _dispatch_processes(self, rows, args):
+        if 'fork' not in multiprocessing.get_all_start_methods():
+            System.warn('`--processes` is not supported on this platform. Rows are surveyed by threads instead.')
+
+            args.workers = max(args.workers, args.processes)
+
+            return self._dispatch_rows(rows, args)
+
+        logging.log(logging.INFO, 'PROCESSES:' + str(args.processes))
+
+        context = multiprocessing.get_context('fork')
+
+        target_groups = self.target_groups
+        manager = self._share_target_groups(context, args)
+
+        window = args.processes * 2
+
+        results = deque()  # Reorder buffer. Chunks are output by sequence order.
+
+        try:
+            with context.Pool(args.processes, initializer=_initialize_process, initargs=(self, args)) as pool:
+                for chunk in self._chunk_rows(self._iterate_rows(rows, args), args):
+                    if chunk:
+                        results.append(pool.apply_async(_survey_chunk, (chunk,)))
+
+                    while results and (len(results) >= window or results[0].ready()):
+                        self._output_chunk(results.popleft().get())
+
+                while results:
+                    self._output_chunk(results.popleft().get())
+
+            if manager is not None and args.group_index:
+                target_groups.put_buckets(self.target_groups.get_completed_buckets())
+        finally:
+            if manager is not None:
+                manager.shutdown()
+
+            self.target_groups = target_groups
+
+    def _share_target_groups(self, context, args):
+        if self.target_groups.ignore:
+            return None
+
+        manager = TargetGroupsManager(ctx=context)
+        manager.start()
+
+        index = manager.TargetGroupsIndex(argparse.Namespace(group=args.group, skip_duplicate=args.skip_duplicate), None)
+
+        index.put_buckets(self.target_groups.get_buckets())
+
+        self.target_groups = SharedTargetGroups(args, self.pipeline, index)
+
+        return manager
+
+    def _chunk_rows(self, items, args):
+        size = max(args.workers, 1) * 8
+
+        chunk = []
+
+        # A partial chunk is sent when the input is idle. An empty chunk lets the finished chunks be output meanwhile.
+        for item in self._feed_rows(items, size):
+            if item is not None:
+                chunk.append(item)
+
+            if item is None or len(chunk) >= size:
+                yield chunk
+                chunk = []
+
+        if chunk:
+            yield chunk
+
+    def _survey_chunk(self, chunk, args):
+        rows = list(self._survey_rows(chunk, args))
+
+        # Such as RDAP servers learned in the worker process.
+        learned = [collector.export_learned() for collector in self.collectors]
+
+        return rows, learned
+
+    def _output_chunk(self, result):
+        rows, learned = result
+
+        for collector, values in zip(self.collectors, learned):
+            if values:
+                collector.import_learned(values)
+
+        for row in rows:
+            self.pipeline.output_result(row)
 
     def _output_headers(self, args):
         headers = self.serializer.create_labels(args.fixed_format_params, args.headers)
@@ -72,9 +273,6 @@ class SurveyIps:
             self._survey_target(data, target, args)
 
             row = self.pipeline.build(data)
-
-            if not target.identifier_int:
-                time.sleep(0.2)  # Buffer time
         except Exception as e:
             level = logging.ERROR if not isinstance(e, AppException) else logging.DEBUG
 
@@ -82,7 +280,7 @@ class SurveyIps:
 
             row = self.pipeline.build_error(str(e))
 
-        self.pipeline.output_result(row)
+        return row
 
     def _survey_target(self, data, target, args):
         self.pipeline.pre_collect(data, target, args)
@@ -90,26 +288,62 @@ class SurveyIps:
         skip = False
 
         if target.status == Constant.STATUS_EXIST:
-            group = self.target_groups.find_group(data, target)
+            skip = self._detect_skip(data, target, args)
 
             requires = []
 
-            if not group or not args.skip_duplicate:
+            if not skip:
                 requires = self._survey_by_collectors(self.collectors, target, args, data, True)
-            else:
-                logging.info('SKIP:IP->' + target.identifier + ',GROUP->' + str(group.value))
-
-                skip = True
 
             if not skip or args.skip_duplicate < 2:
                 requires += self._survey_by_collectors(self.reactivities, target, args, data, False)
 
-            success = self._finish(data, args, requires)
-            data.set('success', success)
+            self._complete_target(data, target, args, requires, skip)
+
+        self._post_collect(data, target, args, skip)
+
+    def _detect_skip(self, data, target, args):
+        group = self.target_groups.find_group(data, target)
 
+        if group and args.skip_duplicate:
+            logging.info('SKIP:IP->' + target.identifier + ',GROUP->' + str(group.value))
+
+            if group.values and args.fill_duplicate:
+                for k, v in group.values.items():
+                    data.set(k, v)
+
+            return True
+
+        return False
+
+    def _complete_target(self, data, target, args, requires, skip=False):
+        values = self._get_group_values(data) if args.fill_duplicate and not skip else None
+
+        success = self._finish(data, args, requires)
+        data.set('success', success)
+
+        # The group of skipped row exists already. Putting it again drops the collected values.
+        if not skip:
             if len(data.get('requests')) == 0:
                 self.target_groups.put_group(data, target, args.group, None)
+            elif values and success:
+                self.target_groups.put_values(data, target, values)
+
+            if success:
+                self.target_groups.complete_group(data, target)
 
+    def _get_group_values(self, data):
+        values = {}
+
+        for k in self.config.GROUP_PARAMS:
+            v = data.get(k)
+
+            if v is not None:
+                values[k] = v
+
+        return values
+
+    def _post_collect(self, data, target, args, skip):
         self.pipeline.post_collect(data, target, args, skip)
 
         if System.is_logging():
@@ -117,6 +351,9 @@ class SurveyIps:
             System.output_data('REQUESTS', data.get('requests'), logging.DEBUG)
 
     def _survey_by_collectors(self, collectors, target, args, data, is_source):
+        if self.collect_executor is not None:
+            return self._survey_by_collectors_parallel(collectors, target, args, data, is_source)
+
         requires = []
 
         for collector in collectors:
@@ -126,41 +363,92 @@ class SurveyIps:
 
         return requires
 
+    def _survey_by_collectors_parallel(self, collectors, target, args, data, is_source):
+        requests = []
+
+        for collector in collectors:
+            name = collector.get_name()
+            requires = collector.get_requires()
+
+            future = None
+
+            if self._prepare_request(data, name, collector, requires, args):
+                future = self.collect_executor.submit(collector.request, target)
+
+            requests.append((collector, name, requires, future))
+
+        requires = []
+
+        for collector, name, _requires, future in requests:
+            requires += _requires
+
+            if future is None:
+                continue
+
+            if not self._need_response(data, name, _requires, args):
+                future.cancel()
+                continue
+
+            success, response, response_time = future.result()
+
+            self._apply_response(data, name, collector, target, args, is_source, success, response, response_time)
+
+        return requires
+
     def _survey_by_collector(self, collector, target, args, data, is_source):
         name = collector.get_name()
         requires = collector.get_requires()
 
+        if self._prepare_request(data, name, collector, requires, args):
+            success, response, response_time = collector.request(target)
+
+            self._apply_response(data, name, collector, target, args, is_source, success, response, response_time)
+
+        return requires
+
+    def _prepare_request(self, data, name, collector, requires, args):
         self.pipeline.pre_request(data, name, collector)
 
         if self._require_request(data, requires) or len(requires) == 0 or args.all_collect:
-            success, response, response_time = collector.request(target)
+            return True
+
+        logging.log(logging.DEBUG, 'UNNECESSARY:' + name)
+
+        return False
 
-            self.pipeline.post_request(data, name, collector, success, response)
+    def _need_response(self, data, name, requires, args):
+        # In parallel collecting, the fields may be filled by preceding collectors while requesting.
+        if self._require_request(data, requires) or len(requires) == 0 or args.all_collect:
+            return True
 
-            if is_source:
-                self._update_group(data, collector, target, args, response)
+        logging.log(logging.DEBUG, 'UNNECESSARY(CANCEL):' + name)
 
-            collector.build_data(target, data, success, response, response_time)
+        return False
 
-            data.update('requests', lambda v: v + [name])
-        else:
-            logging.log(logging.DEBUG, 'UNNECESSARY:' + name)
+    def _apply_response(self, data, name, collector, target, args, is_source, success, response, response_time):
+        self.pipeline.post_request(data, name, collector, success, response)
 
-        return requires
+        if is_source:
+            self._update_group(data, collector, target, args, response)
+
+        collector.build_data(target, data, success, response, response_time)
+
+        data.update('requests', lambda v: v + [name])
 
     def _require_request(self, data, keys):
-        for param in data.get_data().keys():
-            v = data.get(param)
+        for param in keys:
+            if data.has(param):
+                v = data.get(param)
 
-            if ((v is None or v is False) and param in keys):
-                return True
+                if v is None or v is False:
+                    return True
 
         return False
 
     def _finish(self, data, args, requires):
         success = not self._require_request(data, args.fixed_format_params)
 
-        for k, v in data.get_data().items():
+        for k, v in data.items():
             if v is None:
                 if k in requires:
                     v = ''
@@ -179,3 +467,20 @@ class SurveyIps:
 
             if group:
                 logging.info('GROUP:' + str(group.value))
+
+
+_process_survey_ips = None  # type: SurveyIps
+_process_args = None
+
+
+def _initialize_process(survey_ips, args):
+    global _process_survey_ips, _process_args
+
+    _process_survey_ips = survey_ips
+    _process_args = args
+
+    survey_ips._initialize_executor(args)
+
+
+def _survey_chunk(chunk):
+    return _process_survey_ips._survey_chunk(chunk, _process_args)
@@ -89,12 +89,8 @@ class StdinLoader:
         r, _, _ = select([sys.stdin], [], [], timeout)
 
         if r:
-            input_data = sys.stdin.read()
-            lines = input_data.splitlines()
-        else:
-            lines = []
-
-        return lines
+            for line in sys.stdin:
+                yield line.rstrip('\r\n')
 
     @staticmethod
     def load_env(name):
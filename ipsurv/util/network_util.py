@@ -1,6 +1,12 @@
+import concurrent.futures
+import dns.exception
+import dns.resolver
 import ipaddress
+import logging
+import os
 import threading
 import socket
+import time
 
 
 class IpUtil:
@@ -28,14 +34,201 @@ class IpUtil:
         return int(first_ip), int(last_ip)
 
 
+class PrefixIndex:
+    # Longest prefix match by the tables of each prefix length. Lookup cost depends on address bits, not on entries.
+    def __init__(self):
+        self.tables = {4: {}, 6: {}}
+        self.lengths = {4: [], 6: []}
+
+    def put(self, cidr, value):
+        network = ipaddress.ip_network(cidr, strict=False)
+
+        table = self.tables[network.version]
+        length = network.prefixlen
+
+        if length not in table:
+            table[length] = {}
+
+            self.lengths[network.version] = sorted(table.keys(), reverse=True)
+
+        table[length][int(network.network_address)] = value
+
+    def find(self, ip):
+        length, value = self.match(ip)
+
+        return value
+
+    def match(self, ip):
+        # Returns the prefix length and the value of the longest match.
+        ip = ipaddress.ip_address(ip)
+
+        ip_int = int(ip)
+        table = self.tables[ip.version]
+        max_length = ip.max_prefixlen
+
+        for length in self.lengths[ip.version]:
+            mask = ((1 << length) - 1) << (max_length - length)
+
+            value = table[length].get(ip_int & mask)
+
+            if value is not None:
+                return length, value
+
+        return None, None
+
+    def __len__(self):
+        return sum(len(values) for table in self.tables.values() for values in table.values())
+
+
+class IntervalNode:
+    def __init__(self, begin, end, value):
+        self.begin = begin
+        self.end = end
+        self.value = value
+        self.max_end = end
+        self.height = 1
+        self.left = None
+        self.right = None
+
+
+class IntervalIndex:
+    # AVL tree of intervals augmented with the max end of each subtree. Insert is O(log n), stabbing query is O(log n + overlaps).
+    def __init__(self):
+        self.root = None
+        self.num = 0
+
+    def put(self, begin, end, value):
+        self.root = self._insert(self.root, begin, end, value)
+
+    def find(self, point):
+        # The narrowest interval which contains the point, because nested networks are the usual overlaps.
+        found = None
+
+        stack = [self.root]
+
+        while stack:
+            node = stack.pop()
+
+            if node is None or node.max_end < point:
+                continue
+
+            stack.append(node.left)
+
+            if node.begin <= point:
+                if point <= node.end and (found is None or node.end - node.begin < found.end - found.begin):
+                    found = node
+
+                stack.append(node.right)
+
+        return found.value if found is not None else None
+
+    def values(self):
+        # In order of the intervals.
+        stack = []
+        node = self.root
+
+        while stack or node is not None:
+            while node is not None:
+                stack.append(node)
+                node = node.left
+
+            node = stack.pop()
+
+            yield node.value
+
+            node = node.right
+
+    def _insert(self, node, begin, end, value):
+        if node is None:
+            self.num += 1
+
+            return IntervalNode(begin, end, value)
+
+        if (begin, end) == (node.begin, node.end):
+            node.value = value
+
+            return node
+
+        if (begin, end) < (node.begin, node.end):
+            node.left = self._insert(node.left, begin, end, value)
+        else:
+            node.right = self._insert(node.right, begin, end, value)
+
+        return self._balance(node)
+
+    def _balance(self, node):
+        self._update(node)
+
+        balance = self._height(node.left) - self._height(node.right)
+
+        if balance > 1:
+            if self._height(node.left.left) < self._height(node.left.right):
+                node.left = self._rotate_left(node.left)
+
+            node = self._rotate_right(node)
+        elif balance < -1:
+            if self._height(node.right.right) < self._height(node.right.left):
+                node.right = self._rotate_right(node.right)
+
+            node = self._rotate_left(node)
+
+        return node
+
+    def _rotate_left(self, node):
+        pivot = node.right
+
+        node.right = pivot.left
+        pivot.left = node
+
+        self._update(node)
+        self._update(pivot)
+
+        return pivot
+
+    def _rotate_right(self, node):
+        pivot = node.left
+
+        node.left = pivot.right
+        pivot.right = node
+
+        self._update(node)
+        self._update(pivot)
+
+        return pivot
+
+    def _update(self, node):
+        node.height = max(self._height(node.left), self._height(node.right)) + 1
+        node.max_end = max(node.end, self._max_end(node.left), self._max_end(node.right))
+
+    def _height(self, node):
+        return node.height if node is not None else 0
+
+    def _max_end(self, node):
+        return node.max_end if node is not None else -1
+
+    def __len__(self):
+        return self.num
+
+
 class DnsUtil:
+    pool = None
+
     @classmethod
-    def getaddrinfo(cls, hostname, port=None, timeout=8.0):
-        thread = ResolveThread(hostname, port)
+    def get_pool(cls):
+        if cls.pool is None:
+            cls.pool = ResolverPool()
 
-        cls._run(thread, timeout)
+        return cls.pool
 
-        return thread.sockaddr
+    @classmethod
+    def set_pool(cls, pool):
+        cls.pool = pool
+
+    @classmethod
+    def getaddrinfo(cls, hostname, port=None, timeout=8.0):
+        sockaddrs = cls.get_pool().call(socket.getaddrinfo, (hostname, port), timeout)
+
+        return sockaddrs[0][4]
 
     @classmethod
     def resolve(cls, host, port=None, timeout=None):
@@ -45,60 +238,130 @@ class DnsUtil:
 
     @classmethod
     def reverse(cls, ip, timeout=8.0):
-        thread = ReverseThread(ip)
+        vals = cls.get_pool().call(socket.gethostbyaddr, (ip,), timeout)
 
-        cls._run(thread, timeout)
+        return vals[0]
 
-        return thread.hostname
 
-    @classmethod
-    def _run(cls, thread, timeout):
-        thread.start()
+class ResolverPool:
+    MAX_WORKERS = 32
+
+    def __init__(self, max_workers=MAX_WORKERS):
+        self.max_workers = max_workers
 
-        thread.join(timeout)
+        self.executor = None
+        self.pid = None
+
+        self.submitted = 0
+        self.queued = 0
+        self.max_queued = 0
+        self.timeouts = 0
+
+        self.lock = threading.Lock()
+
+    def call(self, fn, args, timeout=None):
+        future = self._submit(fn, args)
+
+        try:
+            return future.result(timeout)
+        except concurrent.futures.TimeoutError:
+            # A waiting lookup is dropped. A running lookup can't be stopped, but it holds only one of the bounded workers.
+            cancelled = future.cancel()
+
+            with self.lock:
+                self.timeouts += 1
+
+                if cancelled:
+                    self.queued -= 1
 
-        if thread.is_alive():
             raise socket.timeout('Socket timeout error.')
-        elif thread.e:
-            raise thread.e
 
+    def _submit(self, fn, args):
+        with self.lock:
+            # An executor mustn't be shared with forked processes.
+            if self.executor is None or self.pid != os.getpid():
+                self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers)
+                self.pid = os.getpid()
 
-class ResolveThread(threading.Thread):
-    def __init__(self, hostname, port=None):
-        super().__init__()
+            self.submitted += 1
+            self.queued += 1
+            self.max_queued = max(self.max_queued, self.queued)
 
-        self.hostname = hostname
-        self.port = port
+            return self.executor.submit(self._run, fn, args)
 
-        self.sockaddr = None
+    def _run(self, fn, args):
+        with self.lock:
+            self.queued -= 1
 
-        self.e = None
-        self.daemon = True
+        return fn(*args)
+
+    def get_stats(self):
+        with self.lock:
+            return {'submitted': self.submitted, 'queued': self.queued, 'max_queued': self.max_queued, 'timeouts': self.timeouts}
+
+    def shutdown(self):
+        with self.lock:
+            executor = self.executor if self.pid == os.getpid() else None
+
+            self.executor = None
+
+        if executor is not None:
+            executor.shutdown(wait=False)
 
-    def run(self):
-        try:
-            sockaddrs = socket.getaddrinfo(self.hostname, self.port)
 
-            self.sockaddr = sockaddrs[0][4]
-        except socket.error as e:
-            self.e = e
+class ResolveCache:
+    def __init__(self, default_ttl=60.0):
+        self.default_ttl = default_ttl
 
+        self.resolver = None
+        self.entries = {}  # host: (ip, expiration)
+        self.locks = {}
 
-class ReverseThread(threading.Thread):
-    def __init__(self, ip):
-        super().__init__()
+        self.lock = threading.Lock()
 
-        self.ip = ip
+    def resolve(self, host, timeout=None):
+        ip = self._get_entry(host)
 
-        self.hostname = None
+        if ip is not None:
+            return ip
 
-        self.e = None
-        self.daemon = True
+        # Concurrent requests for the same host wait for one lookup.
+        with self._get_lock(host):
+            ip = self._get_entry(host)
 
-    def run(self):
+            if ip is None:
+                ip, ttl = self._lookup(host, timeout)
+
+                self.entries[host] = (ip, time.time() + ttl)
+
+                logging.log(logging.DEBUG, 'RESOLVE_CACHE:' + host + ',IP:' + ip + ',TTL:' + str(ttl))
+
+        return ip
+
+    def _get_entry(self, host):
+        entry = self.entries.get(host)
+
+        if entry is not None and entry[1] > time.time():
+            return entry[0]
+
+        return None
+
+    def _get_lock(self, host):
+        with self.lock:
+            if host not in self.locks:
+                self.locks[host] = threading.Lock()
+
+            return self.locks[host]
+
+    def _lookup(self, host, timeout):
         try:
-            vals = socket.gethostbyaddr(self.ip)
+            if self.resolver is None:
+                self.resolver = dns.resolver.Resolver()
+
+            answer = self.resolver.resolve(host, 'A', lifetime=timeout)
+
+            return str(answer[0]), answer.rrset.ttl
+        except dns.exception.DNSException:
+            logging.log(logging.DEBUG, 'RESOLVE_CACHE:Fallback to getaddrinfo.', exc_info=True)
 
-            self.hostname = vals[0]
-        except socket.error as e:
-            self.e = e
+        return DnsUtil.resolve(host, timeout=timeout), self.default_ttl
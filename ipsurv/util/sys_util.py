@@ -1,6 +1,7 @@
 import pprint
 import logging
 import os
+import tempfile
 
 
 class AppException(Exception):
@@ -41,6 +42,20 @@ class System:
     def warn(cls, msg):
         print('\033[33m' + msg + '\033[0m')
 
+    @classmethod
+    def replace_file(cls, path, write):
+        # An interrupted write mustn't break the previous file, so the file is replaced after it's written entirely.
+        fd, tmp_path = tempfile.mkstemp(prefix=os.path.basename(path) + '.', suffix='.tmp', dir=os.path.dirname(os.path.abspath(path)))
+
+        try:
+            with os.fdopen(fd, 'w') as f:
+                write(f)
+
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+
     @classmethod
     def exit(cls, msg, error=0):
         if error == 0:
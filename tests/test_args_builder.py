@@ -36,6 +36,47 @@ class TestArgsBuilder:
 
         assert args.timeout == '8.0'
 
+    def test_parse_file_error(self, args_builder, monkeypatch, tmp_path, capfd):
+        monkeypatch.setattr(sys, 'argv', ['ipsurv.py', '--group_seed=' + str(tmp_path / 'none.txt')])
+
+        with pytest.raises(SystemExit):
+            args_builder.parse()
+
+        captured = capfd.readouterr()
+
+        assert re.search(r'--group_seed: File not found', captured.err)
+
+        (tmp_path / 'groups.json').write_text('{"a": 1}')
+
+        monkeypatch.setattr(sys, 'argv', ['ipsurv.py', '--group_index=' + str(tmp_path / 'groups.json')])
+
+        with pytest.raises(SystemExit):
+            args_builder.parse()
+
+        captured = capfd.readouterr()
+
+        assert re.search(r'--group_index: Illegal file', captured.err)
+
+        (tmp_path / 'ipv4.json').write_text('{"services": []}')
+
+        monkeypatch.setattr(sys, 'argv', ['ipsurv.py', '--rdap_bootstrap=' + str(tmp_path / 'ipv4.json') + ',' + str(tmp_path / 'ipv6.json')])
+
+        with pytest.raises(SystemExit):
+            args_builder.parse()
+
+        captured = capfd.readouterr()
+
+        assert re.search(r'--rdap_bootstrap: File not found.+ipv6.json', captured.err)
+
+        (tmp_path / 'ipv6.json').write_text('[]')
+
+        with pytest.raises(SystemExit):
+            args_builder.parse()
+
+        captured = capfd.readouterr()
+
+        assert re.search(r'--rdap_bootstrap: Illegal file.+ipv6.json', captured.err)
+
     def test_init_args(self, args, args_builder, capfd):
         arguments = {
             'verbose': {'default': 3, 'type': int, 'help': ''},
@@ -18,7 +18,7 @@ class TestStdinLoader:
 
         lines = StdinLoader.read_stdin()
 
-        assert len(lines) == 2
+        assert list(lines) == ['1', '4']
 
     def test_load_env(self, monkeypatch):
         monkeypatch.setenv("TEST1", '{"abc": 1}')
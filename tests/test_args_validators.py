@@ -1,6 +1,8 @@
 import pytest
 
-from ipsurv.configure.args_validators import FormatValidator, TimeoutValidator
+from ipsurv.configure.args_validators import FormatValidator, TimeoutValidator, HostLimitValidator, CacheTtlValidator, FileValidator
+from ipsurv.core.target_groups import TargetGroups
+import argparse
 import re
 
 
@@ -132,3 +134,121 @@ class TestTimeoutValidator:
         assert timeout['dns'] == 8
         assert timeout['http'] == 3
         assert timeout['reactivity'] == 8
+
+
+class TestHostLimitValidator:
+    @pytest.fixture
+    def args(self, mocker):
+        args = mocker.Mock()
+        args.rate_limit = '0'
+
+        return args
+
+    def test_validator(self, args):
+        validator = HostLimitValidator('rate_limit')
+
+        limits = validator.validate(args)
+
+        assert limits == {'*': 0}
+
+        args.rate_limit = 'rdap.arin.net=2;IPINFO.IO=0.5;5'
+
+        limits = validator.validate(args)
+
+        assert limits['rdap.arin.net'] == 2
+        assert limits['ipinfo.io'] == 0.5
+        assert limits['*'] == 5
+
+    def test_error(self, args):
+        validator = HostLimitValidator('rate_limit')
+
+        args.rate_limit = 'rdap.arin.net=abc'
+
+        with pytest.raises(argparse.ArgumentError):
+            validator.validate(args)
+
+        for v in ['-5', 'nan', 'inf', 'ipinfo.io=-0.5', '1e3', '']:
+            args.rate_limit = 'rdap.arin.net=2;' + v if v else 'rdap.arin.net='
+
+            with pytest.raises(argparse.ArgumentError):
+                validator.validate(args)
+
+
+class TestCacheTtlValidator:
+    @pytest.fixture
+    def args(self, mocker):
+        args = mocker.Mock()
+        args.cache_ttl = '86400'
+
+        return args
+
+    def test_validator(self, args):
+        validator = CacheTtlValidator()
+
+        ttls = validator.validate(args)
+
+        assert ttls == {'*': 86400}
+
+        args.cache_ttl = 'RDAP=604800;dnstxt=0;3600'
+
+        ttls = validator.validate(args)
+
+        assert ttls == {'rdap': 604800, 'dnstxt': 0, '*': 3600}
+        assert isinstance(ttls['rdap'], int)
+
+    def test_error(self, args):
+        validator = CacheTtlValidator()
+
+        for v in ['-1', 'rdap=-60', 'rdap=1.5', 'rdap=abc', 'rdap=']:
+            args.cache_ttl = v
+
+            with pytest.raises(argparse.ArgumentError):
+                validator.validate(args)
+
+
+class TestFileValidator:
+    @pytest.fixture
+    def args(self, mocker):
+        args = mocker.Mock()
+        args.group_index = None
+
+        return args
+
+    def test_validator(self, args, tmp_path):
+        validator = FileValidator('group_index', TargetGroups.read_buckets, missing_ok=True)
+
+        assert validator.validate(args) == []
+
+        path = tmp_path / 'groups.json'
+        args.group_index = str(path)
+
+        assert validator.validate(args) == [str(path)]
+
+        path.write_text('[[100, 199, "100"], [300, null, "300", {"country": "US"}]]')
+
+        assert validator.validate(args) == [str(path)]
+
+        validator = FileValidator('group_index', multiple=True)
+
+        args.group_index = str(path) + ', ' + str(path)
+
+        assert validator.validate(args) == [str(path), str(path)]
+
+    def test_error(self, args, tmp_path):
+        validator = FileValidator('group_index')
+
+        args.group_index = str(tmp_path / 'none.json')
+
+        with pytest.raises(argparse.ArgumentError):
+            validator.validate(args)
+
+        validator = FileValidator('group_index', TargetGroups.read_buckets, missing_ok=True)
+
+        path = tmp_path / 'groups.json'
+        args.group_index = str(path)
+
+        for v in ['{"a": 1}', '[[100]]', '[["a", 199, "100"]]', '[[300, 200, "300"]]', '[[100, 199, "100", 5]]', '[1, 2']:
+            path.write_text(v)
+
+            with pytest.raises(argparse.ArgumentError):
+                validator.validate(args)
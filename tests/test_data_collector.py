@@ -4,7 +4,9 @@ from ipsurv.data_collector.pass_data_collector import PassDataCollector, PassReq
 from ipsurv.data_collector.basic_collectors import RdapCollector, DnsTxtCollector, IpInfoCollector, DnsReverseCollector
 from ipsurv.data_collector.reactivity_collectors import ICMPCollector, TCPCollector, UDPCollector, HttpCollector
 from ipsurv.data_collector.self_collector import SelfCollector
-from ipsurv.requester.rdap import RdapRequester, CountryDetector
+from ipsurv.data_collector.response_cache import ResponseCache
+from ipsurv.data_collector.network_cache import NetworkCache
+from ipsurv.requester.rdap import RdapRequester, RdapServerMap, CountryDetector
 from ipsurv.requester.dns_resolver import DnsResolveRequester
 from ipsurv.requester.ip_info import IpInfoRequester
 from ipsurv.requester.server_reactivity import ServerReactivity
@@ -12,6 +14,8 @@ from ipsurv.requester.http import HttpRequester
 
 from ipsurv.core.entity import Target, ValueData
 
+import asyncio
+import sys
 import time
 import re
 import logging
@@ -63,6 +67,20 @@ class TestDataCollector:
 
         assert v < 2000 and v > 0
 
+    @pytest.mark.skipif(sys.version_info < (3, 7), reason='asyncio.run requires Python 3.7.')
+    def test_async_request(self, requester, args):
+        requester.request.return_value = (True, {'test': 1})
+
+        collector = PassDataCollector('TEST', requester, args)
+
+        target = Target()
+        target.ip = '192.0.2.1'
+
+        success, response, response_time = asyncio.run(collector.async_request(target))
+
+        assert success is True
+        assert response == {'test': 1}
+
     def test_put(self, requester, args):
         collector = PassDataCollector('TEST', requester, args)
 
@@ -81,6 +99,100 @@ class TestDataCollector:
 
         assert data.get('a') == 1
 
+    def test_request_cache(self, requester, args, tmp_path, mocker):
+        requester.request.return_value = (True, {'name': 'TEST1'})
+
+        collector = PassDataCollector('TEST', requester, args)
+        collector.set_response_cache(ResponseCache(str(tmp_path / 'cache.db'), {'*': 60}))
+
+        mocker.patch.object(collector, 'get_cache_key', side_effect=lambda target: target.ip)
+
+        target = Target()
+        target.ip = '192.168.1.10'
+
+        assert collector.request(target)[1] == {'name': 'TEST1'}
+        assert collector.request(target)[1] == {'name': 'TEST1'}
+        assert requester.request.call_count == 1
+
+        requester.request.return_value = (False, {'error': 'Error'})
+
+        target.ip = '192.168.1.11'
+
+        collector.request(target)
+        collector.request(target)
+
+        assert requester.request.call_count == 3
+        assert collector.response_cache.get_stats() == {'TEST': (1, 3)}
+
+    def test_request_network_cache(self, requester, args, mocker):
+        requester.request.return_value = (True, {'cidr': '192.168.1.0/24'})
+
+        collector = PassDataCollector('TEST', requester, args)
+        collector.set_network_cache(NetworkCache())
+
+        mocker.patch.object(collector, 'get_cidr', side_effect=lambda response: response.get('cidr'))
+
+        target = Target()
+        target.ip = '192.168.1.10'
+
+        collector.request(target)
+
+        target.ip = '192.168.1.200'
+
+        assert collector.request(target)[1] == {'cidr': '192.168.1.0/24'}
+        assert requester.request.call_count == 1
+
+        target.ip = '192.168.2.1'
+
+        collector.request(target)
+
+        assert requester.request.call_count == 2
+        assert collector.network_cache.get_stats() == {'TEST': (1, 1)}
+
+        collector.network_cache.put('TEST', 'abc', {})
+
+        assert collector.network_cache.get_stats() == {'TEST': (1, 1)}
+
+
+class TestResponseCache:
+    def test_get(self, tmp_path, mocker):
+        response_cache = ResponseCache(str(tmp_path / 'cache.db'), {'rdap': 60, '*': 0})
+
+        assert response_cache.get('RDAP', '8.8.8.8') is None
+
+        response_cache.put('RDAP', '8.8.8.8', {'cidr': '8.8.8.0/24', 'entities': [1, 2]})
+
+        assert response_cache.get('RDAP', '8.8.8.8') == {'cidr': '8.8.8.0/24', 'entities': [1, 2]}
+        assert response_cache.get('IPINFO', '8.8.8.8') is None
+
+        mocker.patch('time.time', return_value=time.time() + 61)
+
+        assert response_cache.get('RDAP', '8.8.8.8') is None
+
+        response_cache.put('IPINFO', '8.8.8.8', {'ip': '8.8.8.8'})
+
+        assert response_cache.get('IPINFO', '8.8.8.8') == {'ip': '8.8.8.8'}
+
+        assert response_cache.get_stats() == {'IPINFO': (1, 1), 'RDAP': (1, 2)}
+
+        response_cache.close()
+
+        response_cache = ResponseCache(str(tmp_path / 'cache.db'), {'*': 0})
+
+        assert response_cache.get('IPINFO', '8.8.8.8') == {'ip': '8.8.8.8'}
+
+    def test_evict(self, tmp_path):
+        response_cache = ResponseCache(str(tmp_path / 'cache.db'), {}, max_size=3)
+        response_cache.EVICT_INTERVAL = 2
+
+        for i in range(6):
+            response_cache.put('RDAP', '192.168.1.' + str(i), {'v': i})
+
+        assert response_cache.get('RDAP', '192.168.1.0') is None
+        assert response_cache.get('RDAP', '192.168.1.5') == {'v': 5}
+
+        response_cache.close()
+
 
 class TestRdapDataCollector:
     @pytest.fixture(autouse=True)
@@ -131,6 +243,26 @@ class TestRdapDataCollector:
         collector.build_data(target, data, False, {'cidr': 'abc'}, 8)
         assert data.get('cidr') == 'abc'
 
+    def test_learned(self, args):
+        requester = RdapRequester(CountryDetector())
+        collector = RdapCollector(requester, args)
+
+        assert collector.export_learned() is None
+
+        requester.set_server_map(RdapServerMap())
+        requester.server_map.put(53010, 'https://rdap.db.ripe.net/')
+
+        learned = collector.export_learned()
+
+        assert learned == {53010: 'https://rdap.db.ripe.net/'}
+        assert collector.export_learned() == {}
+
+        parent = RdapCollector(RdapRequester(CountryDetector()), args)
+        parent.requester.set_server_map(RdapServerMap())
+        parent.import_learned(learned)
+
+        assert parent.requester.server_map.get(53010) == 'https://rdap.db.ripe.net/'
+
 
 class TestDnsTxtCollector:
     @pytest.fixture(autouse=True)
@@ -13,6 +13,16 @@ class TestTarget:
         assert target.raw == 'test_target'
         assert str(target) == 'identifier'
 
+    def test_get_values(self, mocker):
+        target = Target('abc')
+        target.my_text = 'xyz'
+
+        values = target.get_values()
+
+        assert list(values.keys())[:2] == ['raw', 'identifier']
+        assert values['raw'] == 'abc'
+        assert values['my_text'] == 'xyz'
+
 
 class TestHeaderTarget:
     def test(self, mocker):
@@ -92,6 +102,36 @@ class TestValueData:
 
         assert values['a'] == 1
 
+    def test_schema(self, mocker):
+        factory = ValueDataFactory({'a': 1, 'b': 2}, ['c'])
+
+        data = factory.create()
+
+        data.set('c', 3)
+        data.set('x', 9)
+        data.delete('b')
+
+        assert data.get_data() == {'a': 1, 'c': 3, 'x': 9}
+        assert data.get('b') is None
+
+        with pytest.raises(KeyError):
+            data.update('b', lambda v: v)
+
+        data.map(lambda v: v * 2)
+
+        assert data.get_data() == {'a': 2, 'c': 6, 'x': 18}
+
+        assert data.has('a') is True
+        assert data.has('b') is False
+        assert data.has('x') is True
+        assert data.has('y') is False
+        assert list(data.items()) == [('a', 2), ('c', 6), ('x', 18)]
+
+        data.get_data()['a'] = 100
+
+        assert data.get('a') == 2
+        assert not hasattr(data, '__dict__') or vars(data) == {}
+
     def test_dump(self, mocker, capfd):
         data = ValueData({'a': 1234})
         data.dump()
@@ -112,7 +152,37 @@ class TestValueDataFactory:
         assert data.get('c') == 3
         assert data.get('e') is None
 
+    def test_create_mutables(self, mocker):
+        factory = ValueDataFactory({'a': 1, 'requests': [], 'errors': [], 'd': {'x': [1]}}, ['a', 'e'])
+
+        assert [factory.schema.keys[i] for i in factory.mutables] == ['requests', 'errors', 'd']
+
+        data1 = factory.create()
+        data2 = factory.create()
+
+        data1.get('requests').append('RDAP')
+        data1.get('d')['x'].append(2)
+
+        assert data2.get('requests') == []
+        assert data2.get('d') == {'x': [1]}
+        assert factory.master['requests'] == []
+
     def test_build(self, mocker):
         factory = ValueDataFactory({'a': 1, 'b': 2, 'c': 3, 'd': 5}, ['a', 'b', 'c', 'e'])
 
         assert type(factory.build({})) == ValueData
+
+    def test_build_customized(self, mocker):
+        class MyValueData(ValueData):
+            pass
+
+        class MyValueDataFactory(ValueDataFactory):
+            def build(self, data):
+                return MyValueData(data)
+
+        factory = MyValueDataFactory({'a': 1, 'requests': []}, ['a', 'e'])
+
+        data = factory.create()
+
+        assert type(data) is MyValueData
+        assert data.get_data() == {'a': 1, 'requests': [], 'e': None}
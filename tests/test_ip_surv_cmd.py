@@ -75,3 +75,44 @@ class TestIpSurvCmd:
             captured = capsys.readouterr()
 
             assert re.search(r'Data not found', captured.out)
+
+    def test_stream_rows(self, capsys, monkeypatch, ip_surv_cmd):
+        monkeypatch.setattr(sys, 'argv', ['ipsurv.py', '--format={ip}'])
+        monkeypatch.setattr(os, '_exit', lambda v: 0)
+
+        def read_stdin(timeout):
+            yield '192.168.1.100'
+            yield '192.168.1.101'
+
+            captured = capsys.readouterr()
+
+            assert re.search(r'192.168.1.100', captured.out)  # Output before the input is completed.
+
+            yield '192.168.1.102'
+
+        with patch('ipsurv.util.args_util.StdinLoader.read_stdin', side_effect=read_stdin):
+            ip_surv_cmd.run()
+
+            captured = capsys.readouterr()
+
+            assert re.search(r'192.168.1.102', captured.out)
+
+    def test_peek_rows(self, ip_surv_cmd):
+        heads, rows = ip_surv_cmd._peek_rows(iter(['192.168.1.100', '192.168.1.101']))
+
+        assert heads == ['192.168.1.100']
+        assert list(rows) == ['192.168.1.100', '192.168.1.101']
+
+        heads, rows = ip_surv_cmd._peek_rows(iter(['self']))
+
+        assert heads == ['self']
+        assert list(rows) == ['self']
+
+        heads, rows = ip_surv_cmd._peek_rows(iter(['myself.example.com', '192.168.1.101']))
+
+        assert heads == ['myself.example.com', '192.168.1.101']
+        assert list(rows) == ['myself.example.com', '192.168.1.101']
+
+        heads, rows = ip_surv_cmd._peek_rows(iter([]))
+
+        assert heads == []
@@ -15,6 +15,11 @@ class TestObjectFactory:
         args.fixed_timeout = {'dns': 0, 'http': 0, 'reactivity': 0}
         args.fixed_collectors = []
         args.autodetect = False
+        args.rdap_map = None
+        args.rdap_bootstrap = None
+        args.dnstxt_bulk = False
+        args.http_body_limit = 0
+        args.http_head = False
 
         return args
 
@@ -55,13 +60,61 @@ class TestObjectFactory:
 
         assert isinstance(obj, dict)
 
+    def test_get_response_cache(self, args, tmp_path):
+        args.cache = None
+
+        assert self.object_factory.get_response_cache(args) is None
+
+        args.cache = str(tmp_path / 'cache.db')
+        args.fixed_cache_ttl = {'*': 60}
+        args.cache_size = 10
+
+        obj = self.object_factory.get_response_cache(args)
+
+        assert obj.__class__.__name__ == 'ResponseCache'
+        assert self.object_factory.get_response_cache(args) is obj
+
+    def test_get_resolver_pool(self, args):
+        args.workers = 64
+
+        obj = self.object_factory.get_resolver_pool(args)
+
+        assert obj.max_workers == 128
+        assert self.object_factory.get_resolver_pool(args) is obj
+
     def test_create_rdap_collector(self, args):
         obj = self.object_factory.create_rdap_collector(args)
 
         assert obj.__class__.__name__ == 'RdapCollector'
 
-    def test_create_dnstxt_collector(self, args):
-        obj = self.object_factory.create_dnstxt_collector(None, args)
+    def test_get_rdap_server_map(self, args, tmp_path):
+        path = tmp_path / 'rdap_map.json'
+        path.write_text('{"53010": "https://rdap.db.ripe.net/"}')
+
+        args.rdap_map = str(path)
+
+        obj = self.object_factory.get_rdap_server_map(args)
+
+        assert obj.get(53010) == 'https://rdap.db.ripe.net/'
+        assert self.object_factory.get_rdap_server_map(args) is obj
+
+    def test_get_rdap_bootstrap(self, args, tmp_path):
+        assert self.object_factory.get_rdap_bootstrap(args) is None
+
+        path1 = tmp_path / 'ipv4.json'
+        path1.write_text('{"services": [[["53.0.0.0/8"], ["https://rdap.db.ripe.net/"]]]}')
+        path2 = tmp_path / 'ipv6.json'
+        path2.write_text('{"services": [[["2001:200::/23"], ["https://rdap.apnic.net/"]]]}')
+
+        args.rdap_bootstrap = str(path1) + ',' + str(path2)
+
+        obj = self.object_factory.get_rdap_bootstrap(args)
+
+        assert len(obj) == 2
+        assert self.object_factory.get_rdap_bootstrap(args) is obj
+
+    def test_create_dnstxt_collector(self, args, mocker):
+        obj = self.object_factory.create_dnstxt_collector(mocker.Mock(), args)
 
         assert obj.__class__.__name__ == 'DnsTxtCollector'
 
@@ -1,13 +1,41 @@
 import pytest
 
 from ipsurv.requester.ip_info import IpInfoRequester
-from ipsurv.requester.rdap import RdapRequester, CountryDetector
+from ipsurv.requester.rdap import RdapRequester, RdapServerMap, RdapBootstrap, CountryDetector
+from ipsurv.requester.dns_multiplexer import DnsMultiplexer
 from ipsurv.requester.dns_resolver import DnsResolveRequester
 from ipsurv.requester.http import HttpRequester
+from ipsurv.requester.h2_client import H2Client
 from ipsurv.requester.server_reactivity import ServerReactivity
+from ipsurv.requester.tcp_prober import TcpProber
+from ipsurv.requester.udp_prober import UdpProber, TimerWheel
+from ipsurv.requester.host_limiter import HostLimiter
+from ipsurv.requester.http_connection_pool import HttpConnectionPool
+from ipsurv.requester.icmp_sweeper import IcmpSweeper
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+import asyncio
+import sys
+import concurrent.futures
+import dns.exception
+import dns.message
+import dns.rcode
+import dns.resolver
+import dns.rrset
+import json
+import os
 import http.client
 import socket
+import struct
+import threading
+import time
 import re
+import urllib.error
+
+
+class ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    # http.server.ThreadingHTTPServer requires Python 3.7 or later.
+    daemon_threads = True
 
 
 class TestRequester:
@@ -24,6 +52,331 @@ class TestRequester:
         con = requester._create_http_connection('8.8.8.8', False)
         assert type(con).__name__ == 'HTTPConnection'
 
+    @pytest.mark.skipif(sys.version_info < (3, 7), reason='asyncio.run requires Python 3.7.')
+    def test_async_read_response(self):
+        requester = IpInfoRequester()
+
+        async def read(v):
+            reader = asyncio.StreamReader()
+            reader.feed_data(v)
+            reader.feed_eof()
+
+            return await requester._async_read_response(reader)
+
+        res = asyncio.run(read(b'HTTP/1.1 200 OK\r\nContent-Length: 4\r\n\r\nabcd'))
+
+        assert res.status == 200
+        assert res.body == b'abcd'
+
+        res = asyncio.run(read(b'HTTP/1.1 301 Moved\r\nLocation: https://a/\r\nTransfer-Encoding: chunked\r\n\r\n3\r\nabc\r\n2\r\nde\r\n0\r\n\r\n'))
+
+        assert res.status == 301
+        assert res.getheader('Location') == 'https://a/'
+        assert res.body == b'abcde'
+
+        with pytest.raises(http.client.BadStatusLine):
+            asyncio.run(read(b'abc\r\n\r\n'))
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    connections = set()
+
+    def do_GET(self):
+        self.connections.add(self.client_address)
+
+        body = b'{"ip": "192.168.1.1"}'
+
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class BodyHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_HEAD(self):
+        self._respond(False)
+
+    def do_GET(self):
+        self._respond(True)
+
+    def _respond(self, body):
+        self.send_response(200)
+
+        if self.path == '/length':
+            self.send_header('Content-Length', '200000')
+            self.end_headers()
+
+            if body:
+                self.wfile.write(b'a' * 200000)
+        else:
+            self.send_header('Transfer-Encoding', 'chunked')
+            self.end_headers()
+
+            if body:
+                for i in range(20):
+                    self.wfile.write(b'2710\r\n' + b'a' * 10000 + b'\r\n')
+
+                self.wfile.write(b'0\r\n\r\n')
+
+    def log_message(self, *args):
+        pass
+
+
+class TestHttpConnectionPool:
+    def test_get(self, mocker):
+        connection_pool = HttpConnectionPool(max_size=1, idle_timeout=10)
+
+        conn = connection_pool.get('127.0.0.1', False, 3)
+
+        assert type(conn).__name__ == 'HTTPConnection'
+        assert conn.reused is False
+
+        conn2 = connection_pool.get('127.0.0.1', False, 3)
+
+        connection_pool.put(conn)
+        connection_pool.put(conn2)
+
+        assert connection_pool.get('127.0.0.1', True, 3) is not conn
+        assert connection_pool.get('127.0.0.1', False, 5) is conn
+        assert conn.reused is True
+        assert conn.timeout == 5
+
+        connection_pool.put(conn)
+
+        mocker.patch('time.time', return_value=time.time() + 11)
+
+        assert connection_pool.get('127.0.0.1', False, 3) is not conn
+
+    def test_request_http(self):
+        server = ThreadingHTTPServer(('127.0.0.1', 0), KeepAliveHandler)
+
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+
+        try:
+            requester = IpInfoRequester(timeout=3)
+            requester.set_connection_pool(HttpConnectionPool())
+
+            host = '127.0.0.1:' + str(server.server_address[1])
+
+            for i in range(3):
+                res, body = requester._request_http(host, '/json', https=False)
+
+                assert res.status == 200
+                assert body == b'{"ip": "192.168.1.1"}'
+
+            assert len(KeepAliveHandler.connections) == 1
+
+            requester.connection_pool.close()
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    def test_request_connection_retry(self, mocker):
+        requester = IpInfoRequester(timeout=3)
+
+        conn = mocker.Mock()
+        conn.request.side_effect = [http.client.RemoteDisconnected('Closed'), None]
+        conn.reused = True
+
+        res, body = requester._request_connection(conn, '/json', None)
+
+        assert conn.request.call_count == 2
+        assert conn.close.call_count == 1
+
+        conn.request.side_effect = http.client.RemoteDisconnected('Closed')
+
+        with pytest.raises(http.client.RemoteDisconnected):
+            requester._request_connection(conn, '/json', None)
+
+
+class TestHostLimiter:
+    def test_rate(self):
+        host_limiter = HostLimiter({'a': 20, '*': 0})
+
+        assert host_limiter.get_rate('a') == 20
+        assert host_limiter.get_rate('b') == 0
+
+        begin_time = time.time()
+
+        for i in range(5):
+            host_limiter.acquire('a')
+            host_limiter.release('a')
+
+        assert time.time() - begin_time >= 0.18
+
+        begin_time = time.time()
+
+        for i in range(5):
+            host_limiter.acquire('b')
+
+        assert time.time() - begin_time < 0.05
+
+    def test_max_inflight(self):
+        host_limiter = HostLimiter({}, {'a': 2})
+
+        assert host_limiter.get_max_inflight('a') == 2
+
+        host_limiter.acquire('a')
+        host_limiter.acquire('a')
+
+        acquired = []
+
+        thread = threading.Thread(target=lambda: acquired.append(host_limiter.acquire('a')))
+        thread.start()
+        thread.join(0.1)
+
+        assert len(acquired) == 0
+
+        host_limiter.release('a')
+        thread.join(1)
+
+        assert len(acquired) == 1
+
+    @pytest.mark.skipif(sys.version_info < (3, 7), reason='asyncio.run requires Python 3.7.')
+    def test_async_acquire(self):
+        host_limiter = HostLimiter({'a': 50}, {'a': 1})
+
+        async def request():
+            await host_limiter.async_acquire('a')
+            await asyncio.sleep(0.01)
+            host_limiter.release('a')
+
+        async def run():
+            await asyncio.gather(*[request() for _ in range(4)])
+
+        begin_time = time.time()
+
+        asyncio.run(run())
+
+        assert time.time() - begin_time >= 0.06
+
+    def test_backoff(self):
+        host_limiter = HostLimiter()
+        host_limiter.BACKOFF_MIN = 0.05
+
+        host_limiter.acquire('a')
+        host_limiter.release('a', False)
+
+        begin_time = time.time()
+
+        host_limiter.acquire('a')
+        host_limiter.release('a', False)
+
+        host_limiter.acquire('a')
+        host_limiter.release('a', True)
+
+        assert time.time() - begin_time >= 0.14
+        assert host_limiter.backoffs['a'][0] == 0.05
+
+        host_limiter.acquire('a')
+        host_limiter.release('a', True)
+
+        assert host_limiter.backoffs['a'][0] == 0
+
+        begin_time = time.time()
+
+        host_limiter.acquire('a')
+        host_limiter.acquire('b')
+
+        assert time.time() - begin_time < 0.05
+
+        count, seconds = host_limiter.get_throttled()['a']
+
+        assert count == 3
+        assert seconds >= 0.14
+
+    def test_is_overload_error(self):
+        requester = IpInfoRequester()
+
+        assert requester._is_overload_error(socket.timeout('Socket timeout error.')) is True
+        assert requester._is_overload_error(asyncio.TimeoutError()) is True
+        assert requester._is_overload_error(ConnectionResetError()) is True
+        assert requester._is_overload_error(urllib.error.HTTPError('https://ipinfo.io/', 429, 'Too Many Requests', {}, None)) is True
+        assert requester._is_overload_error(urllib.error.HTTPError('https://ipinfo.io/', 503, 'Service Unavailable', {}, None)) is True
+        assert requester._is_overload_error(urllib.error.HTTPError('https://ipinfo.io/', 404, 'Not Found', {}, None)) is False
+        assert requester._is_overload_error(ValueError('Broken response.')) is False
+        assert requester._is_overload_error(socket.gaierror('Name or service not known')) is False
+
+    def test_limit_host(self):
+        requester = DnsResolveRequester()
+        requester.set_host_limiter(HostLimiter())
+
+        with pytest.raises(socket.gaierror):
+            with requester._limit_host('dns'):
+                raise socket.gaierror('Name or service not known')
+
+        assert 'dns' not in requester.host_limiter.backoffs
+
+        with pytest.raises(socket.timeout):
+            with requester._limit_host('dns'):
+                raise socket.timeout('Socket timeout error.')
+
+        assert requester.host_limiter.backoffs['dns'][0] == HostLimiter.BACKOFF_MIN
+
+        assert requester._is_healthy_status(404) is True
+        assert requester._is_healthy_status(429) is False
+        assert requester._is_healthy_status(503) is False
+
+    def test_async_limit_host(self):
+        requester = DnsResolveRequester()
+        requester.set_host_limiter(HostLimiter())
+
+        async def request(e):
+            async with requester._async_limit_host('dns'):
+                raise e
+
+        loop = asyncio.new_event_loop()
+
+        with pytest.raises(socket.gaierror):
+            loop.run_until_complete(request(socket.gaierror('Name or service not known')))
+
+        assert 'dns' not in requester.host_limiter.backoffs
+
+        with pytest.raises(socket.timeout):
+            loop.run_until_complete(request(socket.timeout('Socket timeout error.')))
+
+        loop.close()
+
+        assert requester.host_limiter.backoffs['dns'][0] == HostLimiter.BACKOFF_MIN
+
+    def test_limit_host_reverse(self, mocker):
+        requester = DnsResolveRequester()
+        requester.set_host_limiter(HostLimiter())
+
+        mocker.patch('ipsurv.util.network_util.DnsUtil.reverse', side_effect=socket.timeout('Socket timeout error.'))
+
+        for _ in range(4):
+            with pytest.raises(socket.timeout):
+                requester.request_reverse('192.0.2.1')
+
+        assert 'dns' not in requester.host_limiter.backoffs
+
+        requester.host_limiter.release('dns', False)
+
+        with pytest.raises(socket.timeout):
+            requester.request_reverse('192.0.2.1')
+
+        assert requester.host_limiter.backoffs['dns'][0] == HostLimiter.BACKOFF_MIN
+
+        requester.host_limiter.backoffs = {}
+
+        mocker.patch('ipsurv.util.network_util.DnsUtil.resolve', return_value='192.0.2.1')
+
+        begin_time = time.time()
+
+        for _ in range(3):
+            assert requester.resolve_ip('example.com') == '192.0.2.1'
+
+        assert time.time() - begin_time < 0.1
+
 
 class TestIpInfoRequester:
     @pytest.fixture(autouse=True)
@@ -76,6 +429,24 @@ class TestIpRdapRequester:
 
         assert server is not None
 
+    def test_learn_server(self, mocker):
+        country_detector = CountryDetector()
+        requester = RdapRequester(country_detector)
+        requester.set_server_map(RdapServerMap())
+
+        res = mocker.Mock(status=200, url='https://rdap.db.ripe.net/ip/53.10.1.0')
+
+        requester._learn_server('53.10.1.0', res)
+
+        assert requester.detect_server_from_ip('53.10.200.1') == 'https://rdap.db.ripe.net/'
+        assert requester.detect_server_from_ip('53.11.1.1') == 'https://rdap.arin.net/registry/'
+
+        res = mocker.Mock(status=404, url='https://rdap.apnic.net/ip/53.11.1.1')
+
+        requester._learn_server('53.11.1.1', res)
+
+        assert len(requester.server_map) == 1
+
     def test_get_octet2_by_ip(self):
         country_detector = CountryDetector()
         requester = RdapRequester(country_detector)
@@ -115,6 +486,130 @@ class TestIpRdapRequester:
         assert res is not None
 
 
+class TestRdapServerMap:
+    def test_save_load(self, tmp_path):
+        path = str(tmp_path / 'rdap_map.json')
+
+        server_map = RdapServerMap()
+        server_map.load(path)
+
+        assert len(server_map) == 0
+
+        server_map.put(53010, 'https://rdap.db.ripe.net/')
+        server_map.put(1002, 'https://rdap.apnic.net/')
+        server_map.save(path)
+
+        server_map = RdapServerMap()
+        server_map.load(path)
+
+        assert server_map.get(53010) == 'https://rdap.db.ripe.net/'
+        assert server_map.get(1002) == 'https://rdap.apnic.net/'
+        assert server_map.get(1003) is None
+
+    def test_load_broken(self, tmp_path):
+        path = tmp_path / 'rdap_map.json'
+
+        for v in ['{', '["https://rdap.apnic.net/"]', '{"a": "https://rdap.apnic.net/"}', '{"1002": 1}']:
+            path.write_text(v)
+
+            server_map = RdapServerMap()
+            server_map.load(str(path))
+
+            assert len(server_map) == 0
+
+    def test_save_interrupted(self, tmp_path, mocker):
+        path = str(tmp_path / 'rdap_map.json')
+
+        server_map = RdapServerMap()
+        server_map.put(1002, 'https://rdap.apnic.net/')
+        server_map.save(path)
+
+        server_map.put(53010, 'https://rdap.db.ripe.net/')
+
+        mocker.patch('json.dump', side_effect=KeyboardInterrupt)
+
+        with pytest.raises(KeyboardInterrupt):
+            server_map.save(path)
+
+        mocker.stopall()
+
+        assert os.listdir(str(tmp_path)) == ['rdap_map.json']
+
+        server_map = RdapServerMap()
+        server_map.load(path)
+
+        assert len(server_map) == 1
+
+
+class TestRdapBootstrap:
+    @pytest.fixture
+    def path(self, tmp_path):
+        path = tmp_path / 'ipv4.json'
+        path.write_text(json.dumps({
+            'version': '1.0',
+            'services': [
+                [['53.0.0.0/8', '57.0.0.0/8'], ['https://rdap.db.ripe.net/']],
+                [['1.0.0.0/8'], ['http://rdap.apnic.net/', 'https://rdap.apnic.net/']],
+                [['2001:200::/23'], ['https://rdap.apnic.net']],
+                [['53.10.0.0/16'], ['https://rdap.arin.net/registry/']]
+            ]
+        }))
+
+        return str(path)
+
+    def test_read_services(self, path, tmp_path):
+        assert len(RdapBootstrap.read_services(path)) == 4
+
+        illegal = tmp_path / 'illegal.json'
+
+        for v in ['[]', '{"services": {}}', '{"services": [["1.0.0.0/8"]]}', '{"services": [[["abc"], ["https://rdap.apnic.net/"]]]}', '{']:
+            illegal.write_text(v)
+
+            with pytest.raises(ValueError):
+                RdapBootstrap.read_services(str(illegal))
+
+    def test_find(self, path):
+        bootstrap = RdapBootstrap()
+        bootstrap.load(path)
+
+        assert len(bootstrap) == 5
+        assert bootstrap.find('53.1.1.1') == 'https://rdap.db.ripe.net/'
+        assert bootstrap.find('53.10.1.1') == 'https://rdap.arin.net/registry/'
+        assert bootstrap.find('1.1.1.1') == 'https://rdap.apnic.net/'
+        assert bootstrap.find('2001:200::1') == 'https://rdap.apnic.net/'
+        assert bootstrap.find('8.8.8.8') is None
+        assert bootstrap.find('abc') is None
+        assert bootstrap.match('53.10.1.1') == (16, 'https://rdap.arin.net/registry/')
+
+    def test_detect_server_from_ip(self, path):
+        bootstrap = RdapBootstrap()
+        bootstrap.load(path)
+
+        requester = RdapRequester(CountryDetector())
+        requester.set_bootstrap(bootstrap)
+
+        assert requester.detect_server_from_ip('57.1.1.1') == 'https://rdap.db.ripe.net/'
+        assert requester.detect_server_from_ip('2001:200::1') == 'https://rdap.apnic.net/'
+        assert requester.detect_server_from_ip('41.1.1.1') == 'https://rdap.afrinic.net/rdap/'
+
+    def test_detect_server_from_ip_learned(self, path):
+        bootstrap = RdapBootstrap()
+        bootstrap.load(path)
+
+        server_map = RdapServerMap()
+        server_map.put(57001, 'https://rdap.arin.net/registry/')
+        server_map.put(53010, 'https://rdap.lacnic.net/rdap/')
+
+        requester = RdapRequester(CountryDetector())
+        requester.set_bootstrap(bootstrap)
+        requester.set_server_map(server_map)
+
+        # The learned /16 is more specific than /8 of the bootstrap, but not than /16.
+        assert requester.detect_server_from_ip('57.1.1.1') == 'https://rdap.arin.net/registry/'
+        assert requester.detect_server_from_ip('57.2.1.1') == 'https://rdap.db.ripe.net/'
+        assert requester.detect_server_from_ip('53.10.1.1') == 'https://rdap.arin.net/registry/'
+
+
 class TestCountryDetector:
     @pytest.fixture(autouse=True)
     def setup(self):
@@ -169,6 +664,369 @@ class TestCountryDetector:
         assert code == 'FR'
 
 
+class DnsTxtServer:
+    # Stand-in for origin.asn.cymru.com. The answer for 127.0.0.2 is delayed, the query for 127.0.0.9 is dropped, the first query for 127.0.0.8 is dropped.
+    def __init__(self):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind(('127.0.0.1', 0))
+        self.port = self.sock.getsockname()[1]
+        self.queries = 0
+        self.names = []
+
+        threading.Thread(target=self.serve, daemon=True).start()
+
+    def serve(self):
+        while True:
+            try:
+                wire, address = self.sock.recvfrom(65535)
+            except OSError:
+                break
+
+            self.queries += 1
+
+            query = dns.message.from_wire(wire)
+            name = query.question[0].name.to_text()
+
+            self.names.append(name)
+
+            if name.startswith('9.0.0.127.') or (name.startswith('8.0.0.127.') and self.names.count(name) == 1):
+                continue
+
+            response = dns.message.make_response(query)
+
+            if name.startswith('99.'):
+                response.set_rcode(dns.rcode.NXDOMAIN)
+            else:
+                octet4 = name.split('.')[0]
+                response.answer.append(dns.rrset.from_text(name, 60, 'IN', 'TXT', '"15169 | 127.0.0.' + octet4 + '/32 | US | arin | 2023-12-28"'))
+
+            delay = 0.2 if name.startswith('2.0.0.127.') else 0
+
+            threading.Timer(delay, self.sock.sendto, (response.to_wire(), address)).start()
+
+    def close(self):
+        self.sock.close()
+
+
+class TestDnsMultiplexer:
+    @pytest.fixture
+    def server(self):
+        server = DnsTxtServer()
+
+        yield server
+
+        server.close()
+
+    def test_query(self, server):
+        multiplexer = DnsMultiplexer('127.0.0.1', server.port, timeout=1.0)
+
+        rrset = multiplexer.query('1.0.0.127.origin.asn.cymru.com', 'TXT')
+
+        assert '127.0.0.1/32' in str(rrset[0])
+
+        with pytest.raises(dns.resolver.NXDOMAIN):
+            multiplexer.query('99.0.0.127.origin.asn.cymru.com', 'TXT')
+
+        with pytest.raises(dns.exception.Timeout):
+            multiplexer.query('9.0.0.127.origin.asn.cymru.com', 'TXT', timeout=0.1)
+
+        assert multiplexer.pending == {}
+
+        multiplexer.close()
+
+    def test_query_bulk(self, server):
+        multiplexer = DnsMultiplexer('127.0.0.1', server.port, timeout=1.0)
+
+        names = [str(i) + '.0.0.127.origin.asn.cymru.com' for i in range(1, 6)]
+
+        begin_time = time.time()
+
+        answers = multiplexer.query_bulk(names, 'TXT')
+
+        assert time.time() - begin_time < 0.5
+        assert server.queries == 5
+        assert '127.0.0.2/32' in str(answers[names[1]][0])
+        assert '127.0.0.5/32' in str(answers[names[4]][0])
+
+        multiplexer.close()
+
+    def test_retransmit(self, server):
+        multiplexer = DnsMultiplexer('127.0.0.1', server.port, timeout=1.0, retransmit_interval=0.1)
+
+        rrset = multiplexer.query('8.0.0.127.origin.asn.cymru.com', 'TXT')
+
+        assert '127.0.0.8/32' in str(rrset[0])
+        assert server.names.count('8.0.0.127.origin.asn.cymru.com.') == 2
+
+        multiplexer.close()
+
+    def test_failover(self, server):
+        # Nothing answers at 127.0.0.2, so the query is sent again to the next nameserver.
+        multiplexer = DnsMultiplexer(['127.0.0.2', '127.0.0.1'], server.port, timeout=1.0, retransmit_interval=0.1)
+
+        rrset = multiplexer.query('1.0.0.127.origin.asn.cymru.com', 'TXT')
+
+        assert '127.0.0.1/32' in str(rrset[0])
+
+        multiplexer.close()
+
+    def test_dispatch_unexpected(self, server):
+        multiplexer = DnsMultiplexer('127.0.0.1', server.port, timeout=1.0, retransmit_interval=10.0)
+
+        future = multiplexer._send('9.0.0.127.origin.asn.cymru.com', 'TXT')
+
+        response = dns.message.make_response(future.query)
+
+        multiplexer._dispatch(response.to_wire(), ('127.0.0.3', server.port))
+        multiplexer._dispatch(response.to_wire(), ('127.0.0.1', server.port + 1))
+
+        other = dns.message.make_response(dns.message.make_query('1.0.0.127.origin.asn.cymru.com', 'TXT'))
+        other.id = future.query.id
+
+        multiplexer._dispatch(other.to_wire(), ('127.0.0.1', server.port))
+
+        assert future.done() is False
+
+        multiplexer._dispatch(response.to_wire(), ('127.0.0.1', server.port))
+
+        assert future.result(0)[0].id == future.query.id
+        assert multiplexer.pending == {}
+
+        multiplexer.close()
+
+    def test_request_dnstxt(self, server):
+        requester = DnsResolveRequester(timeout=0.3)
+        requester.set_multiplexer(DnsMultiplexer('127.0.0.1', server.port))
+
+        success, response = requester.request_dnstxt('127.0.0.3')
+
+        assert success is True
+        assert response['cidr'] == '127.0.0.3/32'
+        assert response['rir'] == 'arin'
+
+        with pytest.raises(dns.exception.Timeout):
+            requester.request_dnstxt('127.0.0.9')
+
+        requester.multiplexer.close()
+
+
+class TestTcpProber:
+    @pytest.fixture
+    def server(self):
+        server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        server.bind(('127.0.0.1', 0))
+        server.listen(128)
+
+        yield server
+
+        server.close()
+
+    def test_probe(self, server):
+        prober = TcpProber(timeout=1.0)
+
+        latency = prober.probe('127.0.0.1', server.getsockname()[1])
+
+        assert 0 <= latency < 1.0
+
+        closed = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        closed.bind(('127.0.0.1', 0))
+        port = closed.getsockname()[1]
+        closed.close()
+
+        with pytest.raises(ConnectionRefusedError):
+            prober.probe('127.0.0.1', port)
+
+        with pytest.raises(OSError):
+            prober.probe('192.0.2.1', 80, timeout=0.1)
+
+        prober.close()
+
+    def test_probe_batch(self, server):
+        prober = TcpProber(timeout=1.0)
+
+        targets = [('127.0.0.' + str(i), server.getsockname()[1]) for i in range(1, 51)]
+
+        results = prober.probe_batch(targets)
+
+        assert len(results) == 50
+        assert results[('127.0.0.1', server.getsockname()[1])] >= 0
+        assert all(isinstance(v, (float, OSError)) for v in results.values())
+
+        prober.close()
+
+    def test_close(self, server):
+        prober = TcpProber(timeout=1.0)
+
+        prober.probe('127.0.0.1', server.getsockname()[1])
+
+        prober.close()
+
+        assert prober.probe('127.0.0.1', server.getsockname()[1]) >= 0
+
+        prober.close()
+
+
+class UdpEchoServer:
+    def __init__(self, reply=None):
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.bind(('127.0.0.1', 0))
+        self.port = self.sock.getsockname()[1]
+        self.reply = reply
+
+        threading.Thread(target=self.serve, daemon=True).start()
+
+    def serve(self):
+        while True:
+            try:
+                data, address = self.sock.recvfrom(65535)
+            except OSError:
+                break
+
+            self.sock.sendto(self.reply if self.reply is not None else data, address)
+
+    def close(self):
+        self.sock.close()
+
+
+class TestUdpProber:
+    def test_probe(self):
+        server = UdpEchoServer()
+        prober = UdpProber(ServerReactivity.build_query, timeout=1.0)
+
+        latency = prober.probe('127.0.0.1', server.port)
+
+        assert 0 <= latency < 1.0
+        assert prober.pending == {}
+
+        prober.close()
+        server.close()
+
+    def test_probe_batch(self):
+        servers = [UdpEchoServer(), UdpEchoServer(b'OK'), UdpEchoServer()]
+        silent = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        silent.bind(('127.0.0.1', 0))
+
+        prober = UdpProber(ServerReactivity.build_query, timeout=0.3)
+
+        targets = [('127.0.0.1', server.port) for server in servers] + [('127.0.0.1', silent.getsockname()[1])]
+
+        begin_time = time.time()
+
+        results = prober.probe_batch(targets)
+
+        assert time.time() - begin_time < 1.0
+        assert results[targets[0]] >= 0
+        assert results[targets[1]] >= 0
+        assert results[targets[2]] >= 0
+        assert isinstance(results[targets[3]], socket.timeout)
+        assert prober.pending == {}
+
+        prober.close()
+        silent.close()
+
+        for server in servers:
+            server.close()
+
+    def test_close(self):
+        prober = UdpProber(ServerReactivity.build_query, timeout=10.0)
+        silent = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        silent.bind(('127.0.0.1', 0))
+
+        future = prober._send('127.0.0.1', silent.getsockname()[1], None)
+
+        prober.close()
+
+        with pytest.raises(OSError):
+            future.result(1.0)
+
+        silent.close()
+
+
+class TestTimerWheel:
+    def test_advance(self):
+        wheel = TimerWheel(tick=0.125, size=8)
+
+        now = wheel.current * 0.125
+
+        wheel.add(now + 0.3, 'a')
+        wheel.add(now + 0.7, 'b')
+        wheel.add(now + 2.6, 'c')
+
+        assert len(wheel) == 3
+        assert wheel.advance(now + 0.3) == []
+        assert wheel.advance(now + 0.4) == ['a']
+        assert wheel.advance(now + 1.0) == ['b']
+        assert wheel.advance(now + 2.0) == []
+        assert wheel.advance(now + 10.0) == ['c']
+        assert len(wheel) == 0
+
+
+@pytest.mark.skipif(not IcmpSweeper.is_available(), reason='ICMP socket is unavailable.')
+class TestIcmpSweeper:
+    def test_ping(self):
+        sweeper = IcmpSweeper(timeout=1.0)
+
+        rtt = sweeper.ping('127.0.0.1')
+
+        assert 0 <= rtt < 1.0
+        assert sweeper.pending == {}
+
+        sweeper.close()
+
+    def test_sweep(self):
+        sweeper = IcmpSweeper(timeout=2.0)
+
+        ips = ['127.0.0.' + str(i) for i in range(1, 201)]
+
+        rtts = sweeper.sweep(ips)
+
+        assert len(rtts) == 200
+        assert all(rtt is not None for rtt in rtts.values())
+
+        sweeper.close()
+
+    def test_timeout(self, mocker):
+        sweeper = IcmpSweeper()
+
+        mocker.patch.object(sweeper, '_dispatch')
+
+        with pytest.raises(socket.timeout):
+            sweeper.ping('127.0.0.1', timeout=0.1)
+
+        assert sweeper.sweep(['127.0.0.1', '127.0.0.2'], timeout=0.1) == {'127.0.0.1': None, '127.0.0.2': None}
+        assert sweeper.pending == {}
+
+        sweeper.close()
+
+    def test_dispatch(self):
+        sweeper = IcmpSweeper()
+        sweeper.identifier = 100
+
+        future = concurrent.futures.Future()
+        future.sent = time.time()
+
+        sweeper.pending[('127.0.0.1', 5)] = future
+
+        header = bytes([0x45]) + bytes(19)
+
+        sweeper._dispatch(header + sweeper._build_packet(100, 5), '127.0.0.1', True)
+        sweeper._dispatch(header + b'\x00\x00\x00\x00\x00\x65\x00\x05', '127.0.0.1', True)
+
+        assert future.done() is False
+
+        sweeper._dispatch(header + b'\x00\x00\x00\x00\x00\x64\x00\x05', '127.0.0.1', True)
+
+        assert future.done() is True
+        assert sweeper.pending == {}
+
+    def test_checksum(self):
+        sweeper = IcmpSweeper()
+
+        packet = sweeper._build_packet(1, 1)
+
+        assert sweeper._checksum(packet) == 0
+
+
 class TestDnsResolveRequester:
     @pytest.fixture(autouse=True)
     def setup(self):
@@ -206,6 +1064,16 @@ class TestDnsResolveRequester:
         assert response['country'] == 'US'
         assert response['cidr'] == '8.8.8.0/24'
 
+    def test_parse_dnstxt(self):
+        requester = DnsResolveRequester()
+
+        success, response = requester._parse_dnstxt(['"15169 | 8.8.8.0/24 | US | arin | 2023-12-28"'])
+
+        assert success is True
+        assert response['cidr'] == '8.8.8.0/24'
+        assert response['network_end'] == '8.8.8.255'
+        assert response['rir'] == 'arin'
+
     def test_get_resolver(self):
         requester = DnsResolveRequester()
 
@@ -216,11 +1084,300 @@ class TestDnsResolveRequester:
         assert type(requester.get_resolver()) == dict
 
 
+class H2Server:
+    # Stand-in HTTP/2 server over a socket pair. The status is sent by the given HPACK header block.
+    def __init__(self, sock, block, body=b'', padded=False, informational=None, read_after=False):
+        self.sock = sock
+        self.block = block
+        self.informational = informational
+        self.read_after = read_after
+        self.body = body
+        self.padded = padded
+        self.frames = []
+
+        threading.Thread(target=self.serve, daemon=True).start()
+
+    def serve(self):
+        client = H2Client(self.sock)
+
+        assert client._read(len(H2Client.PREFACE)) == H2Client.PREFACE
+
+        client._send_frame(H2Client.SETTINGS, 0, 0, b'')
+        client._send_frame(H2Client.PING, 0, 0, b'12345678')
+
+        while len(self.frames) < 4:
+            self.frames.append(client._read_frame())
+
+        client._send_frame(H2Client.HEADERS, H2Client.END_HEADERS, 3, self.block)
+
+        if self.informational is not None:
+            client._send_frame(H2Client.HEADERS, H2Client.END_HEADERS, 1, self.informational)
+
+        client._send_frame(H2Client.HEADERS, H2Client.END_HEADERS, 1, self.block)
+
+        if self.padded:
+            client._send_frame(H2Client.DATA, H2Client.PADDED, 1, b'\x02' + self.body + b'\x00\x00')
+        else:
+            client._send_frame(H2Client.DATA, 0, 1, self.body)
+
+        client._send_frame(H2Client.DATA, H2Client.END_STREAM, 1, b'')
+
+        while self.read_after:
+            try:
+                self.frames.append(client._read_frame())
+            except OSError:
+                break
+
+
+class TestH2Client:
+    def test_request(self):
+        sock1, sock2 = socket.socketpair()
+
+        server = H2Server(sock2, b'\x88', b'abc' * 1000)
+
+        status, size, body = H2Client(sock1).request('example.test', '/', {'User-Agent': 'Requester'})
+
+        assert status == 200
+        assert size == 3000
+        assert body == b'abc' * 1000
+
+        types = [frame[0] for frame in server.frames]
+
+        assert types == [H2Client.SETTINGS, H2Client.WINDOW_UPDATE, H2Client.HEADERS, H2Client.SETTINGS]
+
+        sock1.close()
+        sock2.close()
+
+    def test_request_huffman(self):
+        sock1, sock2 = socket.socketpair()
+
+        # Dynamic table size update and literal ":status: 404" by Huffman coding.
+        H2Server(sock2, b'\x3f\xe1\x1f\x48\x83\x68\x0d\x7f', b'not found', padded=True)
+
+        status, size, body = H2Client(sock1).request('example.test', '/index.html')
+
+        assert status == 404
+        assert body == b'not found'
+
+        sock1.close()
+        sock2.close()
+
+    def test_request_location(self):
+        sock1, sock2 = socket.socketpair()
+
+        # ":status: 301" and "location: /moved" by the static table index and Huffman coding.
+        H2Server(sock2, b'\x08\x03301' + b'\x6e\x85\x62\x93\xf7\x2c\x9f', b'moved')
+
+        client = H2Client(sock1)
+
+        status, size, body = client.request('example.test', '/')
+
+        assert status == 301
+        assert client.location == '/moved'
+
+        sock1.close()
+        sock2.close()
+
+    def test_request_informational(self):
+        sock1, sock2 = socket.socketpair()
+
+        # "103 Early Hints" with "link" header, then ":status: 200".
+        H2Server(sock2, b'\x88', b'ok', informational=b'\x08\x03103' + b'\x00\x04link\x04</a>')
+
+        status, size, body = H2Client(sock1).request('example.test', '/')
+
+        assert status == 200
+        assert body == b'ok'
+
+        sock1.close()
+        sock2.close()
+
+    def test_request_limit(self):
+        sock1, sock2 = socket.socketpair()
+
+        H2Server(sock2, b'\x88', b'abc' * 1000)
+
+        status, size, body = H2Client(sock1).request('example.test', '/', limit=100, keep_body=False)
+
+        assert status == 200
+        assert size == 3000
+        assert body == b''
+
+        sock1.close()
+        sock2.close()
+
+    def test_request_content_length(self):
+        sock1, sock2 = socket.socketpair()
+
+        # ":status: 200" and "content-length: 3000" by the static table index.
+        server = H2Server(sock2, b'\x88\x0f\x0d\x043000', b'abc' * 1000, read_after=True)
+
+        status, size, body = H2Client(sock1).request('example.test', '/', limit=100, keep_body=True)
+
+        assert status == 200
+        assert size == 3000
+        assert body == b'abc' * 33 + b'a'
+
+        deadline = time.time() + 2
+
+        while H2Client.RST_STREAM not in [frame[0] for frame in server.frames] and time.time() < deadline:
+            time.sleep(0.01)
+
+        frame = [frame for frame in server.frames if frame[0] == H2Client.RST_STREAM][0]
+
+        assert frame[2] == 1
+        assert frame[3] == struct.pack('!I', H2Client.CANCEL)
+
+        sock1.close()
+        sock2.close()
+
+    def test_request_closed(self):
+        sock1, sock2 = socket.socketpair()
+
+        sock2.close()
+
+        with pytest.raises(OSError):
+            H2Client(sock1).request('example.test', '/')
+
+        sock1.close()
+
+    def test_encode_headers(self):
+        client = H2Client(None)
+
+        block = client._encode_headers('example.test', '/a', {'X-Long': 'v' * 200})
+
+        assert block[:4] == b'\x82\x87\x04\x02'
+        assert client._decode_integer(client._encode_integer(200, 7, 0), 0, 7) == (200, 2)
+        assert client._decode_huffman(bytes([0b00010000, 0b00000000 | 0b1])) == b'200'
+        assert client._decode_huffman(b'\x9d\x29\xad\x17\x18\x60\xbe\x47\x4d\x74\x15\x74\x95\x09\x62\xa2\xf9\x4f') == b'https://example.test/next'
+        assert client._decode_status(b'\x08\x03302') == 302
+        assert client._decode_status(b'\x00\x07:status\x03301') == 301
+        assert client._decode_status(b'\x40\x85\xb8\x84\x8d\x36\xa3\x03503') == 503
+        assert client._decode_headers(b'\x88\x0f\x0d\x0412345') == {':status': '200', 'content-length': '1234'}
+        assert client._decode_headers(b'\x88\x00\x8a\x21\xea\x49\x6a\x4a\xd4\x16\xa9\x93\x3f\x0212')['content-length'] == '12'
+        assert client._decode_status(b'\x00\x04link\x03302') is None
+
+
 class TestHttpRequester:
     @pytest.fixture(autouse=True)
     def setup(self):
         pass
 
+    def test_request_h2_http1(self, mocker):
+        sock1, sock2 = socket.socketpair()
+
+        def serve():
+            sock2.recv(65536)
+            sock2.sendall(b'HTTP/1.1 301 Moved\r\nLocation: /moved\r\nContent-Length: 5\r\n\r\nmoved')
+
+        threading.Thread(target=serve, daemon=True).start()
+
+        requester = HttpRequester(timeout=1.0)
+
+        assert requester._request_http1(sock1, 'example.test', '/') == (301, 5, b'moved', '/moved')
+
+        sock1.close()
+        sock2.close()
+
+    def test_request_h2_redirect(self, mocker):
+        requester = HttpRequester()
+
+        request_https = mocker.patch.object(requester, '_request_https', side_effect=[
+            (301, 5, b'moved', '/next?a=1', 1),
+            (302, 5, b'found', 'https://www.example.test/', 0),
+            (200, 2, b'ok', None, 1)
+        ])
+
+        success, response = requester.request_h2('https://example.test/index.html', keep_body=True)
+
+        assert response == {'http_status': 200, 'http_size': 2, 'http_h2': 1, 'body': 'ok'}
+        assert [c[0][0].geturl() for c in request_https.call_args_list] == ['https://example.test/index.html', 'https://example.test/next?a=1', 'https://www.example.test/']
+
+        request_https = mocker.patch.object(requester, '_request_https', return_value=(301, 5, b'moved', '/', 1))
+
+        success, response = requester.request_h2('https://example.test/', keep_body=False)
+
+        assert response == {'http_status': 301, 'http_size': 5, 'http_h2': 1}
+        assert request_https.call_count == HttpRequester.MAX_REDIRECTS + 1
+
+        request_https = mocker.patch.object(requester, '_request_https', return_value=(301, 5, b'moved', 'http://example.test/', 1))
+        request = mocker.patch.object(requester, 'request', return_value=(True, {'http_status': 200}))
+        mocker.patch.object(requester, 'request_alpn_h2', return_value=-1)
+
+        success, response = requester.request_h2('https://example.test/', keep_body=False)
+
+        assert response == {'http_status': 200, 'http_h2': -1}
+        assert request.call_args[0][0] == 'http://example.test/'
+
+    def test_request_h2_not_https(self, mocker):
+        requester = HttpRequester()
+
+        request = mocker.patch.object(requester, 'request', return_value=(True, {'http_status': 200}))
+        request_alpn_h2 = mocker.patch.object(requester, 'request_alpn_h2', return_value=0)
+
+        success, response = requester.request_h2('example.test')
+
+        assert response == {'http_status': 200, 'http_h2': 0}
+        assert request.call_args[0][0] == 'http://example.test'
+        assert request_alpn_h2.call_count == 1
+
+    def test_request_body(self, mocker):
+        server = ThreadingHTTPServer(('127.0.0.1', 0), BodyHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+
+        url = 'http://127.0.0.1:' + str(server.server_address[1])
+
+        requester = HttpRequester(timeout=1.0)
+
+        success, response = requester.request(url + '/length')
+
+        assert response == {'http_status': 200, 'http_size': 200000, 'body': 'a' * 200000}
+
+        success, response = requester.request(url + '/chunked', keep_body=False)
+
+        assert response == {'http_status': 200, 'http_size': 200000}
+
+        requester = HttpRequester(timeout=1.0, body_limit=1000)
+
+        success, response = requester.request(url + '/length')
+
+        assert response == {'http_status': 200, 'http_size': 200000, 'body': 'a' * 1000}
+
+        success, response = requester.request(url + '/chunked')
+
+        assert response == {'http_status': 200, 'http_size': 1000, 'body': 'a' * 1000}
+
+        server.shutdown()
+        server.server_close()
+
+    def test_request_head(self, mocker):
+        server = ThreadingHTTPServer(('127.0.0.1', 0), BodyHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+
+        url = 'http://127.0.0.1:' + str(server.server_address[1])
+
+        requester = HttpRequester(timeout=1.0, head=True)
+
+        open_http = mocker.spy(requester, '_open_http')
+
+        success, response = requester.request(url + '/length', keep_body=False)
+
+        assert response == {'http_status': 200, 'http_size': 200000}
+        assert [c[0][1] for c in open_http.call_args_list] == ['HEAD']
+
+        success, response = requester.request(url + '/chunked', keep_body=False)
+
+        assert response == {'http_status': 200, 'http_size': 200000}
+        assert [c[0][1] for c in open_http.call_args_list] == ['HEAD', 'HEAD', 'GET']
+
+        success, response = requester.request(url + '/length')
+
+        assert response['body'] == 'a' * 200000
+        assert [c[0][1] for c in open_http.call_args_list][3:] == ['GET']
+
+        server.shutdown()
+        server.server_close()
+
     def test_request(self):
         requester = HttpRequester()
 
@@ -276,6 +1433,50 @@ class TestServerReactivity:
 
         assert success is True
 
+    @pytest.mark.skipif(not IcmpSweeper.is_available(), reason='ICMP socket is unavailable.')
+    def test_request_icmp_sweeper(self, mocker):
+        check_output = mocker.patch('subprocess.check_output')
+
+        self.requester.set_icmp_sweeper(IcmpSweeper(timeout=1.0))
+
+        assert self.requester.request_icmp('127.0.0.1', count=2) is True
+        assert check_output.call_count == 0
+
+        self.requester.request_icmp('localhost')
+
+        assert check_output.call_count == 1
+
+        self.requester.icmp_sweeper.close()
+
+    def test_request_tcp_prober(self, mocker):
+        server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        server.bind(('127.0.0.1', 0))
+        server.listen(16)
+
+        self.requester.set_tcp_prober(TcpProber())
+
+        probe = mocker.spy(self.requester.tcp_prober, 'probe')
+
+        assert self.requester.request_tcpport('127.0.0.1', server.getsockname()[1]) is True
+        assert probe.call_count == 1
+
+        self.requester.tcp_prober.close()
+        server.close()
+
+    def test_request_udp_prober(self):
+        server = UdpEchoServer()
+
+        self.requester.set_udp_prober(UdpProber(ServerReactivity.build_query))
+
+        assert self.requester.request_udpport('127.0.0.1', server.port) is True
+
+        results = self.requester.request_udpport_batch([('127.0.0.1', server.port)])
+
+        assert results[('127.0.0.1', server.port)] >= 0
+
+        self.requester.udp_prober.close()
+        server.close()
+
     def test_request_tcp(self):
         success = self.requester.request_tcpport('wikipedia.org', 80)
 
@@ -0,0 +1,418 @@
+import pytest
+
+from ipsurv.configs import Config
+from ipsurv.core.entity import ValueDataFactory
+from ipsurv.core.pipeline import Pipeline
+from ipsurv.core.target_parser import TargetParser
+from ipsurv.core.target_groups import TargetGroups
+from ipsurv.data_collector.pass_data_collector import PassDataCollector, PassRequester
+from ipsurv.serializer.line_serializer import LineSerializer
+from ipsurv.survey_ips import SurveyIps
+from ipsurv.async_survey_ips import AsyncSurveyIps
+
+import asyncio
+import sys
+import random
+import time
+
+
+class SleepRequester(PassRequester):
+    def request(self, target):
+        time.sleep(random.uniform(0, 0.02))
+
+        return True, {'name': 'NAME' + target.identifier}
+
+
+class UnreachableRequester(SleepRequester):
+    def request(self, target):
+        if target.identifier.startswith('192.168.2.'):
+            return False, {'error': 'Unreachable.'}
+
+        return super().request(target)
+
+
+class RequiresDataCollector(PassDataCollector):
+    def get_requires(self):
+        return ['name']
+
+
+class LearningDataCollector(PassDataCollector):
+    def __init__(self, name, requester, args):
+        super().__init__(name, requester, args)
+
+        self.learned = {}
+        self.updates = {}
+
+    def request_data(self, target):
+        self.learned[target.identifier] = True
+        self.updates[target.identifier] = True
+
+        return super().request_data(target)
+
+    def export_learned(self):
+        updates = self.updates
+        self.updates = {}
+
+        return updates
+
+    def import_learned(self, learned):
+        self.learned.update(learned)
+
+
+class TestSurveyIps:
+    @pytest.fixture
+    def args(self, mocker):
+        args = mocker.Mock()
+        args.fixed_format = '{sequence},{ip},{name}'
+        args.fixed_format_params = ['sequence', 'ip', 'name']
+        args.fixed_delimiter = ','
+        args.alt_delimiter = ';'
+        args.fixed_enclose = ''
+        args.fixed_timeout = {'dns': 1, 'http': 1, 'reactivity': 1}
+        args.autodetect = False
+        args.resolve = False
+        args.headers = 0
+        args.begin = -1
+        args.end = -1
+        args.group = None
+        args.skip_duplicate = 0
+        args.all_collect = False
+        args.workers = 1
+        args.parallel_collect = False
+        args.processes = 1
+        args.group_index = None
+        args.group_seed = None
+        args.fill_duplicate = False
+
+        return args
+
+    @pytest.fixture
+    def outputs(self):
+        return []
+
+    @pytest.fixture
+    def survey_ips(self, args, mocker, outputs):
+        pipeline = Pipeline()
+        serializer = LineSerializer(args)
+        pipeline.initialize(Config, serializer)
+
+        mocker.patch.object(pipeline, 'output_result', side_effect=lambda v: outputs.append(v))
+
+        data_factory = ValueDataFactory(Config.MASTER_DATA, args.fixed_format_params)
+        target_parser = TargetParser(args, pipeline, None)
+        collectors = [PassDataCollector('pass', SleepRequester(), args)]
+
+        return SurveyIps(args, Config, data_factory, target_parser, collectors, [], pipeline, serializer)
+
+    def test_dispatch(self, args, survey_ips, outputs):
+        rows = ['192.168.1.' + str(i) for i in range(1, 6)]
+
+        survey_ips.dispatch(rows, args)
+
+        assert outputs[0] == '1,192.168.1.1,NAME192.168.1.1'
+        assert len(outputs) == 5
+
+    def test_dispatch_workers(self, args, survey_ips, outputs):
+        args.workers = 4
+
+        rows = ['192.168.1.' + str(i) for i in range(1, 51)]
+
+        survey_ips.dispatch(rows, args)
+
+        assert len(outputs) == 50
+
+        for i, v in enumerate(outputs):
+            assert v == str(i + 1) + ',192.168.1.' + str(i + 1) + ',NAME192.168.1.' + str(i + 1)
+
+    def test_dispatch_range(self, args, survey_ips, outputs):
+        args.workers = 3
+        args.begin = 2
+        args.end = 4
+
+        rows = ['192.168.1.' + str(i) for i in range(1, 11)]
+
+        survey_ips.dispatch(rows, args)
+
+        assert [v.split(',')[0] for v in outputs] == ['2', '3', '4']
+
+    def test_dispatch_parallel_collect(self, args, survey_ips, outputs, mocker):
+        args.parallel_collect = True
+        args.workers = 2
+
+        requester = SleepRequester()
+        mocker.patch.object(requester, 'request', return_value=(True, {'name': 'SECOND'}))
+
+        survey_ips.collectors.append(RequiresDataCollector('second', requester, args))
+
+        post_request = mocker.spy(survey_ips.pipeline, 'post_request')
+
+        rows = ['192.168.1.' + str(i) for i in range(1, 11)]
+
+        survey_ips.dispatch(rows, args)
+
+        assert len(outputs) == 10
+
+        for i, v in enumerate(outputs):
+            assert v == str(i + 1) + ',192.168.1.' + str(i + 1) + ',NAME192.168.1.' + str(i + 1)
+
+        assert post_request.call_count == 10
+        assert survey_ips.collect_executor is None
+
+    def test_dispatch_processes(self, args, survey_ips, outputs):
+        args.processes = 3
+        args.workers = 2
+
+        rows = ['192.168.1.' + str(i) for i in range(1, 101)]
+
+        survey_ips.dispatch(rows, args)
+
+        assert len(outputs) == 100
+
+        for i, v in enumerate(outputs):
+            assert v == str(i + 1) + ',192.168.1.' + str(i + 1) + ',NAME192.168.1.' + str(i + 1)
+
+    def test_dispatch_streaming(self, args, survey_ips, outputs):
+        args.workers = 4
+
+        self._dispatch(survey_ips, self._stream_rows(outputs), args)
+
+        assert [v.split(',')[0] for v in outputs] == ['1', '2', '3']
+
+    def test_dispatch_processes_streaming(self, args, survey_ips, outputs):
+        args.processes = 2
+
+        self._dispatch(survey_ips, self._stream_rows(outputs), args)
+
+        assert [v.split(',')[0] for v in outputs] == ['1', '2', '3']
+
+    def _stream_rows(self, outputs):
+        # The third row isn't input until the first rows are output.
+        yield '192.168.1.1'
+        yield '192.168.1.2'
+
+        deadline = time.time() + 5
+
+        while len(outputs) < 2:
+            if time.time() > deadline:
+                raise Exception('Rows are not output while the input is idle.')
+
+            time.sleep(0.01)
+
+        yield '192.168.1.3'
+
+    def test_dispatch_processes_learned(self, args, survey_ips, outputs):
+        args.processes = 2
+
+        collector = LearningDataCollector('pass', SleepRequester(), args)
+        survey_ips.collectors = [collector]
+
+        rows = ['192.168.1.' + str(i) for i in range(1, 21)]
+
+        self._dispatch(survey_ips, rows, args)
+
+        assert len(outputs) == 20
+        assert sorted(collector.learned.keys()) == sorted(rows)
+
+    def test_dispatch_processes_skip_duplicate(self, args, survey_ips, outputs):
+        args.processes = 2
+        args.skip_duplicate = 1
+        args.group = '24'
+
+        survey_ips.target_groups.ignore = False
+        survey_ips.target_groups.group_type = args.group
+
+        rows = ['192.168.1.' + str(i) for i in range(1, 41)]
+
+        survey_ips.dispatch(rows, args)
+
+        assert len(outputs) == 40
+
+        surveyed = [v for v in outputs if 'NAME' in v]
+
+        assert len(surveyed) == 1
+
+    def test_fill_duplicate(self, args, survey_ips, outputs):
+        args.skip_duplicate = 1
+        args.group = '24'
+        args.fill_duplicate = True
+
+        survey_ips.target_groups.ignore = False
+        survey_ips.target_groups.group_type = args.group
+
+        rows = ['192.168.1.' + str(i) for i in range(1, 6)]
+
+        self._dispatch(survey_ips, rows, args)
+
+        assert outputs == [str(i) + ',192.168.1.' + str(i) + ',NAME192.168.1.1' for i in range(1, 6)]
+
+    def test_fill_duplicate_loaded(self, args, survey_ips, outputs):
+        args.skip_duplicate = 1
+        args.group = '24'
+
+        survey_ips.target_groups.ignore = False
+        survey_ips.target_groups.group_type = args.group
+        survey_ips.target_groups.put_buckets([(3232235777, 3232236030, '192.168.1.1', {'name': 'LOADED'})])
+
+        self._dispatch(survey_ips, ['192.168.1.1'], args)
+
+        assert outputs == ['1,192.168.1.1,']
+
+        args.fill_duplicate = True
+
+        self._dispatch(survey_ips, ['192.168.1.2'], args)
+
+        assert outputs[1] == '1,192.168.1.2,LOADED'
+
+    def _dispatch(self, survey_ips, rows, args):
+        survey_ips.dispatch(rows, args)
+
+    def test_load_groups(self, args, survey_ips, outputs, tmp_path):
+        args.processes = 2
+        args.skip_duplicate = 1
+        args.group = '24'
+        args.group_index = str(tmp_path / 'groups.json')
+        args.group_seed = str(tmp_path / 'seed.txt')
+
+        (tmp_path / 'seed.txt').write_text('192.168.1.0/24\n')
+
+        survey_ips.target_groups.ignore = False
+        survey_ips.target_groups.group_type = args.group
+
+        survey_ips.load_groups(args)
+
+        rows = ['192.168.1.' + str(i) for i in range(1, 11)] + ['192.168.2.' + str(i) for i in range(1, 11)]
+
+        survey_ips.dispatch(rows, args)
+
+        assert len([v for v in outputs[:10] if 'NAME' in v]) == 0
+        assert len([v for v in outputs[10:] if 'NAME' in v]) == 1
+
+        survey_ips.save_groups(args)
+
+        assert len(survey_ips.target_groups.get_buckets()) == 2
+
+    def test_save_groups_failed(self, args, survey_ips, outputs, tmp_path):
+        args.skip_duplicate = 1
+        args.group = '24'
+        args.group_index = str(tmp_path / 'groups.json')
+
+        survey_ips.target_groups.ignore = False
+        survey_ips.target_groups.group_type = args.group
+        survey_ips.collectors = [PassDataCollector('pass', UnreachableRequester(), args)]
+
+        self._dispatch(survey_ips, ['192.168.1.1', '192.168.2.1', '192.168.2.5'], args)
+
+        assert [v.split(',')[2] for v in outputs] == ['NAME192.168.1.1', '', '']
+
+        survey_ips.save_groups(args)
+
+        survey_ips.target_groups = TargetGroups(args, survey_ips.pipeline)
+        survey_ips.load_groups(args)
+
+        assert [bucket[2] for bucket in survey_ips.target_groups.get_buckets()] == ['192.168.1.1']
+
+    def test_save_groups_failed_processes(self, args, survey_ips, outputs, tmp_path):
+        args.processes = 2
+
+        self.test_save_groups_failed(args, survey_ips, outputs, tmp_path)
+
+
+class AsyncSleepRequester(PassRequester):
+    async def async_request(self, target):
+        await asyncio.sleep(random.uniform(0, 0.02))
+
+        return True, {'name': 'ASYNC' + target.identifier}
+
+
+class AsyncPassDataCollector(PassDataCollector):
+    async def async_request_data(self, target):
+        return await self.requester.async_request(target)
+
+
+@pytest.mark.skipif(sys.version_info < (3, 7), reason='AsyncSurveyIps requires Python 3.7.')
+class TestAsyncSurveyIps(TestSurveyIps):
+    def _dispatch(self, survey_ips, rows, args):
+        asyncio.run(survey_ips.dispatch(rows, args))
+
+    @pytest.fixture
+    def survey_ips(self, args, mocker, outputs):
+        pipeline = Pipeline()
+        serializer = LineSerializer(args)
+        pipeline.initialize(Config, serializer)
+
+        mocker.patch.object(pipeline, 'output_result', side_effect=lambda v: outputs.append(v))
+
+        data_factory = ValueDataFactory(Config.MASTER_DATA, args.fixed_format_params)
+        target_parser = TargetParser(args, pipeline, None)
+        collectors = [PassDataCollector('pass', SleepRequester(), args)]
+
+        return AsyncSurveyIps(args, Config, data_factory, target_parser, collectors, [], pipeline, serializer)
+
+    def test_dispatch(self, args, survey_ips, outputs):
+        rows = ['192.168.1.' + str(i) for i in range(1, 6)]
+
+        asyncio.run(survey_ips.dispatch(rows, args))
+
+        assert outputs[0] == '1,192.168.1.1,NAME192.168.1.1'
+        assert len(outputs) == 5
+
+    def test_dispatch_workers(self, args, survey_ips, outputs):
+        args.workers = 20
+
+        survey_ips.collectors = [AsyncPassDataCollector('pass', AsyncSleepRequester(), args)]
+
+        rows = ['192.168.1.' + str(i) for i in range(1, 101)]
+
+        asyncio.run(survey_ips.dispatch(rows, args))
+
+        assert len(outputs) == 100
+
+        for i, v in enumerate(outputs):
+            assert v == str(i + 1) + ',192.168.1.' + str(i + 1) + ',ASYNC192.168.1.' + str(i + 1)
+
+    def test_dispatch_range(self, args, survey_ips, outputs):
+        args.workers = 3
+        args.begin = 2
+        args.end = 4
+
+        rows = ['192.168.1.' + str(i) for i in range(1, 11)]
+
+        asyncio.run(survey_ips.dispatch(rows, args))
+
+        assert [v.split(',')[0] for v in outputs] == ['2', '3', '4']
+
+    def test_dispatch_parallel_collect(self, args, survey_ips, outputs):
+        args.parallel_collect = True
+        args.workers = 4
+
+        survey_ips.collectors = [AsyncPassDataCollector('pass', AsyncSleepRequester(), args), RequiresDataCollector('second', SleepRequester(), args)]
+
+        rows = ['192.168.1.' + str(i) for i in range(1, 11)]
+
+        asyncio.run(survey_ips.dispatch(rows, args))
+
+        assert len(outputs) == 10
+
+        for i, v in enumerate(outputs):
+            assert v == str(i + 1) + ',192.168.1.' + str(i + 1) + ',ASYNC192.168.1.' + str(i + 1)
+
+    def test_dispatch_processes(self, args, survey_ips, outputs):
+        args.processes = 3
+
+        rows = ['192.168.1.' + str(i) for i in range(1, 6)]
+
+        asyncio.run(survey_ips.dispatch(rows, args))
+
+        assert [v.split(',')[0] for v in outputs] == ['1', '2', '3', '4', '5']
+
+    @pytest.mark.skip(reason='AsyncSurveyIps surveys in a single process.')
+    def test_dispatch_processes_skip_duplicate(self, args, survey_ips, outputs):
+        pass
+
+    @pytest.mark.skip(reason='AsyncSurveyIps surveys in a single process.')
+    def test_load_groups(self, args, survey_ips, outputs, tmp_path):
+        pass
+
+    @pytest.mark.skip(reason='AsyncSurveyIps surveys in a single process.')
+    def test_save_groups_failed_processes(self, args, survey_ips, outputs, tmp_path):
+        pass
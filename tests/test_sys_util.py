@@ -1,7 +1,10 @@
 import pytest
 
 from ipsurv.util.sys_util import System
-from ipsurv.util.network_util import IpUtil, DnsUtil
+from ipsurv.util.network_util import IpUtil, DnsUtil, PrefixIndex, IntervalIndex, ResolveCache, ResolverPool
+import dns.exception
+import threading
+import time
 import socket
 import re
 
@@ -45,6 +48,131 @@ class TestIpUtil:
         assert (begin_ip == 3221291265 and end_ip == 3221291518)
 
 
+class TestResolveCache:
+    def test_resolve(self, mocker):
+        resolve_cache = ResolveCache()
+
+        answer = mocker.MagicMock()
+        answer.__getitem__.return_value = '192.168.1.10'
+        answer.rrset.ttl = 30
+
+        resolver = mocker.Mock()
+        resolver.resolve.return_value = answer
+
+        resolve_cache.resolver = resolver
+
+        threads = [threading.Thread(target=resolve_cache.resolve, args=('example.test', 1)) for _ in range(5)]
+
+        for thread in threads:
+            thread.start()
+
+        for thread in threads:
+            thread.join()
+
+        assert resolve_cache.resolve('example.test', 1) == '192.168.1.10'
+        assert resolver.resolve.call_count == 1
+
+        mocker.patch('time.time', return_value=time.time() + 31)
+
+        resolve_cache.resolve('example.test', 1)
+
+        assert resolver.resolve.call_count == 2
+
+    def test_fallback(self, mocker):
+        resolve_cache = ResolveCache(default_ttl=60)
+
+        resolver = mocker.Mock()
+        resolver.resolve.side_effect = dns.exception.Timeout()
+
+        resolve_cache.resolver = resolver
+
+        resolve = mocker.patch.object(DnsUtil, 'resolve', return_value='192.168.1.20')
+
+        assert resolve_cache.resolve('example.test', 1) == '192.168.1.20'
+        assert resolve_cache.resolve('example.test', 1) == '192.168.1.20'
+        assert resolve.call_count == 1
+
+
+class TestPrefixIndex:
+    def test_find(self):
+        prefix_index = PrefixIndex()
+
+        prefix_index.put('8.0.0.0/8', 'A')
+        prefix_index.put('8.8.8.0/24', 'B')
+        prefix_index.put('8.8.8.8/32', 'C')
+        prefix_index.put('2001:db8::/32', 'D')
+
+        assert prefix_index.find('8.8.8.8') == 'C'
+        assert prefix_index.find('8.8.8.9') == 'B'
+        assert prefix_index.find('8.1.1.1') == 'A'
+        assert prefix_index.find('9.1.1.1') is None
+        assert prefix_index.find('2001:db8::1') == 'D'
+        assert prefix_index.find('2001:db9::1') is None
+        assert len(prefix_index) == 4
+
+        prefix_index.put('8.8.8.100/24', 'E')
+
+        assert prefix_index.find('8.8.8.9') == 'E'
+        assert len(prefix_index) == 4
+
+
+class TestResolverPool:
+    def test_call(self):
+        pool = ResolverPool(2)
+
+        assert pool.call(lambda a, b: a + b, (1, 2)) == 3
+
+        with pytest.raises(socket.gaierror):
+            pool.call(self._raise, (socket.gaierror('Error'),))
+
+        assert pool.get_stats() == {'submitted': 2, 'queued': 0, 'max_queued': 1, 'timeouts': 0}
+
+        pool.shutdown()
+
+    def test_timeout(self):
+        pool = ResolverPool(1)
+        event = threading.Event()
+
+        threads = [threading.Thread(target=self._call_timeout, args=(pool, event)) for i in range(3)]
+
+        for thread in threads:
+            thread.start()
+
+        for thread in threads:
+            thread.join()
+
+        event.set()
+
+        stats = pool.get_stats()
+
+        assert stats['timeouts'] == 3
+        assert stats['queued'] == 0
+        assert stats['max_queued'] >= 2
+        assert len(pool.executor._threads) == 1
+
+        pool.shutdown()
+
+    def _call_timeout(self, pool, event):
+        with pytest.raises(socket.timeout):
+            pool.call(event.wait, (1.0,), timeout=0.05)
+
+    def _raise(self, e):
+        raise e
+
+    def test_dns_util(self, mocker):
+        pool = ResolverPool(1)
+
+        mocker.patch.object(DnsUtil, 'pool', pool)
+        mocker.patch('socket.getaddrinfo', return_value=[(2, 1, 6, '', ('192.168.1.1', 0))])
+        mocker.patch('socket.gethostbyaddr', return_value=('host.test', [], ['192.168.1.1']))
+
+        assert DnsUtil.resolve('host.test') == '192.168.1.1'
+        assert DnsUtil.reverse('192.168.1.1') == 'host.test'
+        assert pool.get_stats()['submitted'] == 2
+
+        pool.shutdown()
+
+
 class TestDnsUtil:
     @pytest.fixture(autouse=True)
     def setup(self):
@@ -68,3 +196,34 @@ class TestDnsUtil:
         host = DnsUtil.reverse('8.8.8.8')
 
         assert host == 'dns.google'
+
+
+class TestIntervalIndex:
+    def test_find(self):
+        interval_index = IntervalIndex()
+
+        interval_index.put(0, 1000, 'A')
+        interval_index.put(100, 199, 'B')
+        interval_index.put(150, 400, 'C')
+        interval_index.put(150, 150, 'D')
+
+        assert interval_index.find(120) == 'B'
+        assert interval_index.find(150) == 'D'
+        assert interval_index.find(300) == 'C'
+        assert interval_index.find(999) == 'A'
+        assert interval_index.find(1001) is None
+        assert len(interval_index) == 4
+
+    def test_put(self):
+        interval_index = IntervalIndex()
+
+        for i in range(10000):
+            interval_index.put(i * 2, i * 2, i)
+
+        interval_index.put(0, 0, 'A')
+
+        assert len(interval_index) == 10000
+        assert interval_index.root.height <= 20
+        assert interval_index.find(0) == 'A'
+        assert interval_index.find(19998) == 9999
+        assert interval_index.find(19997) is None
@@ -1,6 +1,8 @@
+import argparse
+import os
 import pytest
 
-from ipsurv.core.target_groups import TargetGroups
+from ipsurv.core.target_groups import TargetGroups, SharedTargetGroups, TargetGroupsManager
 from ipsurv.core.entity import TargetGroup
 from ipsurv.core.pipeline import Pipeline
 from ipsurv.core.entity import ValueData, Target
@@ -65,6 +67,23 @@ class TestTargetGroups:
 
         assert group is not None
 
+    def test_find_group_reserve(self, args, mocker):
+        args.group = '24'
+
+        pipeline = Pipeline()
+
+        create_group = mocker.spy(pipeline, 'create_group')
+
+        targetGroups = TargetGroups(args, pipeline)
+
+        target = Target()
+        target.identifier = '192.168.1.10'
+        target.identifier_int = 3232235786
+
+        assert targetGroups.find_group(ValueData({}), target) is None
+        assert targetGroups.get_buckets()[0][2] == '192.168.1.1'
+        assert create_group.call_count == 0
+
     def test_create_group_by_identifier(self, args):
         targetGroups = TargetGroups(args, Pipeline())
 
@@ -90,19 +109,29 @@ class TestTargetGroups:
     def test_find_indexes(self, args):
         targetGroups = TargetGroups(args, Pipeline())
 
-        targetGroups.group_indexes = [100, 200, 299, 310, 350, 400]
-        targetGroups.groups = [None, None, None, (300, 310, '300'), None, None]
+        targetGroups._add_indexes(TargetGroup(100, 199, '100'))
+        targetGroups._add_indexes(TargetGroup(300, 310, '300'))
+        targetGroups._add_indexes(TargetGroup(400, None, '400'))
 
         group = targetGroups._find_indexes(300)
 
-        assert group is not None
+        assert group.value == '300'
 
-        targetGroups.group_indexes = [10, 200, 280, 305, 350, 400]
-        targetGroups.groups = [None, None, None, (300, 310, '300'), None, None]
+        assert targetGroups._find_indexes(250) is None
+        assert targetGroups._find_indexes(400).value == '400'
+        assert targetGroups._find_indexes(401) is None
 
-        group = targetGroups._find_indexes(300)
+    def test_find_indexes_nested(self, args):
+        targetGroups = TargetGroups(args, Pipeline())
 
-        assert group is not None
+        targetGroups._add_indexes(TargetGroup(0, 1000, 'parent'))
+        targetGroups._add_indexes(TargetGroup(100, 199, 'child'))
+        targetGroups._add_indexes(TargetGroup(150, 400, 'overlap'))
+
+        assert targetGroups._find_indexes(120).value == 'child'
+        assert targetGroups._find_indexes(180).value == 'child'
+        assert targetGroups._find_indexes(300).value == 'overlap'
+        assert targetGroups._find_indexes(800).value == 'parent'
 
     def test_add_indexes(self, args):
         targetGroups = TargetGroups(args, Pipeline())
@@ -110,6 +139,170 @@ class TestTargetGroups:
         group = TargetGroup(100, 300, '300')
 
         targetGroups._add_indexes(group)
+        targetGroups._add_indexes(group)
+
+        assert targetGroups.group_index.root.begin == 100
+        assert len(targetGroups.group_index) == 1
+
+        for i in range(1000):
+            targetGroups._add_indexes(TargetGroup(1000 + i * 10, 1000 + i * 10 + 9, str(i)))
+
+        assert len(targetGroups.group_index) == 1001
+        assert targetGroups.group_index.root.height <= 15
+        assert targetGroups._find_indexes(5555).value == '455'
+
+    def test_put_values(self, args):
+        targetGroups = TargetGroups(args, Pipeline())
+        targetGroups.ignore = False
+
+        target = Target()
+        target.identifier = '192.168.1.10'
+        target.identifier_int = 3232235786
+
+        targetGroups.put_group(ValueData({}), target, '24', None)
+
+        group = targetGroups.put_values(ValueData({}), target, {'country': 'US'})
+
+        assert group.values == {'country': 'US'}
+
+        targetGroups.put_values(ValueData({}), target, {'country': 'JP'})
+
+        assert targetGroups.find_group(ValueData({}), target).values == {'country': 'US'}
+
+    def test_save_load(self, args, tmp_path):
+        path = str(tmp_path / 'groups.json')
+
+        targetGroups = TargetGroups(args, Pipeline())
+
+        targetGroups._add_indexes(TargetGroup(300, 310, '300'))
+        targetGroups._add_indexes(TargetGroup(100, 199, '100'))
+        targetGroups.save(path)
+
+        targetGroups = TargetGroups(args, Pipeline())
+        targetGroups.load(path)
+
+        assert targetGroups.get_buckets() == [(100, 199, '100', None), (300, 310, '300', None)]
+        assert targetGroups._find_indexes(305).value == '300'
+
+        targetGroups.load(str(tmp_path / 'none.json'))
+
+        assert len(targetGroups.get_buckets()) == 2
+
+    def test_complete_group(self, args, tmp_path):
+        path = str(tmp_path / 'groups.json')
+
+        args.group = '24'
+
+        targetGroups = TargetGroups(args, Pipeline())
+        targetGroups.put_buckets([(100, 199, '100')])
+
+        target = Target()
+        target.identifier = '192.168.1.10'
+        target.identifier_int = 3232235786
+
+        assert targetGroups.find_group(ValueData({}), target) is None
+        assert len(targetGroups.get_buckets()) == 2
+
+        targetGroups.save(path)
+
+        assert [bucket[2] for bucket in targetGroups.get_completed_buckets()] == ['100']
+
+        targetGroups.complete_group(ValueData({}), target)
+        targetGroups.save(path)
+
+        targetGroups = TargetGroups(args, Pipeline())
+        targetGroups.load(path)
+
+        assert [bucket[2] for bucket in targetGroups.get_buckets()] == ['100', '192.168.1.1']
+
+    def test_load_illegal(self, args, tmp_path):
+        path = tmp_path / 'groups.json'
+        path.write_text('{"a": 1}')
+
+        targetGroups = TargetGroups(args, Pipeline())
+        targetGroups.load(str(path))
+
+        assert targetGroups.get_buckets() == []
+
+        path.write_text('[[100, 199, "100"], ["a", 1, "b"]]')
+
+        targetGroups.load(str(path))
+
+        assert targetGroups.get_buckets() == []
+
+    def test_save_interrupted(self, args, tmp_path, mocker):
+        path = str(tmp_path / 'groups.json')
+
+        targetGroups = TargetGroups(args, Pipeline())
+
+        targetGroups._add_indexes(TargetGroup(100, 199, '100'))
+        targetGroups.save(path)
+
+        targetGroups._add_indexes(TargetGroup(300, 310, '300'))
+
+        mocker.patch('json.dump', side_effect=KeyboardInterrupt)
+
+        with pytest.raises(KeyboardInterrupt):
+            targetGroups.save(path)
+
+        mocker.stopall()
+
+        assert os.listdir(str(tmp_path)) == ['groups.json']
+
+        targetGroups = TargetGroups(args, Pipeline())
+        targetGroups.load(path)
+
+        assert targetGroups.get_buckets() == [(100, 199, '100', None)]
+
+    def test_seed(self, args, tmp_path):
+        path = tmp_path / 'seed.txt'
+        path.write_text('# surveyed\n192.168.1.0/24\n\n10.0.0.0/8 # private\nINVALID\n')
+
+        targetGroups = TargetGroups(args, Pipeline())
+        targetGroups.seed(str(path))
+
+        assert len(targetGroups.get_buckets()) == 2
+        assert targetGroups._find_indexes(3232235876).value == '192.168.1.1'
+        assert targetGroups._find_indexes(167772170).value == '10.0.0.1'
+
+    def test_shared_target_groups(self, args):
+        manager = TargetGroupsManager()
+        manager.start()
+
+        try:
+            index = manager.TargetGroupsIndex(argparse.Namespace(group='8', skip_duplicate=1), None)
+
+            args.group = '8'
+
+            targetGroups1 = SharedTargetGroups(args, Pipeline(), index)
+            targetGroups2 = SharedTargetGroups(args, Pipeline(), index)
+
+            target = Target()
+            target.ip = '192.168.1.10'
+            target.identifier = '192.168.1.10'
+
+            targetGroups1.put_group(ValueData({}), target, '8', None)
+
+            target.identifier_int = 3221291364
+
+            group = targetGroups2.find_group(ValueData({}), target)
+
+            assert group.value == '192.0.0.1'
+            assert group.end_int == 3238002686
+
+            target.identifier = '10.0.0.1'
+            target.identifier_int = 167772161
+
+            assert targetGroups1.find_group(ValueData({}), target) is None
+            assert targetGroups2.find_group(ValueData({}), target).value == '10.0.0.1'
+
+            targetGroups1.put_buckets([(100, 199, '100')])
+
+            assert len(targetGroups2.get_buckets()) == 3
+            assert [bucket[2] for bucket in targetGroups2.get_completed_buckets()] == ['100']
+
+            targetGroups1.complete_group(ValueData({}), target)
 
-        assert targetGroups.group_indexes[0] == 300
-        assert len(targetGroups.groups) == 1
+            assert [bucket[2] for bucket in targetGroups2.get_completed_buckets()] == ['100', '10.0.0.1']
+        finally:
+            manager.shutdown()